@@ -0,0 +1,35 @@
+from TweetsCorpus import get_corpus, counts_to_dict
+
+
+def sorted_by_count(counts):        #rosnąco wg liczby wystąpień, tak jak wcześniej w create_user_stats
+    return dict(sorted(counts.items(), key=lambda x: x[1]))
+
+
+def median_value(median, count):    #typ jak w statistics.median: środkowa liczba całkowita albo średnia dwóch (float)
+    median = float(median)
+    return int(median) if count % 2 and median.is_integer() else median
+
+
+def engagement_stats(original_tweets):     #średnia, maksimum, minimum i mediana polubień i udostępnień w jednym przebiegu
+    aggregates = original_tweets[["nlikes", "nretweets"]].agg(["sum", "count", "max", "min", "median"])
+    stats = dict()
+    for column, name in [("nlikes", "likes"), ("nretweets", "retweets")]:
+        values = aggregates[column]
+        stats['avg' + name] = round(float(values["sum"]) / int(values["count"]))
+        stats['max' + name] = int(values["max"])
+        stats['min' + name] = int(values["min"])
+        stats['median' + name] = median_value(values["median"], int(values["count"]))
+    return stats
+
+
+def compute_account_stats(df):      #statystyki konta liczone operacjami na całych kolumnach
+    # tweety bez retweetów - kopiujemy tylko dwie kolumny liczbowe, bez tekstu tweetów
+    original_tweets = df.loc[df["retweet"].eq(False), ["nlikes", "nretweets"]]
+    account_stats = engagement_stats(original_tweets)
+    places = df["place"]
+    account_stats['places'] = set(places[places != ''].unique())        #miejsca, z których pisano
+    index = get_corpus(df).index
+    account_stats['hashtagdict'] = dict(index.hashtag_counts)      #hasztagi, których użyto
+    account_stats['usersdict'] = sorted_by_count(index.mention_counts)    #uzytkownicy, o których wspomniano
+    account_stats['hourdict'] = sorted_by_count(counts_to_dict(df["hour"].value_counts(sort=False)))  #i godziny napisania
+    return account_stats
@@ -1,4 +1,5 @@
 import time
+import os
 
 # fonts
 title_font = ("Segoe UI Semibold", 20)
@@ -20,6 +21,89 @@ features = {"Nie wybrano": "UWAGA: wybierz funkcjonalność",
             "Powiązane konta": "Graf powiązanych kont z danym użytkownikiem Twittera",
             "Statystyki użytkownika": ""}
 
+# progress of features running in the background
+progress_poll_interval = 100  # milliseconds between checks for progress events
+preview_max_size = (1200, 700)  # size of the window showing a generated image, the saved file keeps the full size
+
+# tracing
+trace_path = None  # JSON lines file with the time, rows and peak memory of each feature stage, None turns tracing off
+trace_memory = True  # peak memory needs tracemalloc, which slows down allocations while tracing
+
+# tweets cache
+tweets_cache_dir = os.path.join(os.path.expanduser("~"), ".tweenspector", "tweets_cache")
+tweets_cache_max_size = 512 * 1024 * 1024  # in bytes
+tweets_cache_ttl = 24 * 3600  # seconds after which cached days are fetched again, likes and retweets keep changing
+tweets_cache_empty_ttl = 15 * 60  # seconds a range that returned no tweets is not fetched again, twint hides errors as empty results
+session_cache_max_size = 256 * 1024 * 1024  # in bytes, memory used by tweets kept during the session
+
+# fetching
+twitter_host = "twitter.com"
+friends_fetch_workers = 8  # number of accounts fetched at the same time in the interconnections network
+host_requests_per_second = {twitter_host: 2.0}  # scrapes started per second, hosts not listed are not limited
+host_requests_burst = 4
+default_tweet_source = "twint"  # "twint", "archive:<csv, jsonl or feather file>" or the address of a tweets HTTP server
+http_source_timeout = 30  # seconds to wait for one page from a tweets HTTP server
+fake_server_page_size = 100  # tweets in one page sent by the local fake server used for tests and benchmarks
+
+# interconnections network crawl
+crawl_depth = 1  # hops from the user, 1 means the user and the accounts they mention
+crawl_fetch_budget = 300  # accounts fetched at most during one crawl
+crawl_check_every = 20  # fetched accounts between checks of the community structure
+crawl_stability_nmi = 0.95  # similarity of consecutive community structures treated as no change
+crawl_stable_checks = 2  # unchanged checks in a row after which a deeper crawl stops
+
+# interactions graph kept between runs
+interactions_db_path = os.path.join(os.path.expanduser("~"), ".tweenspector", "interactions.sqlite3")
+interactions_ttl = 7 * 24 * 3600  # seconds after which mentions of an account are fetched again
+missing_account_ttl = 24 * 3600  # seconds after which an account without tweets is tried again
+
+# batch reports
+batch_default_days = 30  # tweets from this many last days are used when a job gives no dates
+
+# tweet archives
+archive_chunk_size = 50000  # tweets read at once when aggregating large CSV archives
+stats_relative_accuracy = 0.01  # relative error of medians and percentiles computed from mergeable sketches
+
+# benchmarks
+benchmark_sizes = [1000, 100000, 1000000]  # tweets of the benchmarked account
+benchmark_accounts = 300  # different accounts mentioned in the synthetic tweets
+benchmark_friend_tweets = 200  # tweets of each mentioned account in the network benchmark
+benchmark_tolerance = 0.2  # slowdown against the baseline reported as a regression
+benchmark_min_seconds = 0.05  # smaller differences are treated as measurement noise
+benchmark_startup_modules = ["TweetsData", "MainApplication"]  # import times measured in a new process
+
+# lemmatization
+lemmatizer_model = "pl_core_news_lg"
+lemmatizer_language = "pl"  # language of the model, part of the key of cached lemmas
+lemmatizer_excluded_components = ["parser", "ner"]  # lemmas only need tokens, tags and morphology
+lemmatizer_batch_size = 256  # tweets passed to spaCy at once
+lemmatizer_n_process = 1  # worker processes used by spaCy, -1 uses all CPUs
+lemmatizer_preload = True  # load the model in the background when the window opens, before the first word cloud
+lemmatizer_service_address = None  # running lemmatization service tried first, e.g. ("127.0.0.1", 6391); None turns it off
+lemmatizer_service_listen = ("127.0.0.1", 6391)  # address LemmatizerService.py listens on by default
+lemmatizer_service_key_path = os.path.join(os.path.expanduser("~"), ".tweenspector", "lemmatizer_service.key")  # random per-user key, readable only by its owner
+lemmatizer_service_max_message = 64 * 1024 * 1024  # bytes of one JSON request or reply, longer messages close the connection
+lemmatizer_service_workers = 1  # service processes, each holds its own copy of the model
+lemmatizer_service_retry = 60  # seconds before connecting again after the service was not running
+lemma_cache_path = os.path.join(os.path.expanduser("~"), ".tweenspector", "lemmas.sqlite3")
+lemma_cache_max_size = 500000  # tokens kept in the lemma cache, the least recently used are removed
+
+# word cloud
+wordcloud_max_words = 200  # size of the vocabulary kept in the frequency table
+
+# community detection
+automatic_community_detection = "Automatyczny dobór"
+community_detection_methods = [automatic_community_detection, "Optimal Modularity", "Spinglass",
+                               "Label Propagation", "Infomap"]
+community_detection_timeout = 30  # seconds given to the chosen method before falling back
+community_fallback_timeout = 15  # seconds given to Infomap used as a fallback
+community_inline_max_vertices = 15  # smaller graphs are clustered without starting a worker process
+optimal_modularity_max_vertices = 40  # optimal modularity takes exponential time, used only for small graphs
+optimal_modularity_max_edges = 300
+spinglass_max_vertices = 500  # spinglass needs a connected graph and slows down quickly with its size
+spinglass_min_density = 0.05  # automatic selection prefers spinglass only for dense graphs
+infomap_max_edges = 200000
+
 
 # timezone convert to string
 def timezone_to_string():
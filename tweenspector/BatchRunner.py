@@ -0,0 +1,180 @@
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from App_variables import *
+from FeatureStrategy import UserWordConnection, RelatedPeopleConnection, AccountsInfo
+from TweetCache import tweet_cache_for, session_cache
+from InteractionStore import interaction_store_for
+from LemmaCache import LemmaCache
+from TweetSource import create_tweet_source
+from Tracing import tracer
+from RateLimiter import shared_rate_limiters, install_rate_limiters
+
+batch_features = {"words": UserWordConnection, "network": RelatedPeopleConnection, "stats": AccountsInfo}
+worker_state = dict()       #cache tweetów i graf interakcji, jeden zestaw na proces roboczy
+
+
+def default_job():
+    today = datetime.date.today()
+    return {"search_words": None,
+            "date_from": str(today - datetime.timedelta(days=batch_default_days)),
+            "date_to": str(today),
+            "tweets_count": 500,
+            "features": list(batch_features),
+            "stats_option": 1,
+            "community_detection_method": automatic_community_detection}
+
+
+def load_jobs(path):        #plik JSON: lista kont albo {"defaults": {...}, "accounts": [...]}
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    if isinstance(data, list):
+        data = {"accounts": data}
+    defaults = default_job()
+    defaults.update(data.get("defaults", dict()))
+    jobs = []
+    for account in data["accounts"]:
+        job = dict(defaults)
+        job.update({"user_name": account} if isinstance(account, str) else account)
+        unknown = set(job["features"]) - set(batch_features)
+        if unknown:
+            raise ValueError("Nieznane funkcjonalnosci {features} dla konta {user}"
+                             .format(features=sorted(unknown), user=job["user_name"]))
+        jobs.append(job)
+    return jobs
+
+
+def account_dir_name(user_name):
+    return re.sub(r"[^\w.-]", "_", user_name)
+
+
+def init_worker(source=default_tweet_source, trace=None, rate_limiters=None):
+    if rate_limiters:       #limit zapytań do hosta wspólny dla wszystkich procesów, a nie osobny w każdym z nich
+        install_rate_limiters(rate_limiters)
+    if trace:       #każdy proces dopisuje ślady etapów do wspólnego pliku
+        tracer.enable(trace)
+    worker_state["tweet_source"] = create_tweet_source(source)
+    worker_state["tweet_cache"] = tweet_cache_for(worker_state["tweet_source"])
+    worker_state["interaction_store"] = interaction_store_for(worker_state["tweet_source"])
+    worker_state["lemma_cache"] = LemmaCache()
+
+
+def json_value(value):      #typy z wyników funkcjonalności, których json nie zapisuje sam
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, datetime.timedelta):       #także pd.Timedelta, np. średni odstęp między tweetami
+        return value.total_seconds()
+    if hasattr(value, "item"):      #liczby numpy
+        return value.item()
+    return str(value)
+
+
+def write_json(path, data):     #zapis przez plik tymczasowy, żeby przerwany zapis nie zostawił połowy pliku
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(data, file, ensure_ascii=False, indent=2, default=json_value)
+    os.replace(path + ".tmp", path)
+
+
+def feature_option(job, feature):
+    if feature == "network":
+        return job["community_detection_method"]
+    if feature == "stats":
+        return job["stats_option"]
+    return 0
+
+
+def run_feature(job, feature, account_dir):
+    strategy = batch_features[feature](job["user_name"], job["search_words"], job["date_from"], job["date_to"],
+                                       job["tweets_count"], feature_option(job, feature),
+                                       tweet_cache=worker_state.get("tweet_cache"), session_cache=session_cache,
+                                       interaction_store=worker_state.get("interaction_store"),
+                                       tweet_source=worker_state.get("tweet_source"),
+                                       lemma_cache=worker_state.get("lemma_cache"))
+    start = time.perf_counter()
+    result = {"success": False, "image": None}
+    try:
+        image = strategy.generate_image()
+        result["success"] = image is not None
+        if image is not None:       #obraz z pamięci zapisujemy od razu w katalogu konta
+            result["image"] = feature + ".png"
+            image.save(os.path.join(account_dir, result["image"]), format="PNG")
+        data = strategy.data()
+        if data is not None:        #dane funkcjonalności (statystyki, częstości słów, grupy kont) obok obrazu
+            result["data"] = feature + ".json"
+            write_json(os.path.join(account_dir, result["data"]), data)
+    except Exception as exc:
+        result["error"] = "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))
+    result["time"] = time.perf_counter() - start
+    community_detection = getattr(strategy.program_feature, "community_detection", None)
+    if feature == "network" and isinstance(community_detection, dict):
+        result["community_detection"] = community_detection
+    return result
+
+
+def run_job(job, output_dir):       #wszystkie funkcjonalności dla jednego konta, wyniki w osobnym katalogu
+    account_dir = os.path.join(output_dir, account_dir_name(job["user_name"]))
+    os.makedirs(account_dir, exist_ok=True)
+    result = {key: job[key] for key in ["user_name", "search_words", "date_from", "date_to", "tweets_count"]}
+    result["features"] = {feature: run_feature(job, feature, account_dir) for feature in job["features"]}
+    write_json(os.path.join(account_dir, "result.json"), result)
+    result["output"] = account_dir
+    return result
+
+
+def run_batch(jobs, output_dir, workers=None, source=default_tweet_source, trace=None):  #konta przetwarzamy równolegle w osobnych procesach
+    output_dir = os.path.abspath(output_dir)
+    results = []
+    if workers == 1:        #jeden proces roboczy - wszystko liczymy w bieżącym procesie
+        init_worker(source, trace)
+        for job in jobs:
+            results.append(run_job(job, output_dir))
+        return results
+    context = multiprocessing.get_context()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                             initargs=(source, trace, shared_rate_limiters(context))) as executor:
+        futures = {executor.submit(run_job, job, output_dir): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                results.append({"user_name": futures[future]["user_name"],
+                                "error": "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))})
+    return results
+
+
+def job_succeeded(result):
+    return "error" not in result and all(feature["success"] for feature in result["features"].values())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generowanie raportów TweeNspector dla wielu kont bez interfejsu")
+    parser.add_argument("jobs", help="plik JSON z listą kont i opcji")
+    parser.add_argument("-o", "--output", default="reports", help="katalog wyników (domyślnie reports)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="liczba procesów roboczych (domyślnie liczba procesorów)")
+    parser.add_argument("-s", "--source", default=default_tweet_source,
+                        help="źródło tweetów: twint, archive:<plik csv/jsonl/feather> albo adres serwera http://...")
+    parser.add_argument("--trace", help="plik JSON lines z czasem, liczbą wierszy i pamięcią każdego etapu")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = load_jobs(args.jobs)
+    results = run_batch(jobs, args.output, args.workers, args.source, args.trace)
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, "summary.json"), "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    failed = [result["user_name"] for result in results if not job_succeeded(result)]
+    print("Batch - konta: {count}, bledy: {failed}".format(count=len(results), failed=len(failed)))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
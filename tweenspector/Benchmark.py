@@ -0,0 +1,228 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from App_variables import *
+from TweetsData import TweetsData
+from TweetSource import TweetSource
+from FeatureProgress import FeatureProgress
+from Tracing import tracer
+
+benchmark_words = ["szczepienie", "rząd", "polska", "wybory", "ustawa", "minister", "zdrowie", "pandemia", "szkoła",
+                   "praca", "ceny", "inflacja", "energia", "węgiel", "wojna", "pomoc", "ukraina", "granica", "sejm",
+                   "prezydent", "dzieci", "lekarze", "szpital", "pieniądze", "podatek", "emerytura", "kraj", "miasto",
+                   "dzisiaj", "jutro", "dobry", "nowy", "ważny", "trzeba", "będzie", "może", "jest", "nie", "się",
+                   "oraz", "ale", "który", "bardzo", "tylko", "jeszcze", "kiedy", "dlaczego", "wszyscy", "ludzie"]
+benchmark_hashtags = ["covid19", "szczepimysie", "polska", "sejm", "wybory", "ukraina", "inflacja", "energia",
+                      "zdrowie", "edukacja", "sport", "pogoda"]
+
+
+def stable_seed(*values):       #ziarno zależne tylko od wartości, a nie od hash() zmieniającego się między procesami
+    return zlib.crc32("|".join(str(value) for value in values).encode("utf-8"))
+
+
+def zipf_weights(count, exponent=1.1):      #częstości słów i kont w tweetach mają rozkład zbliżony do Zipfa
+    weights = 1 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def generate_tweets(count, user_name="benchmark", seed=0, accounts=benchmark_accounts, date_from="2022-01-01",
+                    date_to="2022-12-31"):      #syntetyczne tweety z kolumnami jak twint.output.panda.Tweets_df
+    rng = np.random.default_rng(seed)
+    vocabulary = np.array(benchmark_words + ["słowo{n}".format(n=n) for n in range(5000)])
+    mentions = np.array(["@konto{n}".format(n=n) for n in range(accounts)])
+    lengths = rng.integers(5, 25, count)
+    words = rng.choice(vocabulary, lengths.sum(), p=zipf_weights(len(vocabulary)))
+    mention_counts = rng.choice(4, count, p=[0.5, 0.3, 0.15, 0.05])
+    tweet_mentions = rng.choice(mentions, mention_counts.sum(), p=zipf_weights(len(mentions)))
+    links = rng.random(count) < 0.3
+    tag_counts = rng.choice(3, count, p=[0.6, 0.3, 0.1])
+    tags = rng.choice(benchmark_hashtags, tag_counts.sum(), p=zipf_weights(len(benchmark_hashtags)))
+    word_ends, mention_ends, tag_ends = np.cumsum(lengths), np.cumsum(mention_counts), np.cumsum(tag_counts)
+    texts, hashtags = [], []
+    for i in range(count):
+        text = words[word_ends[i] - lengths[i]:word_ends[i]].tolist()
+        text = tweet_mentions[mention_ends[i] - mention_counts[i]:mention_ends[i]].tolist() + text
+        tweet_tags = tags[tag_ends[i] - tag_counts[i]:tag_ends[i]].tolist()
+        text += ["#" + tag for tag in tweet_tags]
+        if links[i]:
+            text.append("https://t.co/{n:x}".format(n=i))
+        texts.append(" ".join(text))
+        hashtags.append(tweet_tags)
+    start, end = pd.Timestamp(date_from), pd.Timestamp(date_to)
+    dates = end - pd.to_timedelta(np.sort(rng.random(count)) * (end - start).total_seconds(), unit="s")
+    dates = dates.floor("s")        #najnowsze tweety jako pierwsze, jak zwraca je twint
+    return pd.DataFrame({
+        "id": ["{seed}{n:09d}".format(seed=seed % 100000, n=n) for n in range(count)],
+        "date": dates.strftime("%Y-%m-%d %H:%M:%S"),
+        "hour": dates.strftime("%H"),
+        "day": dates.dayofweek + 1,
+        "tweet": texts,
+        "language": "pl",
+        "hashtags": hashtags,
+        "username": user_name,
+        "name": user_name,
+        "place": "",
+        "nlikes": rng.lognormal(2, 2, count).astype(np.int64),
+        "nretweets": rng.lognormal(0.5, 1.5, count).astype(np.int64),
+        "nreplies": rng.lognormal(0, 1.2, count).astype(np.int64),
+        "retweet": rng.random(count) < 0.2,
+    })
+
+
+class SyntheticSource(TweetSource):     #źródło tweetów bez sieci: konto główne ma rows tweetów, wspomniane konta mniej
+    def __init__(self, user_name, rows, friend_rows=benchmark_friend_tweets, seed=0):
+        self.user_name = user_name.lower()
+        self.rows = rows
+        self.friend_rows = friend_rows
+        self.seed = seed
+        self.tweets = dict()        #wygenerowane ramki, kolejne powtórzenia nie mierzą już generowania
+
+    def fetch(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        key = (user_name.lower(), date_from, date_to)
+        if key not in self.tweets:
+            rows = self.rows if key[0] == self.user_name else self.friend_rows
+            self.tweets[key] = generate_tweets(rows, user_name, stable_seed(self.seed, key[0]),
+                                               date_from=date_from, date_to=date_to)
+        return self.tweets[key].head(int(num_of_tweets))
+
+
+class StageTimer(FeatureProgress):      #czasy etapów funkcjonalności zapisywane przy każdej zmianie etapu
+    def __init__(self):
+        super().__init__()
+        self.stages = dict()
+        self.current = None
+        self.started = None
+
+    def stage(self, name):
+        self.finish()
+        super().stage(name)
+        self.current = name
+        self.started = time.perf_counter()
+
+    def finish(self):
+        if self.current is not None:
+            self.stages[self.current] = self.stages.get(self.current, 0.0) + time.perf_counter() - self.started
+            self.current = None
+
+
+benchmark_features = {
+    "words": lambda td: td.create_word_cloud(),
+    "network": lambda td: td.create_interconnections_network(automatic_community_detection),
+    "stats": lambda td: td.create_user_stats(1),
+}
+
+
+def run_benchmark(feature, rows, source, date_from="2022-01-01", date_to="2022-12-31"):    #jedno uruchomienie funkcjonalności
+    timer = StageTimer()
+    td = TweetsData(source.user_name, None, date_from, date_to, rows, progress=timer, tweet_source=source)
+    start = time.perf_counter()
+    result = {"feature": feature, "rows": rows}
+    try:
+        with tracer.feature(feature, tweets=rows):
+            result["success"] = benchmark_features[feature](td) is not None
+    except Exception as exc:
+        result["success"] = False
+        result["error"] = "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))
+    timer.finish()
+    result["total"] = time.perf_counter() - start
+    result["stages"] = timer.stages
+    return result
+
+
+def measure_startup(modules=benchmark_startup_modules):     #czas importu modułu w nowym procesie, jak przy starcie programu
+    startup = dict()
+    code = "import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    for module in modules:
+        output = subprocess.run([sys.executable, "-c", code.format(module=module)], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+        startup[module] = float(output.split()[-1])
+    return startup
+
+
+def run_suite(sizes=benchmark_sizes, features=tuple(benchmark_features), repeat=1, seed=0, startup=True):
+    results = []
+    for rows in sizes:
+        source = SyntheticSource("benchmark", rows, seed=seed)      #jedno źródło na rozmiar, tweety generujemy raz
+        source.fetch(source.user_name, None, "2022-01-01", "2022-12-31", rows)
+        for feature in features:
+            runs = [run_benchmark(feature, rows, source) for _ in range(repeat)]
+            best = min(runs, key=lambda run: run["total"])     #najszybsze powtórzenie ma najmniej zakłóceń
+            best["runs"] = [run["total"] for run in runs]
+            best["first_run"] = {"total": runs[0]["total"], "stages": runs[0]["stages"]}    #z importami i wczytaniem modelu
+            results.append(best)
+            print("Benchmark - {feature}, tweety: {rows}, czas: {total:.3f} s{failed}"
+                  .format(failed="" if best["success"] else " (blad)", **best))
+    return {"meta": {"python": platform.python_version(), "pandas": pd.__version__, "platform": platform.platform(),
+                     "date": datetime.datetime.now().isoformat(timespec="seconds"), "seed": seed, "repeat": repeat},
+            "startup": measure_startup() if startup else dict(),
+            "results": results}
+
+
+def compare_results(current, baseline, tolerance=benchmark_tolerance, min_seconds=benchmark_min_seconds):
+    # etapy wolniejsze od zapisanych o więcej niż tolerance (i o więcej niż min_seconds, poniżej to szum pomiaru)
+    previous = {(result["feature"], result["rows"]): result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["feature"], result["rows"]))
+        if old is None:
+            continue
+        times = [("total", result["total"], old["total"])]
+        times += [(stage, seconds, old["stages"][stage]) for stage, seconds in result["stages"].items()
+                  if stage in old["stages"]]
+        for stage, seconds, old_seconds in times:
+            if seconds > old_seconds * (1 + tolerance) and seconds - old_seconds > min_seconds:
+                regressions.append({"feature": result["feature"], "rows": result["rows"], "stage": stage,
+                                    "baseline": old_seconds, "current": seconds,
+                                    "change": seconds / old_seconds - 1 if old_seconds else None})
+    for module, seconds in current.get("startup", dict()).items():
+        old_seconds = baseline.get("startup", dict()).get(module)
+        if old_seconds is not None and seconds > old_seconds * (1 + tolerance) and seconds - old_seconds > min_seconds:
+            regressions.append({"feature": "startup", "rows": None, "stage": module, "baseline": old_seconds,
+                                "current": seconds, "change": seconds / old_seconds - 1 if old_seconds else None})
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Pomiar czasu funkcjonalności TweeNspector na syntetycznych tweetach")
+    parser.add_argument("-n", "--sizes", type=int, nargs="+", default=benchmark_sizes,
+                        help="liczby tweetów (domyślnie {sizes})".format(sizes=benchmark_sizes))
+    parser.add_argument("-f", "--features", nargs="+", choices=list(benchmark_features),
+                        default=list(benchmark_features), help="mierzone funkcjonalności")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="powtórzenia, zapisujemy najszybsze")
+    parser.add_argument("--seed", type=int, default=0, help="ziarno generatora tweetów")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="plik wyników JSON")
+    parser.add_argument("-b", "--baseline", help="plik wyników do porównania, regresja kończy się kodem 1")
+    parser.add_argument("-t", "--tolerance", type=float, default=benchmark_tolerance,
+                        help="dopuszczalne spowolnienie względem wyników bazowych (0.2 = 20%%)")
+    parser.add_argument("--no-startup", action="store_true", help="bez pomiaru czasu importu modułów")
+    parser.add_argument("--trace", help="plik JSON lines ze śladem etapów (czas, wiersze, szczyt pamięci)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.trace:
+        tracer.enable(args.trace)
+    results = run_suite(args.sizes, args.features, args.repeat, args.seed, not args.no_startup)
+    with open(args.output, "w", encoding="utf-8") as file:
+        json.dump(results, file, ensure_ascii=False, indent=2)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline, encoding="utf-8") as file:
+        regressions = compare_results(results, json.load(file), args.tolerance)
+    for regression in regressions:
+        print("Benchmark - regresja {feature}, tweety: {rows}, etap: {stage}, {baseline:.3f} s -> {current:.3f} s"
+              .format(**regression))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
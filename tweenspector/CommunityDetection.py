@@ -0,0 +1,109 @@
+import multiprocessing
+import time
+from LazyImport import LazyModule
+from App_variables import *
+
+igraph = LazyModule("igraph")       #importowany przy pierwszym grupowaniu
+
+
+def run_method(graph, method):      #uruchomienie wybranej metody grupowania kont, krawędzie mają wagi
+    if method == "Optimal Modularity":
+        return graph.community_optimal_modularity(weights="weight")
+    elif method == "Spinglass":
+        return graph.community_spinglass(weights="weight")
+    elif method == "Label Propagation":
+        return graph.community_label_propagation(weights="weight")
+    elif method == "Infomap":
+        return graph.community_infomap(edge_weights="weight")
+    raise ValueError("Nieznana metoda grupowania kont: {method}".format(method=method))
+
+
+def graph_size(graph):
+    vertices = int(graph.vcount())
+    edges = int(graph.ecount())
+    density = edges / (vertices * (vertices - 1)) if vertices > 1 else 0.0
+    return vertices, edges, density
+
+
+def is_feasible(graph, method):     #czy metoda skończy się w rozsądnym czasie dla grafu tej wielkości
+    vertices, edges, density = graph_size(graph)
+    if method == "Optimal Modularity":      #czas wykładniczy
+        return vertices <= optimal_modularity_max_vertices and edges <= optimal_modularity_max_edges
+    elif method == "Spinglass":             #wymaga spójnego grafu
+        return vertices <= spinglass_max_vertices and bool(graph.is_connected(mode="weak"))
+    elif method == "Infomap":
+        return edges <= infomap_max_edges
+    return method == "Label Propagation"
+
+
+def choose_method(graph):       #najdokładniejsza metoda, która zmieści się w czasie
+    vertices, edges, density = graph_size(graph)
+    if is_feasible(graph, "Optimal Modularity"):
+        return "Optimal Modularity"
+    if density >= spinglass_min_density and is_feasible(graph, "Spinglass"):
+        return "Spinglass"
+    if is_feasible(graph, "Infomap"):
+        return "Infomap"
+    return "Label Propagation"
+
+
+def detect_worker(graph, method, connection):     #funkcja procesu roboczego, wynikiem jest przynależność wierzchołków
+    try:
+        connection.send(("ok", run_method(graph, method).membership))
+    except Exception as exc:
+        connection.send(("error", "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))))
+    finally:
+        connection.close()
+
+
+def run_in_process(graph, method, timeout):     #metodę uruchamiamy w osobnym procesie, który można przerwać
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=detect_worker, args=(graph, method, sender), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            raise TimeoutError("{method} przekroczyła limit {timeout} s".format(method=method, timeout=timeout))
+        status, value = receiver.recv()
+    except EOFError:
+        raise RuntimeError("Proces grupowania kont zakończył się bez wyniku")
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        receiver.close()
+    if status == "error":
+        raise RuntimeError(value)
+    return igraph.VertexClustering(graph, value, modularity_params={"weights": "weight"})
+
+
+def run_with_budget(graph, method, timeout):
+    if method == "Label Propagation" or graph_size(graph)[0] <= community_inline_max_vertices:
+        return run_method(graph, method)       #szybkie przypadki liczymy od razu, bez uruchamiania procesu
+    return run_in_process(graph, method, timeout)
+
+
+def detect_communities(graph, option, timeout=community_detection_timeout,
+                       fallback_timeout=community_fallback_timeout):   #grupowanie kont z limitem czasu
+    start = time.perf_counter()
+    method = option
+    if option == automatic_community_detection or not is_feasible(graph, option):
+        method = choose_method(graph)
+    attempts = [(method, timeout)]
+    if method not in ("Infomap", "Label Propagation") and is_feasible(graph, "Infomap"):
+        attempts.append(("Infomap", fallback_timeout))
+    if method != "Label Propagation":
+        attempts.append(("Label Propagation", None))      #zawsze szybka, więc jest ostatnią deską ratunku
+    for method, budget in attempts:
+        try:
+            comm = run_with_budget(graph, method, budget)
+            break
+        except Exception as exc:
+            if method == "Label Propagation":
+                raise
+            print("Community detection - {method} nie powiodla sie: {excType} {excMsg}"
+                  .format(method=method, excType=type(exc).__name__, excMsg=str(exc)))
+    info = {"requested": option, "method": method, "time": time.perf_counter() - start,
+            "fallback": method != attempts[0][0]}
+    return comm, info
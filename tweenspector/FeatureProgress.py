@@ -0,0 +1,63 @@
+import queue
+import threading
+from Tracing import tracer
+
+
+class FeatureCancelled(Exception):      #praca przerwana przez użytkownika
+    pass
+
+
+class FeatureProgress:      #postęp funkcjonalności przekazywany z wątku roboczego do okna przez kolejkę
+    def __init__(self, events=None):
+        self.events = events        #kolejka zdarzeń, None gdy nikt postępu nie śledzi
+        self.cancel_event = threading.Event()
+
+    def post(self, *event):
+        if self.events is not None:
+            self.events.put(event)
+
+    def stage(self, name):      #granica etapu - tutaj sprawdzamy, czy przerwać pracę
+        self.check_cancelled()
+        tracer.stage(name)
+        self.post("stage", name)
+
+    def update(self, done, total=None):     #np. liczba pobranych tweetów albo przetworzonych kont
+        tracer.rows(done)       #w śladzie etapu zostaje ostatnia liczba
+        self.post("progress", done, total)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise FeatureCancelled()
+
+    def poll(self):     #zdarzenia zebrane od ostatniego wywołania, bez czekania
+        events = []
+        while self.events is not None:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+
+class FeatureWorker(threading.Thread):      #funkcjonalność wykonywana w tle, okno pozostaje responsywne
+    def __init__(self, task, progress):
+        super().__init__(daemon=True)
+        self.task = task
+        self.progress = progress
+        self.result = None
+        self.error = None
+
+    def run(self):
+        try:
+            self.result = self.task()
+        except Exception as exc:        #błąd (lub przerwanie) przekazujemy do wątku okna
+            self.error = exc
+        finally:
+            self.progress.post("done")
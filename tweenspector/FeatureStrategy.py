@@ -1,9 +1,14 @@
 from TweetsData import TweetsData
+from Tracing import tracer
 
 
 class FeatureStrategy:
-    def __init__(self, user_name, search_words, date_from, date_to, tweets_count, option=0):
-        self.program_feature = TweetsData(user_name, search_words, date_from, date_to, tweets_count)
+    def __init__(self, user_name, search_words, date_from, date_to, tweets_count, option=0, tweet_cache=None,
+                 session_cache=None, interaction_store=None, progress=None, tweet_source=None, lemma_cache=None):
+        self.program_feature = TweetsData(user_name, search_words, date_from, date_to, tweets_count,
+                                          tweet_cache=tweet_cache, session_cache=session_cache,
+                                          interaction_store=interaction_store, progress=progress,
+                                          tweet_source=tweet_source, lemma_cache=lemma_cache)
         self.user_name = user_name
         self.tweets_count = tweets_count
         self.search_word = search_words
@@ -11,20 +16,30 @@ class FeatureStrategy:
         self.Until = date_to
         self.option = option
 
+    def trace(self):        #ślad całej funkcjonalności, etapy zapisuje FeatureProgress
+        return tracer.feature(type(self).__name__, user=self.user_name, tweets=self.tweets_count, option=self.option)
+
     def generate_image(self):
         raise NotImplementedError('Please implement this method')
 
+    def data(self):     #dane, z których powstał obraz (częstości słów, grupy kont, statystyki), None przy błędzie
+        return self.program_feature.result
+
 
 class UserWordConnection(FeatureStrategy):
     def generate_image(self):
-        return self.program_feature.generate_word_cloud()
+        with self.trace():
+            return self.program_feature.image if self.program_feature.generate_word_cloud() else None
 
 
 class RelatedPeopleConnection(FeatureStrategy):
     def generate_image(self):
-        return self.program_feature.generate_interconnections_network(self.option)
+        with self.trace():
+            return self.program_feature.image if self.program_feature.generate_interconnections_network(self.option) \
+                else None
 
 
 class AccountsInfo(FeatureStrategy):
     def generate_image(self):
-        return self.program_feature.generate_user_stats(self.option)
+        with self.trace():
+            return self.program_feature.image if self.program_feature.generate_user_stats(self.option) else None
@@ -0,0 +1,132 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from App_variables import crawl_depth, crawl_fetch_budget, crawl_check_every, crawl_stability_nmi, \
+    crawl_stable_checks, friends_fetch_workers
+from TweetsCorpus import get_corpus
+from LazyImport import LazyModule
+
+igraph = LazyModule("igraph")
+
+
+def mentioned_accounts(account, tweets):        #konto -> liczba tweetów, w których je wspomniano
+    if tweets.empty:
+        return dict()
+    return {mt: count for mt, count in get_corpus(tweets).index.mention_counts.items() if mt != account}
+
+
+def community_membership(accounts, relations):      #szybkie grupowanie (Louvain) do sprawdzania, czy struktura się zmienia
+    position = {account: i for i, account in enumerate(accounts)}
+    edges = []
+    weights = []
+    for source, mentioned in relations.items():
+        for target, count in mentioned.items():
+            if source in position and target in position:
+                edges.append((position[source], position[target]))
+                weights.append(count)
+    g = igraph.Graph(n=len(accounts), edges=edges, directed=False, edge_attrs={"weight": weights})
+    g.simplify(combine_edges="sum")
+    return dict(zip(accounts, g.community_multilevel(weights="weight").membership))
+
+
+def membership_similarity(previous, current):       #NMI podziałów na kontach obecnych w obu grafach
+    accounts = [account for account in previous if account in current]
+    before = [previous[account] for account in accounts]
+    after = [current[account] for account in accounts]
+    if len(set(before)) == 1 and len(set(after)) == 1:
+        return 1.0
+    return igraph.compare_communities(before, after, method="nmi")
+
+
+class Frontier:     #kolejka kont do pobrania, najpierw konta najczęściej wspominane
+    def __init__(self):
+        self.heap = []
+        self.counts = dict()
+        self.hops = dict()
+        self.visited = set()        #konta pobrane lub w trakcie pobierania
+
+    def add(self, account, count, hop):
+        if account in self.visited:
+            return
+        self.counts[account] = self.counts.get(account, 0) + count
+        self.hops[account] = min(hop, self.hops.get(account, hop))
+        heapq.heappush(self.heap, (-self.counts[account], self.hops[account], account))
+
+    def pop(self):      #stare wpisy (sprzed zwiększenia liczby wspominków) pomijamy
+        while self.heap:
+            count, hop, account = heapq.heappop(self.heap)
+            if account in self.visited or -count != self.counts[account]:
+                continue
+            self.visited.add(account)
+            return account, hop
+        return None
+
+
+class InteractionCrawler:       #przeszukiwanie sieci wspominków do zadanej głębokości z limitem pobrań
+    def __init__(self, fetch, depth=crawl_depth, fetch_budget=crawl_fetch_budget, max_workers=friends_fetch_workers,
+                 check_every=crawl_check_every, on_fetched=None):
+        self.fetch = fetch                  #funkcja zwracająca wspominki konta (konto -> liczba tweetów)
+        self.on_fetched = on_fetched        #wywoływana z liczbą pobranych i znanych kont, może przerwać pracę wyjątkiem
+        self.depth = depth                  #1 oznacza konto i konta, o których ono wspomina
+        self.fetch_budget = fetch_budget    #maksymalna liczba pobranych kont, None bez limitu
+        self.max_workers = max_workers
+        self.check_every = check_every
+        self.accounts = []
+        self.relations = dict()
+        self.stopped_early = False
+
+    def add_account(self, account, mentions, hop, frontier):
+        self.accounts.append(account)
+        self.relations[account] = mentions
+        if hop < self.depth:
+            for mt, count in self.relations[account].items():
+                frontier.add(mt, count, hop + 1)
+
+    def structure_is_stable(self, state):       #czy nowe konta przestały zmieniać podział na grupy
+        membership = community_membership(self.accounts, self.relations)
+        if state["membership"] is not None and membership_similarity(state["membership"], membership) >= crawl_stability_nmi:
+            state["stable"] += 1
+        else:
+            state["stable"] = 0
+        state["membership"] = membership
+        return state["stable"] >= crawl_stable_checks
+
+    def crawl(self, root, root_mentions):       #zwraca listę pobranych kont i ich wspominki o innych pobranych kontach
+        frontier = Frontier()
+        frontier.visited.add(root)
+        self.add_account(root, root_mentions, 0, frontier)
+        fetched = 0
+        state = {"membership": None, "stable": 0}
+        running = dict()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)    #tweety kont pobieramy równolegle
+        try:
+            while True:
+                while len(running) < self.max_workers and \
+                        (self.fetch_budget is None or fetched + len(running) < self.fetch_budget):
+                    item = frontier.pop()
+                    if item is None:
+                        break
+                    running[executor.submit(self.fetch, item[0])] = item
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:     #interakcje zliczamy od razu po pobraniu tweetów danego konta
+                    account, hop = running.pop(future)
+                    self.add_account(account, future.result(), hop, frontier)
+                    fetched += 1
+                    if self.on_fetched is not None:
+                        known = len(frontier.counts)
+                        self.on_fetched(fetched, known if self.fetch_budget is None else min(known, self.fetch_budget))
+                    #przy głębokości 1 potrzebne jest całe sąsiedztwo, głębiej kończymy, gdy grupy się ustabilizują
+                    if self.depth > 1 and self.check_every and fetched % self.check_every == 0 \
+                            and self.structure_is_stable(state):
+                        self.stopped_early = True
+                if self.stopped_early:
+                    break
+        finally:
+            for future in running:      #po błędzie lub zatrzymaniu nie czekamy na pozostałe pobrania
+                future.cancel()
+            executor.shutdown(wait=False)
+        accounts = set(self.accounts)
+        relations = {account: {mt: count for mt, count in mentioned.items() if mt in accounts}
+                     for account, mentioned in self.relations.items()}
+        return self.accounts, relations
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import threading
+import time
+from App_variables import interactions_db_path, interactions_ttl, missing_account_ttl
+
+
+def interactions_scope(search_words, date_from, date_to, num_of_tweets):    #wspominki zależą od parametrów pobierania
+    return "{words}|{since}|{until}|{count}".format(words=search_words or "", since=date_from, until=date_to,
+                                                     count=num_of_tweets)
+
+
+def interaction_store_for(source, path=interactions_db_path):     #jak tweet_cache_for - osobna baza dla źródła tweetów
+    name = getattr(source, "cache_name", None)
+    if name is None:
+        return None
+    if not name:
+        return InteractionStore(path)
+    root, extension = os.path.splitext(path)
+    return InteractionStore("{root}-{name}{extension}".format(root=root, name=name, extension=extension))
+
+
+class InteractionStore:     #graf interakcji zapisany na dysku (SQLite), aktualizowany konto po koncie
+    def __init__(self, path=interactions_db_path, ttl=interactions_ttl, missing_ttl=missing_account_ttl):
+        self.path = path
+        self.ttl = ttl                      #po tylu sekundach wspominki konta pobieramy ponownie
+        self.missing_ttl = missing_ttl      #a po tylu ponawiamy próbę dla kont bez tweetów
+        self.lock = threading.Lock()
+        self.created = False
+
+    def connect(self):      #osobne połączenie dla każdej operacji, bo konta pobierane są w wielu wątkach
+        if not self.created:        #plik bazy tworzymy dopiero przy pierwszym użyciu
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        if not self.created:
+            with connection:
+                connection.execute("CREATE TABLE IF NOT EXISTS accounts (scope TEXT, account TEXT, fetched_at REAL, "
+                                   "missing INTEGER, PRIMARY KEY (scope, account))")
+                connection.execute("CREATE TABLE IF NOT EXISTS relations (scope TEXT, source TEXT, target TEXT, "
+                                   "count INTEGER, PRIMARY KEY (scope, source, target))")
+            self.created = True
+        return connection
+
+    def get_mentions(self, scope, account, now=None):    #zapisane wspominki konta lub None, gdy trzeba je pobrać
+        now = time.time() if now is None else now
+        with self.lock:
+            connection = self.connect()
+            try:
+                row = connection.execute("SELECT fetched_at, missing FROM accounts WHERE scope = ? AND account = ?",
+                                         (scope, account)).fetchone()
+                if row is None:
+                    return None
+                fetched_at, missing = row
+                if now - fetched_at > (self.missing_ttl if missing else self.ttl):
+                    return None
+                rows = connection.execute("SELECT target, count FROM relations WHERE scope = ? AND source = ?",
+                                          (scope, account)).fetchall()
+                return {target: count for target, count in rows}
+            finally:
+                connection.close()
+
+    def store_mentions(self, scope, account, mentions, missing=False, now=None):     #podmiana wspominków jednego konta
+        now = time.time() if now is None else now
+        with self.lock:
+            connection = self.connect()
+            try:
+                with connection:
+                    connection.execute("INSERT OR REPLACE INTO accounts VALUES (?, ?, ?, ?)",
+                                       (scope, account, now, int(missing)))
+                    connection.execute("DELETE FROM relations WHERE scope = ? AND source = ?", (scope, account))
+                    connection.executemany("INSERT INTO relations VALUES (?, ?, ?, ?)",
+                                           [(scope, account, target, int(count)) for target, count in mentions.items()])
+            finally:
+                connection.close()
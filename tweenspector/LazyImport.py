@@ -0,0 +1,32 @@
+import importlib
+
+
+class LazyModule:       #moduł (albo jego atrybut, np. klasa) importowany dopiero przy pierwszym użyciu
+    # własne metody mają przedrostek _lazy, żeby nie zasłaniać atrybutów modułu (np. spacy.load)
+    def __init__(self, name, attribute=None):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_attribute"] = attribute
+        self.__dict__["_lazy_target"] = None
+
+    def _lazy_load(self):     #import_module jest bezpieczny wątkowo, kolejne wywołania zwracają gotowy obiekt
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            target = importlib.import_module(self._lazy_name)
+            if self._lazy_attribute is not None:
+                target = getattr(target, self._lazy_attribute)
+            self.__dict__["_lazy_target"] = target
+        return target
+
+    def _lazy_loaded(self):
+        return self.__dict__["_lazy_target"] is not None
+
+    def __getattr__(self, name):
+        return getattr(self._lazy_load(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._lazy_load()(*args, **kwargs)
+
+    def __repr__(self):
+        return "<LazyModule {name}{attribute}{state}>".format(
+            name=self._lazy_name, attribute="." + self._lazy_attribute if self._lazy_attribute else "",
+            state="" if self._lazy_loaded() else " (not loaded)")
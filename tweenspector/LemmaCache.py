@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from App_variables import lemma_cache_path, lemma_cache_max_size, lemmatizer_language
+from LazyImport import LazyModule
+
+spacy = LazyModule("spacy")
+tokenizers = dict()     #język -> tokenizer spaCy bez modelu
+tokenizers_lock = threading.Lock()
+
+
+def language_tokenizer(language=lemmatizer_language):
+    # te same reguły podziału na tokeny co w modelu języka (skróty typu "np.", słowa z łącznikiem), ale bez
+    # wczytywania modelu - teksty z cache dają więc te same tokeny, co lematyzacja modelem
+    with tokenizers_lock:
+        if language not in tokenizers:
+            tokenizers[language] = spacy.blank(language).tokenizer
+        return tokenizers[language]
+
+
+def normalize_token(token):     #ten sam zapis znaków z ogonkami (NFC), niezależnie od źródła tekstu
+    return unicodedata.normalize("NFC", token)
+
+
+class LemmaCache:       #token -> lemat z poprzednich lematyzacji (SQLite), najdawniej użyte tokeny wypadają
+    def __init__(self, path=lemma_cache_path, max_size=lemma_cache_max_size):
+        self.path = path
+        self.max_size = max_size
+        self.entries = None         #(język, token) -> lemat, od najdawniej do ostatnio użytego
+        self.touched = set()        #klucze użyte od ostatniego zapisu
+        self.lock = threading.Lock()
+
+    def connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:       #plik bazy tworzymy dopiero przy pierwszym zapisie
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        with connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS lemmas (language TEXT, token TEXT, lemma TEXT, "
+                               "used INTEGER, PRIMARY KEY (language, token))")
+        return connection
+
+    def load(self):     #cały cache trafia do pamięci przy pierwszym użyciu, wyszukiwanie tokenów jest w słowniku
+        if self.entries is not None:
+            return
+        self.entries = OrderedDict()
+        if not os.path.exists(self.path):
+            return
+        connection = self.connect()
+        try:
+            rows = connection.execute("SELECT language, token, lemma FROM lemmas ORDER BY used").fetchall()
+        finally:
+            connection.close()
+        for language, token, lemma in rows[-self.max_size:]:
+            self.entries[(language, token)] = lemma
+
+    def lookup(self, language, tokens):     #lematy wszystkich tokenów albo None, gdy choć jednego brakuje
+        with self.lock:
+            self.load()
+            keys = [(language, normalize_token(token)) for token in tokens]
+            lemmas = []
+            for key in keys:
+                lemma = self.entries.get(key)
+                if lemma is None:
+                    return None
+                lemmas.append(lemma)
+            for key in keys:
+                self.entries.move_to_end(key)
+            self.touched.update(keys)
+            return lemmas
+
+    def put(self, language, token, lemma):      #pierwszy zapamiętany lemat tokenu zostaje, także gdy model w innym kontekście da inny
+        key = (language, normalize_token(token))
+        with self.lock:
+            self.load()
+            self.entries.setdefault(key, lemma)
+            self.entries.move_to_end(key)
+            self.touched.add(key)
+            while len(self.entries) > self.max_size:
+                self.touched.discard(self.entries.popitem(last=False)[0])
+
+    def __len__(self):
+        with self.lock:
+            self.load()
+            return len(self.entries)
+
+    def save(self):     #zapis użytych tokenów; inne procesy mogły w tym czasie dopisać swoje, więc nie nadpisujemy całości
+        with self.lock:
+            if not self.touched:
+                return
+            used = [key for key in self.entries if key in self.touched]     #kolejność od najdawniej użytego
+            connection = self.connect()
+            try:
+                with connection:
+                    base = connection.execute("SELECT COALESCE(MAX(used), 0) FROM lemmas").fetchone()[0]
+                    rows = [(language, token, self.entries[(language, token)], base + i + 1)
+                            for i, (language, token) in enumerate(used)]
+                    # lemat zapisany wcześniej przez inny proces zostaje, zmieniamy tylko czas użycia
+                    connection.executemany("INSERT OR IGNORE INTO lemmas VALUES (?, ?, ?, ?)", rows)
+                    connection.executemany("UPDATE lemmas SET used = ? WHERE language = ? AND token = ?",
+                                           [(used_at, language, token) for language, token, _, used_at in rows])
+                    connection.execute("DELETE FROM lemmas WHERE rowid IN "
+                                       "(SELECT rowid FROM lemmas ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                                       (self.max_size,))
+            finally:
+                connection.close()
+            self.touched.clear()
+
+
+def split_cached(texts, cache, language=lemmatizer_language, tokenizer=None):
+    # lematy tekstów, których wszystkie tokeny są w cache, oraz teksty, które musi przetworzyć model
+    tokenizer = tokenizer or language_tokenizer(language)
+    known = []
+    missing = []
+    for text, doc in zip(texts, tokenizer.pipe(texts)):
+        lemmas = cache.lookup(language, [t.text for t in doc if not t.is_space])
+        if lemmas is None:
+            missing.append(text)
+        else:
+            known.append(lemmas)
+    return known, missing
+
+
+def remember_lemmas(docs, cache, language=lemmatizer_language):     #pary (token, lemat) z modelu trafiają do cache
+    for pairs in docs:
+        lemmas = []
+        for token, lemma in pairs:
+            if cache is not None and not token.isspace():     #odstępy nie dają słów, pomijamy je też w split_cached
+                cache.put(language, token, lemma)
+            lemmas.append(lemma)
+        yield lemmas
@@ -0,0 +1,248 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import secrets
+import sys
+import threading
+import time
+from multiprocessing.connection import Listener, Client
+from App_variables import *
+from LazyImport import LazyModule
+
+spacy = LazyModule("spacy")
+service_state = dict()      #model spaCy i stopwords w procesie, który lematyzuje
+unavailable_until = dict()      #adres -> czas, do którego nie próbujemy ponownie łączyć się z serwisem
+
+
+def read_service_key(path=lemmatizer_service_key_path):     #None, gdy pliku nie ma albo mogą go czytać inni użytkownicy
+    try:
+        if os.name == "posix":
+            info = os.stat(path)
+            if info.st_uid != os.getuid() or info.st_mode & 0o077:
+                print("Lemmatizer service - plik klucza dostepny dla innych uzytkownikow, pomijamy:", path)
+                return None
+        with open(path, "rb") as file:
+            return file.read() or None
+    except OSError:
+        return None
+
+
+def create_service_key(path=lemmatizer_service_key_path):     #losowy klucz użytkownika w pliku z prawami 0600
+    key = read_service_key(path)
+    if key is not None:
+        return key
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    key = secrets.token_bytes(32)
+    try:
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:     #inny serwis utworzył klucz w tym samym momencie
+        key = read_service_key(path)
+        if key is None:
+            raise RuntimeError("Nie mozna odczytac klucza serwisu: {path}".format(path=path))
+        return key
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(key)
+    return key
+
+
+def send_message(connection, message):     #tylko JSON - pickle z połączenia mógłby uruchomić dowolny kod
+    connection.send_bytes(json.dumps(message).encode("utf-8"))
+
+
+def receive_message(connection):
+    return json.loads(connection.recv_bytes(lemmatizer_service_max_message))
+
+
+def init_service_worker(model=lemmatizer_model):     #każdy proces roboczy serwisu wczytuje model raz
+    try:
+        nlp = spacy.load(model, exclude=lemmatizer_excluded_components)
+    except Exception as exc:    #błąd zgłaszamy przy pierwszym zadaniu - wyjątek tutaj pula ponawiałaby bez końca
+        service_state["error"] = "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))
+        return
+    stopwords = set(nlp.Defaults.stop_words)
+    stopwords.add("RT")
+    service_state["nlp"] = nlp
+    service_state["stopwords"] = stopwords
+
+
+def service_stopwords():
+    if "error" in service_state:
+        raise RuntimeError(service_state["error"])
+    return service_state["stopwords"]
+
+
+def lemmatize_texts(texts, batch_size=lemmatizer_batch_size):    #dla każdego tekstu pary (token, lemat)
+    service_stopwords()     #zgłasza błąd wczytania modelu
+    return [[(t.text, t.lemma_) for t in doc] for doc in service_state["nlp"].pipe(texts, batch_size=batch_size)]
+
+
+class LemmatizerService:        #lokalny serwis z pulą procesów trzymających model, wspólny dla wielu kopii programu
+    def __init__(self, address=lemmatizer_service_listen, model=lemmatizer_model,
+                 workers=lemmatizer_service_workers, authkey=None):
+        self.requested_address = address
+        self.model = model
+        self.workers = workers      #0 - lematyzacja w procesie serwisu, bez puli
+        self.authkey = authkey      #None - klucz z pliku lemmatizer_service_key_path, tworzony przy pierwszym starcie
+        self.pool = None
+        self.listener = None
+        self.inline_lock = threading.Lock()     #jeden model w procesie serwisu nie jest używany równolegle
+        self.closed = False
+
+    def start(self):
+        if self.workers > 0:
+            self.pool = multiprocessing.get_context("spawn").Pool(self.workers, initializer=init_service_worker,
+                                                                  initargs=(self.model,))
+            try:
+                self.pool.apply(service_stopwords)      #czekamy, aż model będzie gotowy
+            except Exception:
+                self.pool.terminate()
+                raise
+        else:
+            init_service_worker(self.model)
+            service_stopwords()
+        if self.authkey is None:
+            self.authkey = create_service_key()
+        self.listener = Listener(self.requested_address, authkey=self.authkey)
+        return self
+
+    @property
+    def address(self):
+        return self.listener.address
+
+    def stopwords(self):
+        return service_stopwords() if self.pool is None else self.pool.apply(service_stopwords)
+
+    def lemmatize(self, texts):     #paczka od klienta dzielona między procesy robocze, kolejność zostaje
+        if self.pool is None:
+            with self.inline_lock:
+                return lemmatize_texts(texts)
+        size = max(1, math.ceil(len(texts) / self.workers))
+        parts = self.pool.map(lemmatize_texts, [texts[i:i + size] for i in range(0, len(texts), size)])
+        return [lemmas for part in parts for lemmas in part]
+
+    def execute(self, request):     #zapytanie to lista JSON: [polecenie, argumenty...]
+        command = request[0] if isinstance(request, list) and request else None
+        if command == "lemmatize":
+            texts = request[1] if len(request) > 1 else None
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise ValueError("lemmatize wymaga listy tekstow")
+            return self.lemmatize(texts)
+        if command == "stopwords":
+            return sorted(self.stopwords())
+        if command == "ping":
+            return self.model
+        raise ValueError("Nieznane polecenie: {command}".format(command=command))
+
+    def handle(self, connection):       #zapytania jednego klienta, do zamknięcia połączenia
+        with connection:
+            while True:
+                try:
+                    message = connection.recv_bytes(lemmatizer_service_max_message)
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ["ok", self.execute(json.loads(message))]
+                except Exception as exc:
+                    reply = ["error", "{excType} {excMsg}".format(excType=type(exc).__name__, excMsg=str(exc))]
+                send_message(connection, reply)
+
+    def serve_forever(self):
+        while not self.closed:
+            try:
+                connection = self.listener.accept()
+            except multiprocessing.AuthenticationError:
+                continue
+            except OSError:
+                break
+            if self.closed:
+                connection.close()
+                break
+            threading.Thread(target=self.handle, args=(connection,), daemon=True).start()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.listener is not None:
+            try:
+                Client(self.address, authkey=self.authkey).close()      #budzimy accept() czekające na klienta
+            except (OSError, EOFError, multiprocessing.AuthenticationError):
+                pass
+            self.listener.close()
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+
+class LemmatizerClient:     #połączenie z LemmatizerService, tweety wysyłamy paczkami
+    def __init__(self, connection):
+        self.connection = connection
+
+    def request(self, *request):
+        send_message(self.connection, list(request))
+        status, value = receive_message(self.connection)
+        if status != "ok":
+            raise RuntimeError("Lemmatizer service - {message}".format(message=value))
+        return value
+
+    def stopwords(self):
+        return set(self.request("stopwords"))
+
+    def lemmatize(self, texts, batch_size=lemmatizer_batch_size):     #pary (token, lemat) kolejnych tekstów, paczka po paczce
+        for start in range(0, len(texts), batch_size):
+            for pairs in self.request("lemmatize", texts[start:start + batch_size]):
+                yield [tuple(pair) for pair in pairs]
+
+    def close(self):
+        self.connection.close()
+
+
+def connect_lemmatizer_service(address=lemmatizer_service_address, authkey=None):
+    # None, gdy serwis nie działa - wtedy model wczytujemy w tym procesie; nieudaną próbę pamiętamy przez chwilę
+    if address is None or time.monotonic() < unavailable_until.get(address, 0):
+        return None
+    if authkey is None:
+        authkey = read_service_key()
+        if authkey is None:     #bez klucza użytkownika nie łączymy się z nikim, kto nasłuchuje na tym porcie
+            return None
+    try:
+        return LemmatizerClient(Client(address, authkey=authkey))
+    except multiprocessing.AuthenticationError:     #serwis działa, ale z innym kluczem
+        print("Lemmatizer service - bledny klucz, adres:", address)
+        return None
+    except (OSError, EOFError):
+        unavailable_until[address] = time.monotonic() + lemmatizer_service_retry
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serwis lematyzacji TweeNspector - model spaCy wczytany raz")
+    parser.add_argument("--host", default=lemmatizer_service_listen[0], help="adres nasłuchiwania")
+    parser.add_argument("--port", type=int, default=lemmatizer_service_listen[1], help="port nasłuchiwania")
+    parser.add_argument("-w", "--workers", type=int, default=lemmatizer_service_workers,
+                        help="procesy robocze z modelem (0 - lematyzacja w procesie serwisu)")
+    parser.add_argument("-m", "--model", default=lemmatizer_model, help="model spaCy")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    service = LemmatizerService((args.host, args.port), args.model, args.workers).start()
+    print("Lemmatizer service - model: {model}, adres: {address}, klucz: {key}"
+          .format(model=args.model, address=service.address, key=lemmatizer_service_key_path))
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
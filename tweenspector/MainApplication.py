@@ -2,9 +2,6 @@
 import tkinter as tk
 from tkinter import ttk
 from tkinter.filedialog import asksaveasfile
-import matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.image as img
 from tkcalendar import DateEntry
 from datetime import datetime
 from PIL import ImageTk, Image
@@ -12,9 +9,17 @@ import datetime
 from datetime import date
 from App_variables import *
 from FeatureStrategy import UserWordConnection, RelatedPeopleConnection, AccountsInfo
-from TweetsData import TweetsData, save_tweets_df_to_csv
+from TweetsData import TweetsData, save_tweets_df_to_csv, save_tweets_df_to_snapshot, preload_lemmatizer
+from LemmatizerService import connect_lemmatizer_service
+from TweetCache import tweet_cache_for, session_cache
+from TweetSource import create_tweet_source
+from InteractionStore import interaction_store_for
+from LemmaCache import LemmaCache
+from FeatureProgress import FeatureProgress, FeatureWorker, FeatureCancelled
 from sys import platform
 import os
+import multiprocessing
+import queue
 
 
 def remove_widgets(*item_list):
@@ -55,6 +60,16 @@ class MainApplication:
         self.community_detection_method_l = []
         self.community_detection_method = []
         self.feature_strategy = None
+        self.tweet_source = create_tweet_source(default_tweet_source)  # twint, archive file or local server
+        self.tweet_cache = tweet_cache_for(self.tweet_source)  # tweets cache shared by all features and CSV export
+        self.interaction_store = interaction_store_for(self.tweet_source)  # interactions graph kept between runs
+        self.lemma_cache = LemmaCache()  # lemmas of tokens seen in earlier word clouds
+        self.progress = None  # progress of the feature running in the background
+        self.feature_worker = None
+        self.progress_l = None
+        self.progress_pb = None
+        self.cancel_b = None
+        self.progress_stage = ""
 
         self.user_name, self.search_words, self.date_from, self.date_to, self.tweets_count = \
             None, None, None, None, None
@@ -166,8 +181,7 @@ class MainApplication:
                 self.community_detection_method = event.widget.get()
 
             self.community_detection_method_cb = ttk.Combobox(self.main_f, font=small_font)
-            self.community_detection_method_cb["values"] = ("Optimal Modularity", "Spinglass",
-                                                            "Label Propagation", "Infomap")
+            self.community_detection_method_cb["values"] = community_detection_methods
             self.community_detection_method_cb.current(0)
             self.community_detection_method_cb.grid(column=2, row=14, pady=(10, 0),
                                                     padx=(20, 0), sticky="nw")
@@ -240,48 +254,140 @@ class MainApplication:
         if feature == "Nie wybrano":
             tk.messagebox.showerror("Błąd", "Proszę wybrać jedną z funkcjonalności")
             return
+        self.progress = FeatureProgress(queue.Queue())
         self.configure_feature_strategy(feature, self.user_name, self.search_words, self.date_from,
                                         self.date_to, self.tweets_count,
-                                        self.stats_option, self.community_detection_method)
+                                        self.stats_option, self.community_detection_method, progress=self.progress)
+        self.show_progress()
+        # feature runs in a background thread, the window keeps handling events
+        self.feature_worker = FeatureWorker(self.feature_strategy.generate_image, self.progress)
+        self.feature_worker.start()
+        self.parent.after(progress_poll_interval, self.poll_feature)
+
+    def show_progress(self):
+        self.nav_b[0]["state"] = "disabled"  # one feature at a time
+        self.progress_stage = ""
+        self.progress_l = tk.Label(self.main_f, text="", fg="white", bg=bg, font=small_font)
+        self.progress_l.grid(row=16, column=1, pady=(20, 0), padx=(100, 0), sticky="nw")
+        self.progress_pb = ttk.Progressbar(self.main_f, mode="indeterminate", length=250)
+        self.progress_pb.grid(row=16, column=2, pady=(20, 0), padx=(20, 0), sticky="nw")
+        self.progress_pb.start()
+        self.cancel_b = tk.Button(self.main_f, text="Anuluj", command=self.cancel_feature, font=small_font)
+        self.cancel_b.grid(row=17, column=2, pady=(10, 0), padx=(20, 0), sticky="nw")
+
+    def hide_progress(self):
+        remove_widgets(self.progress_l, self.progress_pb, self.cancel_b)
+        self.progress_l, self.progress_pb, self.cancel_b = None, None, None
+        self.nav_b[0]["state"] = "normal"
+
+    def cancel_feature(self):
+        self.progress.cancel()  # worker stops at the next stage boundary
+        self.progress_l.config(text="Przerywanie...")
+        self.cancel_b["state"] = "disabled"
+
+    def poll_feature(self):
+        # progress events posted by the worker thread are handled in the Tk event loop
+        for event in self.progress.poll():
+            if event[0] == "stage":
+                self.progress_stage = event[1]
+                if not self.progress.cancelled:
+                    self.progress_l.config(text=self.progress_stage)
+                self.progress_pb.config(mode="indeterminate", value=0)
+                self.progress_pb.start()
+            elif event[0] == "progress" and not self.progress.cancelled:
+                done, total = event[1], event[2]
+                if total:
+                    self.progress_pb.stop()
+                    self.progress_pb.config(mode="determinate", maximum=total, value=done)
+                    self.progress_l.config(text="{stage}: {done}/{total}".format(stage=self.progress_stage,
+                                                                                 done=done, total=total))
+                else:
+                    self.progress_l.config(text="{stage}: {done}".format(stage=self.progress_stage, done=done))
+        if self.feature_worker.is_alive():
+            self.parent.after(progress_poll_interval, self.poll_feature)
+            return
+        self.hide_progress()
+        self.finish_feature(self.feature_worker)
 
-        if not self.feature_strategy.generate_image():
+    def finish_feature(self, worker):
+        if isinstance(worker.error, FeatureCancelled):
+            return
+        if worker.error is not None:
+            tk.messagebox.showerror("Błąd", "Coś poszło nie tak: {excType} {excMsg}"
+                                    .format(excType=type(worker.error).__name__, excMsg=str(worker.error)))
+        elif not worker.result:
             tk.messagebox.showerror("Błąd", "Podany użytkownik nie istnieje, został zablokowany lub nie "
                                             "opublikował "
                                             "żadnych tweetów spełniających warunki wyszukiwania")
         else:
-            image = img.imread("images/file.png")
-            matplotlib.use("TkAgg")
-            plt.figure(figsize=(12, 5))
-            plt.axis("off"), plt.imshow(image)
-            plt.tight_layout()
-            plt.show(block=False)  # helps with terminate program
+            self.show_image(worker.result)
+
+    def show_image(self, image):
+        # image is shown straight from memory, a file is written only when the user saves it
+        window = tk.Toplevel(self.parent)
+        window.title("TweeNspector")
+        window.configure(bg=bg)
+        preview = image.copy()
+        preview.thumbnail(preview_max_size)  # large graphs are scaled down only for display
+        window.photo = ImageTk.PhotoImage(preview)
+        tk.Label(window, image=window.photo, bg=bg).pack()
+        tk.Button(window, text="Zapisz obraz", font=small_font,
+                  command=lambda: self.save_image(image)).pack(pady=10)
+
+    def save_image(self, image):
+        data = [('png file(*.png)', '*.png'),
+                ('All types(*.*)', '*.*')]
+        file = asksaveasfile(mode="wb", filetypes=data, defaultextension=".png")
+        if file:
+            with file:
+                image.save(file, format="PNG")
 
     def configure_feature_strategy(self, feature, user_name, search_words, date_from, date_to, tweets_count,
                                    stats_option,
-                                   community_detection_method):
+                                   community_detection_method, progress=None):
         if feature == "Najczęstsze słowa":
-            self.feature_strategy = UserWordConnection(user_name, search_words, date_from, date_to, tweets_count)
+            self.feature_strategy = UserWordConnection(user_name, search_words, date_from, date_to, tweets_count,
+                                                       tweet_cache=self.tweet_cache, session_cache=session_cache,
+                                                       progress=progress, tweet_source=self.tweet_source,
+                                                       lemma_cache=self.lemma_cache)
         elif feature == "Powiązane konta":
             self.feature_strategy = RelatedPeopleConnection(user_name, search_words, date_from, date_to,
-                                                            tweets_count, community_detection_method)
+                                                            tweets_count, community_detection_method,
+                                                            tweet_cache=self.tweet_cache,
+                                                            session_cache=session_cache,
+                                                            interaction_store=self.interaction_store,
+                                                            progress=progress, tweet_source=self.tweet_source)
         elif feature == "Statystyki użytkownika":
             self.feature_strategy = AccountsInfo(user_name, search_words, date_from, date_to, tweets_count,
-                                                 stats_option)
+                                                 stats_option, tweet_cache=self.tweet_cache,
+                                                 session_cache=session_cache, progress=progress,
+                                                 tweet_source=self.tweet_source)
         return True
 
     def save_csv(self):
         if not self.propagate_params():
             return
-        td = TweetsData(self.user_name, self.search_words, self.date_from, self.date_to, self.tweets_count)
+        td = TweetsData(self.user_name, self.search_words, self.date_from, self.date_to, self.tweets_count,
+                        tweet_cache=self.tweet_cache, session_cache=session_cache, tweet_source=self.tweet_source)
         df = td.get_tweets(self.user_name, self.search_words, self.date_from, self.date_to, self.tweets_count)
         data = [('All types(*.*)', '*.*'),
-                ('csv file(*.csv)', '*.csv')]
+                ('csv file(*.csv)', '*.csv'),
+                ('Arrow snapshot(*.feather)', '*.feather')]
         file = asksaveasfile(filetypes=data, defaultextension=data)
         if file:
-            save_tweets_df_to_csv(file.name, df)
+            if str(file.name).endswith(".feather"):  # keeps column types and hashtag lists, loads much faster
+                save_tweets_df_to_snapshot(file.name, df)
+            else:
+                save_tweets_df_to_csv(file.name, df)
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()       #grupowanie kont działa w osobnym procesie także w wersji spakowanej
+    lemmatizer_service = connect_lemmatizer_service()
+    if lemmatizer_service is not None:      #działający serwis lematyzacji ma już model, nie wczytujemy drugiego
+        lemmatizer_service.close()
+    elif lemmatizer_preload:      #model spaCy wczytuje się, gdy użytkownik wypełnia formularz
+        preload_lemmatizer()
     root = tk.Tk()
     MainApplication(root)
     root.mainloop()
@@ -48,7 +48,18 @@ a = Analysis(
         "pycares",
         "pycares-4.2.2.dist-info",
         "pycparser",
-        "pycparser-2.21.dist-info"
+        "pycparser-2.21.dist-info",
+        # imported lazily by LazyModule (importlib), invisible to the analysis of import statements
+        "spacy",
+        "spacy.lang.pl",
+        "twint",
+        "igraph",
+        "wordcloud",
+        "matplotlib",
+        "matplotlib.pyplot",
+        "cairo",
+        "pyarrow",
+        "pyarrow.feather"
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,71 @@
+import multiprocessing
+import threading
+import time
+from App_variables import host_requests_per_second, host_requests_burst
+
+
+class RateLimiter:      #ogranicznik liczby zapytań na sekundę (token bucket), bezpieczny dla wielu wątków
+    def __init__(self, rate, burst=1):
+        self.rate = rate            #liczba zapytań na sekundę, None lub 0 wyłącza ograniczenie
+        self.capacity = max(1, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):      #czekamy, aż będzie można wysłać kolejne zapytanie
+        if not self.rate or self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedRateLimiter(RateLimiter):     #ten sam token bucket w pamięci współdzielonej przez procesy robocze
+    def __init__(self, rate, burst=1, context=None):
+        self.state = (context or multiprocessing.get_context()).Array("d", 2)     #tokeny i czas ostatniej zmiany
+        super().__init__(rate, burst)
+        self.lock = self.state.get_lock()
+
+    @property
+    def tokens(self):
+        return self.state[0]
+
+    @tokens.setter
+    def tokens(self, value):
+        self.state[0] = value
+
+    @property
+    def updated(self):
+        return self.state[1]
+
+    @updated.setter
+    def updated(self, value):
+        self.state[1] = value
+
+
+rate_limiters = dict()
+rate_limiters_lock = threading.Lock()
+
+
+def host_rate_limiter(host):        #jeden ogranicznik na hosta, wspólny dla całego procesu
+    with rate_limiters_lock:
+        if host not in rate_limiters:
+            rate_limiters[host] = RateLimiter(host_requests_per_second.get(host), host_requests_burst)
+        return rate_limiters[host]
+
+
+def shared_rate_limiters(context=None):     #ograniczniki dla procesów roboczych - limit dotyczy wszystkich procesów razem
+    return {host: SharedRateLimiter(rate, host_requests_burst, context)
+            for host, rate in host_requests_per_second.items()}
+
+
+def install_rate_limiters(limiters):        #wywoływane przy starcie procesu roboczego
+    with rate_limiters_lock:
+        rate_limiters.update(limiters)
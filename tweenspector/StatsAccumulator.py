@@ -0,0 +1,92 @@
+import math
+import numpy as np
+from App_variables import stats_relative_accuracy
+
+
+class QuantileSketch:       #szkic kwantyli (DDSketch) dla wartości nieujemnych, szkice można łączyć
+    # zwrócony kwantyl q różni się od wartości o randze floor(q * (count - 1)) najwyżej o relative_accuracy
+    # tej wartości; liczba kubełków rośnie z logarytmem zakresu wartości, a nie z ich liczbą
+    def __init__(self, relative_accuracy=stats_relative_accuracy):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = dict()       #numer kubełka -> liczba wartości
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        if (values < 0).any():
+            raise ValueError("QuantileSketch obsluguje tylko wartosci nieujemne")
+        positive = values[values > 0]
+        self.zero_count += int(values.size - positive.size)
+        self.count += int(values.size)
+        keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            self.buckets[key] = self.buckets.get(key, 0) + count
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Nie mozna laczyc szkicow o roznej dokladnosci")
+        self.zero_count += other.zero_count
+        self.count += other.count
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = math.floor(q * (self.count - 1))
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)    #środek kubełka w sensie błędu względnego
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class StatsAccumulator:     #liczność, suma, minimum, maksimum (dokładne) i kwantyle (przybliżone), do łączenia części wyników
+    def __init__(self, relative_accuracy=stats_relative_accuracy):
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def update(self, values):
+        values = np.asarray(values)
+        if values.size == 0:
+            return
+        self.count += int(values.size)
+        self.sum += values.sum().item()     #dla liczb całkowitych suma pozostaje dokładna
+        low, high = values.min().item(), values.max().item()
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.sketch.update(values)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.sum += other.sum
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q):      #przybliżenie przycinamy do dokładnego zakresu wartości
+        value = self.sketch.quantile(q)
+        return None if value is None else min(max(value, self.min), self.max)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
@@ -0,0 +1,122 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+from App_variables import trace_path, trace_memory
+
+no_trace = contextlib.nullcontext()     #wspólny pusty kontekst - przy wyłączonym śledzeniu nic nie tworzymy
+
+
+def memory_peak():      #szczyt pamięci zaalokowanej przez Pythona od ostatniego wyzerowania, None bez tracemalloc
+    return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+
+
+def reset_memory_peak():        #Python 3.8 nie ma reset_peak - wtedy szczyt liczy się od włączenia śledzenia
+    if tracemalloc.is_tracing() and hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+
+
+class FeatureTrace:     #jedno uruchomienie funkcjonalności, etapy następują po sobie jak w FeatureProgress
+    def __init__(self, tracer, name, fields):
+        self.tracer = tracer
+        self.name = name
+        self.fields = fields
+        self.stage_name = None
+        self.peak = None
+
+    def __enter__(self):
+        self.parent = getattr(self.tracer.local, "feature", None)
+        self.tracer.local.feature = self
+        self.start = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def stage(self, name):
+        self.end_stage()
+        self.stage_name = name
+        self.stage_rows = None
+        reset_memory_peak()
+        self.stage_started = time.perf_counter()
+
+    def rows(self, count):
+        self.stage_rows = count
+
+    def end_stage(self):
+        if self.stage_name is None:
+            return
+        peak = memory_peak()
+        if peak is not None:
+            self.peak = max(self.peak or 0, peak)
+        self.tracer.emit({"type": "stage", "feature": self.name, "stage": self.stage_name,
+                          "wall": time.perf_counter() - self.stage_started, "rows": self.stage_rows,
+                          "peak_memory": peak, **self.fields})
+        self.stage_name = None
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_stage()
+        record = {"type": "feature", "feature": self.name, "start": self.start,
+                  "wall": time.perf_counter() - self.started, "peak_memory": self.peak, **self.fields}
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer.emit(record)
+        self.tracer.local.feature = self.parent
+        return False
+
+
+class Tracer:       #czas, liczba wierszy i szczyt pamięci każdego etapu zapisywane jako linie JSON
+    def __init__(self, path=None, memory=trace_memory):
+        self.enabled = False
+        self.file = None
+        self.lock = threading.Lock()
+        self.local = threading.local()      #bieżąca funkcjonalność osobno w każdym wątku
+        self.started_tracemalloc = False
+        if path:
+            self.enable(path, memory)
+
+    def enable(self, path, memory=trace_memory):
+        self.disable()
+        self.file = open(path, "a", encoding="utf-8")
+        if memory and not tracemalloc.is_tracing():     #tracemalloc spowalnia alokacje, włączamy go tylko przy śledzeniu
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        if self.file is not None:
+            with self.lock:
+                self.file.close()
+                self.file = None
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+    def emit(self, record):
+        record["pid"] = os.getpid()     #procesy BatchRunnera dopisują do tego samego pliku
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            if self.file is not None:
+                self.file.write(line)
+                self.file.flush()
+
+    def feature(self, name, **fields):
+        if not self.enabled:
+            return no_trace
+        return FeatureTrace(self, name, fields)
+
+    def stage(self, name):      #przy wyłączonym śledzeniu koszt to jedno sprawdzenie atrybutu
+        if self.enabled:
+            current = getattr(self.local, "feature", None)
+            if current is not None:
+                current.stage(name)
+
+    def rows(self, count):
+        if self.enabled:
+            current = getattr(self.local, "feature", None)
+            if current is not None:
+                current.rows(count)
+
+
+tracer = Tracer(trace_path)
@@ -0,0 +1,220 @@
+import os
+import hashlib
+import threading
+import datetime
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+import pandas as pd
+from App_variables import tweets_cache_dir, tweets_cache_max_size, tweets_cache_ttl, tweets_cache_empty_ttl, \
+    session_cache_max_size
+
+
+def to_date(value):     #zamiana daty w postaci tekstu (YYYY-MM-DD) na obiekt date
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value)[:10])
+
+
+def merge_ranges(ranges):       #scalamy nachodzące na siebie lub sąsiadujące przedziały dat [od, do)
+    merged = []
+    for date_from, date_to in sorted(ranges):
+        if date_from >= date_to:
+            continue
+        if merged and date_from <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], date_to))
+        else:
+            merged.append((date_from, date_to))
+    return merged
+
+
+def missing_ranges(covered, date_from, date_to):     #przedziały dat z [od, do), których nie ma jeszcze w cache
+    missing = []
+    current = date_from
+    for covered_from, covered_to in merge_ranges(covered):
+        if covered_to <= current:
+            continue
+        if covered_from >= date_to:
+            break
+        if covered_from > current:
+            missing.append((current, covered_from))
+        current = max(current, covered_to)
+    if current < date_to:
+        missing.append((current, date_to))
+    return missing
+
+
+def tweets_dates(tweets):       #daty publikacji tweetów (bez godziny)
+    return pd.to_datetime(tweets["date"]).dt.date
+
+
+class TweetCache:       #trwały cache tweetów na dysku, kluczem jest użytkownik i poszukiwane słowa
+    def __init__(self, cache_dir=tweets_cache_dir, max_size=tweets_cache_max_size, ttl=tweets_cache_ttl,
+                 empty_ttl=tweets_cache_empty_ttl):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.ttl = ttl                  #po tylu sekundach pobrane dni pobieramy ponownie
+        self.empty_ttl = empty_ttl      #a po tylu przedziały, dla których nie było tweetów (być może przez błąd)
+        self.lock = threading.Lock()
+        self.key_locks = dict()
+
+    def key_lock(self, key):
+        with self.lock:
+            if key not in self.key_locks:
+                self.key_locks[key] = threading.Lock()
+            return self.key_locks[key]
+
+    def entry_path(self, user_name, search_words):
+        key = "{user}\n{words}".format(user=(user_name or "").lower(), words=search_words or "")
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl.gz")
+
+    def load_entry(self, path):      #wpis to tweety oraz lista przedziałów dat (od, do, ważny do), które pobrano w całości
+        if not os.path.exists(path):
+            return pd.DataFrame(), []
+        try:
+            entry = pd.read_pickle(path, compression="gzip")
+            os.utime(path)      #data modyfikacji służy do usuwania najdawniej używanych wpisów
+            return entry["tweets"], entry["covered"]
+        except Exception as exc:
+            print("Tweet cache - Uszkodzony wpis: {path}, wyjatek: {excType} {excMsg}"
+                  .format(path=path, excType=type(exc).__name__, excMsg=str(exc)))
+            return pd.DataFrame(), []
+
+    def save_entry(self, path, tweets, covered):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # plik tymczasowy osobny dla procesu i wątku - procesy BatchRunner mogą zapisywać ten sam wpis jednocześnie
+        temp_path = "{path}.{pid}.{thread}.tmp".format(path=path, pid=os.getpid(), thread=threading.get_ident())
+        pd.to_pickle({"tweets": tweets, "covered": covered}, temp_path, compression="gzip")
+        os.replace(temp_path, path)     #zapis atomowy, żeby przerwany zapis nie uszkodził wpisu
+        self.evict()
+
+    def evict(self):        #usuwamy najdawniej używane wpisy, dopóki cache jest większy niż max_size
+        with self.lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".pkl.gz"):
+                    try:
+                        stat = os.stat(os.path.join(self.cache_dir, name))
+                    except FileNotFoundError:       #wpis usunął w międzyczasie inny proces
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, name))
+            total_size = sum(entry[1] for entry in entries)
+            for _, size, name in sorted(entries):
+                if total_size <= self.max_size:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                    total_size -= size
+                except OSError:
+                    pass
+
+    def get_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets, fetch, now=None):
+        date_from, date_to = to_date(date_from), to_date(date_to)
+        limit = int(num_of_tweets)
+        today = datetime.date.today()
+        now = time.time() if now is None else now
+        path = self.entry_path(user_name, search_words)
+        with self.key_lock(path):
+            tweets, covered = self.load_entry(path)
+            # przedziały po czasie ważności (i bez niego, ze starszych wpisów) pobieramy ponownie
+            covered = [entry for entry in covered if len(entry) == 3 and entry[2] > now]
+            changed = False
+            # brakujące przedziały pobieramy od najnowszego, bo twint zwraca najnowsze tweety;
+            # gdy mamy już limit tweetów z ciągłego przedziału kończącego się na date_to, starszych nie pobieramy
+            ranges = [(covered_from, covered_to) for covered_from, covered_to, _ in covered]
+            for missing_from, missing_to in reversed(missing_ranges(ranges, date_from, date_to)):
+                if self.count_between(tweets, missing_to, date_to) >= limit:
+                    break
+                fetched = fetch(user_name, search_words, missing_from.isoformat(), missing_to.isoformat(), limit)
+                if not fetched.empty:
+                    tweets = self.merge(tweets, fetched)
+                if len(fetched) >= limit:        #wynik obcięty do limitu - pełny jest tylko przedział od najstarszego dnia
+                    missing_from = min(tweets_dates(fetched)) + datetime.timedelta(days=1)
+                # dzisiejsze tweety mogą się jeszcze pojawić; pusty wynik może być błędem Twinta, więc ważny jest krótko
+                expires = now + (self.empty_ttl if fetched.empty else self.ttl)
+                covered.append((missing_from, min(missing_to, today), expires))
+                changed = True
+            if changed:
+                self.save_entry(path, tweets, sorted(covered))
+        if tweets.empty:
+            return tweets
+        dates = tweets_dates(tweets)
+        return tweets[(dates >= date_from) & (dates < date_to)].head(limit).reset_index(drop=True)
+
+    def count_between(self, tweets, date_from, date_to):
+        if tweets.empty:
+            return 0
+        dates = tweets_dates(tweets)
+        return int(((dates >= date_from) & (dates < date_to)).sum())
+
+    def merge(self, tweets, fetched):     #łączymy tweety po id i sortujemy od najnowszego, tak jak zwraca je twint
+        merged = fetched if tweets.empty else pd.concat([tweets, fetched], ignore_index=True)
+        if "id" in merged.columns:
+            merged = merged.drop_duplicates(subset="id", keep="last")
+        order = pd.to_datetime(merged["date"]).to_numpy().argsort(kind="stable")[::-1]
+        return merged.iloc[order].reset_index(drop=True)
+
+
+class SessionCache:     #wspólny dla całego procesu cache pobranych ramek danych w pamięci (LRU)
+    def __init__(self, max_size=session_cache_max_size):
+        self.max_size = max_size        #maksymalna łączna wielkość ramek w bajtach
+        self.size = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()    #klucz -> (tweety, wielkość)
+        self.in_flight = dict()         #klucz -> Future pobierania, które właśnie trwa
+
+    def get_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets, fetch):
+        # zwracana ramka jest współdzielona między wywołaniami, więc nie wolno jej modyfikować
+        key = ((user_name or "").lower(), search_words or "", str(date_from), str(date_to), int(num_of_tweets))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            future = self.in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self.in_flight[key] = future
+        if not owner:       #ktoś już pobiera te tweety, czekamy na jego wynik zamiast pobierać drugi raz
+            return future.result()
+        try:
+            tweets = fetch(user_name, search_words, date_from, date_to, num_of_tweets)
+        except BaseException as exc:        #błędów nie zapamiętujemy, czekający dostają ten sam wyjątek
+            with self.lock:
+                del self.in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self.lock:
+            del self.in_flight[key]
+            self.store(key, tweets)
+        future.set_result(tweets)
+        return tweets
+
+    def store(self, key, tweets):       #wywoływane z założoną blokadą
+        size = int(tweets.memory_usage(deep=True).sum())
+        if size > self.max_size:
+            return
+        self.entries[key] = (tweets, size)
+        self.size += size
+        while self.size > self.max_size:       #usuwamy najdawniej używane ramki
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+
+def tweet_cache_for(source, cache_dir=tweets_cache_dir):
+    # tweety każdego źródła w osobnym katalogu, żeby np. archiwum nie oznaczyło dni jako pobranych z Twittera;
+    # źródeł bez cache_name (archiwa - plik jest już na dysku) nie zapisujemy wcale
+    name = getattr(source, "cache_name", None)
+    if name is None:
+        return None
+    return TweetCache(os.path.join(cache_dir, name) if name else cache_dir)
+
+
+session_cache = SessionCache()      #cache współdzielony przez wszystkie funkcjonalności i zapis do CSV
@@ -0,0 +1,259 @@
+import ast
+import asyncio
+import datetime
+import hashlib
+import json
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pandas as pd
+from App_variables import twitter_host, http_source_timeout, fake_server_page_size
+from RateLimiter import host_rate_limiter
+from LazyImport import LazyModule
+
+twint = LazyModule("twint")     #Twint potrzebny jest dopiero przy pierwszym pobieraniu
+feather = LazyModule("pyarrow.feather")
+
+list_columns = ["mentions", "hashtags", "cashtags", "urls", "photos", "reply_to"]     #kolumny z listami w ramce twinta
+weekdays = {"Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4, "Friday": 5, "Saturday": 6, "Sunday": 7}
+
+
+def tweet_to_row(tweet, search_words):      #te same kolumny, które twint tworzy w twint.output.panda.Tweets_df
+    created = datetime.datetime.strptime(tweet.datestamp + " " + tweet.timestamp, "%Y-%m-%d %H:%M:%S")
+    created_at = created.timestamp() * 1000
+    local_time = time.localtime(created_at / 1000)
+    return {
+        "id": str(tweet.id),
+        "conversation_id": tweet.conversation_id,
+        "created_at": created_at,
+        "date": tweet.datestamp + " " + tweet.timestamp,
+        "timezone": tweet.timezone,
+        "place": tweet.place,
+        "tweet": tweet.tweet,
+        "language": tweet.lang,
+        "mentions": tweet.mentions,
+        "hashtags": tweet.hashtags,
+        "cashtags": tweet.cashtags,
+        "user_id": tweet.user_id,
+        "user_id_str": tweet.user_id_str,
+        "username": tweet.username,
+        "name": tweet.name,
+        "day": weekdays[time.strftime("%A", local_time)],
+        "hour": time.strftime("%H", local_time),
+        "link": tweet.link,
+        "urls": tweet.urls,
+        "photos": tweet.photos,
+        "video": tweet.video,
+        "thumbnail": tweet.thumbnail,
+        "retweet": tweet.retweet,
+        "nlikes": int(tweet.likes_count),
+        "nreplies": int(tweet.replies_count),
+        "nretweets": int(tweet.retweets_count),
+        "quote_url": tweet.quote_url,
+        "search": str(search_words),
+        "near": tweet.near,
+        "geo": tweet.geo,
+        "source": tweet.source,
+        "user_rt_id": tweet.user_rt_id,
+        "user_rt": tweet.user_rt,
+        "retweet_id": tweet.retweet_id,
+        "reply_to": tweet.reply_to,
+        "retweet_date": tweet.retweet_date,
+        "translate": tweet.translate,
+        "trans_src": tweet.trans_src,
+        "trans_dest": tweet.trans_dest,
+    }
+
+
+class TweetSource:      #źródło tweetów dla TweetsData - ramka z kolumnami jak twint.output.panda.Tweets_df
+    cache_name = None       #podkatalog cache tweetów na dysku, None - tweetów z tego źródła nie zapisujemy
+
+    def fetch(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        raise NotImplementedError('Please implement this method')
+
+
+class TwintSource(TweetSource):     #pobieranie tweetów przez Twinta, każde wywołanie zbiera tweety do własnego bufora
+    cache_name = ""     #główny katalog cache, ten sam co przed dodaniem innych źródeł
+
+    def fetch(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        tweets = []     #zamiast globalnej ramki twint.output.panda.Tweets_df
+        c = twint.Config()
+        c.Username = user_name
+        c.Limit = num_of_tweets
+        c.Store_object = True
+        c.Store_object_tweets_list = tweets
+        c.Retweets = True
+        c.Stats = True
+        c.Count = True
+        c.Since = date_from
+        c.Until = date_to
+        c.Search = search_words
+        c.Hide_output = True
+        host_rate_limiter(twitter_host).acquire()
+        loop = asyncio.new_event_loop()     #każdy wątek potrzebuje własnej pętli zdarzeń dla twinta
+        asyncio.set_event_loop(loop)
+        try:
+            twint.run.Profile(c)
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        return pd.DataFrame([tweet_to_row(tweet, search_words) for tweet in tweets])
+
+
+def filter_tweets(tweets, user_name, search_words, date_from, date_to, num_of_tweets):  #to samo zapytanie co w Twincie
+    if tweets.empty:
+        return pd.DataFrame()
+    mask = tweets["username"].astype(str).str.lower() == str(user_name).lower()
+    if search_words:
+        mask &= tweets["tweet"].astype(str).str.contains(str(search_words), case=False, regex=False)
+    dates = tweets["date"].astype(str)
+    if date_from:       #daty "RRRR-MM-DD", tak jak Since i Until w Twincie - dzień date_to nie jest brany
+        mask &= dates >= str(date_from)
+    if date_to:
+        mask &= dates < str(date_to)
+    found = tweets[mask].sort_values("date", ascending=False, kind="stable")    #najnowsze tweety jako pierwsze
+    found = found.head(int(num_of_tweets)).reset_index(drop=True)
+    return found.assign(search=str(search_words))
+
+
+def parse_list(value):      #lista zapisana w CSV jako tekst, np. "['kot', 'pies']"
+    if not value:
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+    return parsed if isinstance(parsed, list) else value
+
+
+def read_tweets_archive(path):      #CSV i Feather zapisane przez program albo JSONL (także z twint --json)
+    if path.endswith(".feather"):
+        return feather.read_table(path).to_pandas()
+    if path.endswith(".csv"):
+        header = pd.read_csv(path, nrows=0).columns
+        tweets = pd.read_csv(path, dtype={"id": str, "hour": str}, keep_default_na=False,
+                             converters={column: parse_list for column in list_columns if column in header})
+        return tweets.drop(columns=[column for column in tweets.columns if column.startswith("Unnamed:")])
+    tweets = pd.read_json(path, lines=True, dtype=False, convert_dates=False)
+    if "time" in tweets.columns and "timestamp" not in tweets.columns:     #format twint --json: data i godzina osobno
+        tweets["date"] = tweets["date"].astype(str) + " " + tweets["time"].astype(str)
+    return tweets.rename(columns={"likes_count": "nlikes", "retweets_count": "nretweets",
+                                  "replies_count": "nreplies"}).astype({"id": str})
+
+
+class ArchiveSource(TweetSource):       #tweety z pliku archiwum zamiast z sieci, plik wczytujemy raz
+    def __init__(self, path):
+        self.path = path
+        self.tweets = None
+        self.lock = threading.Lock()
+
+    def load(self):
+        with self.lock:
+            if self.tweets is None:
+                self.tweets = read_tweets_archive(self.path)
+            return self.tweets
+
+    def fetch(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        return filter_tweets(self.load(), user_name, search_words, date_from, date_to, num_of_tweets)
+
+
+class FakeTweetServer:      #lokalny serwer HTTP z tweetami z ramki, z opóźnieniem i stronicowaniem jak prawdziwe API
+    def __init__(self, tweets, latency=0.0, page_size=fake_server_page_size, host="127.0.0.1", port=0):
+        self.tweets = tweets
+        self.latency = latency      #sekundy oczekiwania przed każdą odpowiedzią
+        self.page_size = page_size  #tweety w jednej odpowiedzi
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return "http://{host}:{port}".format(host=host, port=port)
+
+    def handle(self, request):
+        url = urllib.parse.urlsplit(request.path)
+        if url.path != "/tweets":
+            request.send_error(404)
+            return
+        query = dict(urllib.parse.parse_qsl(url.query))
+        self.requests += 1
+        time.sleep(self.latency)
+        found = filter_tweets(self.tweets, query.get("username", ""), query.get("search"), query.get("since"),
+                              query.get("until"), int(query.get("limit", len(self.tweets))))
+        cursor = int(query.get("cursor", 0))
+        page = found.iloc[cursor:cursor + self.page_size]
+        next_cursor = cursor + self.page_size if cursor + self.page_size < len(found) else None
+        body = '{{"tweets": {tweets}, "next_cursor": {cursor}}}'.format(
+            tweets=page.to_json(orient="records") if not page.empty else "[]", cursor=json.dumps(next_cursor))
+        body = body.encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+class HttpSource(TweetSource):      #tweety pobierane stronami z serwera HTTP (np. FakeTweetServer)
+    def __init__(self, base_url, timeout=http_source_timeout):
+        self.base_url = base_url.rstrip("/")
+        self.host = urllib.parse.urlsplit(self.base_url).netloc
+        self.timeout = timeout
+        self.cache_name = "http-" + hashlib.sha1(self.base_url.encode("utf-8")).hexdigest()[:16]     #osobno dla serwera
+
+    def fetch(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        query = {"username": user_name, "limit": num_of_tweets}
+        for key, value in [("search", search_words), ("since", date_from), ("until", date_to)]:
+            if value:
+                query[key] = value
+        rows = []
+        cursor = 0
+        while cursor is not None:       #kolejne strony aż serwer nie poda następnej
+            query["cursor"] = cursor
+            host_rate_limiter(self.host).acquire()
+            url = self.base_url + "/tweets?" + urllib.parse.urlencode(query)
+            with urllib.request.urlopen(url, timeout=self.timeout) as response:
+                page = json.load(response)
+            rows.extend(page["tweets"])
+            cursor = page["next_cursor"]
+        tweets = pd.DataFrame(rows)
+        return tweets.astype({"id": str}) if not tweets.empty else tweets
+
+
+def create_tweet_source(spec):      #"twint", "archive:<plik>" albo adres serwera "http://..."
+    if spec == "twint":
+        return TwintSource()
+    if spec.startswith("archive:"):
+        return ArchiveSource(spec[len("archive:"):])
+    if spec.startswith("http://") or spec.startswith("https://"):
+        return HttpSource(spec)
+    raise ValueError("Nieznane zrodlo tweetow: {spec}".format(spec=spec))
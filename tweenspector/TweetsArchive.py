@@ -0,0 +1,104 @@
+from collections import Counter
+import pandas as pd
+from App_variables import archive_chunk_size, wordcloud_max_words
+from TweetsCorpus import clean_tweets_text, TweetsIndex, counts_to_dict
+from TweetsData import word_pattern, count_top_words
+from StatsAccumulator import StatsAccumulator
+
+
+def read_tweets_csv_chunks(filename, chunk_size=archive_chunk_size, columns=None):   #ramki po chunk_size tweetów
+    return pd.read_csv(filename, chunksize=chunk_size, usecols=columns, dtype={"hour": str})
+
+
+class WordCountAggregator:      #liczba wystąpień słów w oczyszczonym tekście tweetów (bez lematyzacji)
+    name = "words"
+    columns = ["tweet"]
+
+    def __init__(self, stopwords=(), max_words=wordcloud_max_words):
+        self.stopwords = set(stopwords)
+        self.max_words = max_words
+        self.counts = Counter()
+
+    def update(self, chunk):
+        for text in clean_tweets_text(chunk["tweet"]):
+            self.counts.update(word_pattern.findall(text))
+
+    def merge(self, other):     #łączenie wyników częściowych, np. z innych procesów
+        self.counts.update(other.counts)
+        return self
+
+    def result(self):
+        return count_top_words(self.counts, self.stopwords, self.max_words)
+
+
+class MentionCountAggregator:       #w ilu tweetach wspomniano dane konto
+    name = "mentions"
+    columns = ["id", "tweet"]
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, chunk):
+        self.counts.update(TweetsIndex(chunk).mention_counts)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        return self
+
+    def result(self):
+        return dict(self.counts)
+
+
+class HourAggregator:       #liczba tweetów w każdej godzinie
+    name = "hours"
+    columns = ["hour"]
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def update(self, chunk):
+        self.counts.update(counts_to_dict(chunk["hour"].value_counts(sort=False)))
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        return self
+
+    def result(self):
+        return dict(sorted(self.counts.items(), key=lambda x: x[1]))
+
+
+class EngagementAggregator:     #polubienia i udostępnienia tweetów (bez retweetów), te same klucze co engagement_stats
+    name = "engagement"
+    columns = ["retweet", "nlikes", "nretweets"]
+
+    def __init__(self):
+        self.stats = {"likes": StatsAccumulator(), "retweets": StatsAccumulator()}
+
+    def update(self, chunk):
+        original_tweets = chunk[chunk["retweet"].eq(False)]
+        for column, name in [("nlikes", "likes"), ("nretweets", "retweets")]:
+            self.stats[name].update(original_tweets[column].to_numpy())
+
+    def merge(self, other):
+        for name, stats in self.stats.items():
+            stats.merge(other.stats[name])
+        return self
+
+    def result(self):       #średnia, maksimum i minimum są dokładne, mediana przybliżona (stats_relative_accuracy)
+        result = dict()
+        for name, stats in self.stats.items():
+            if not stats.count:
+                continue
+            result['avg' + name] = round(stats.mean)
+            result['max' + name] = int(stats.max)
+            result['min' + name] = int(stats.min)
+            result['median' + name] = float(stats.median)
+        return result
+
+
+def aggregate_tweets_csv(filename, aggregators, chunk_size=archive_chunk_size):  #jeden przebieg po pliku dla wszystkich agregatorów
+    columns = sorted({column for aggregator in aggregators for column in aggregator.columns})
+    for chunk in read_tweets_csv_chunks(filename, chunk_size, columns):
+        for aggregator in aggregators:
+            aggregator.update(chunk)
+    return {aggregator.name: aggregator.result() for aggregator in aggregators}
@@ -0,0 +1,91 @@
+import html
+import re
+import threading
+import weakref
+import pandas as pd
+
+url_pattern = re.compile(r"https?://\S+")       #linki http/https
+mention_pattern = re.compile(r"@\w+")           #odwołania do @nazwa
+mention_name_pattern = re.compile(r"@(\w+)")    #nazwa konta z odwołania
+entity_pattern = re.compile(r"&(?:#\d+|#x[0-9a-fA-F]+|\w+);")     #encje HTML, np. &amp;
+
+
+def unescape_entity(match):
+    return html.unescape(match.group(0))
+
+
+def clean_tweets_text(tweets_text):     #czyszczenie całej kolumny tweetów naraz operacjami na Series
+    text = tweets_text.fillna("").astype(str)
+    text = text.str.replace(url_pattern, "", regex=True)
+    text = text.str.replace(mention_pattern, "", regex=True)
+    return text.str.replace(entity_pattern, unescape_entity, regex=True)
+
+
+def counts_to_dict(counts):     #wynik value_counts jako słownik z liczbami typu int
+    return {key: int(value) for key, value in counts.items()}
+
+
+class TweetsIndex:      #indeks wspomnianych kont i hasztagów (małymi literami) dla każdego tweeta
+    def __init__(self, tweets):
+        tweets = tweets.reset_index(drop=True)      #numer wiersza identyfikuje tweet także przy powtórzonych id
+        ids = tweets["id"] if "id" in tweets.columns else tweets.index.to_series()
+        mentions = tweets["tweet"].fillna("").astype(str).str.findall(mention_name_pattern).explode().dropna()
+        self.mentions = pd.DataFrame({"tweet": mentions.index, "id": ids.loc[mentions.index].values,
+                                      "mention": mentions.str.lower().values}).drop_duplicates(["tweet", "mention"])
+        if "hashtags" in tweets.columns:        #twint zwraca hasztagi jako listy napisów
+            hashtags = tweets["hashtags"].explode()
+            hashtags = hashtags[hashtags.notna() & (hashtags != "")].astype(str)
+        else:
+            hashtags = pd.Series([], dtype=object)
+        self.hashtags = pd.DataFrame({"tweet": hashtags.index, "id": ids.loc[hashtags.index].values,
+                                      "hashtag": hashtags.str.lower().values})
+        self.mention_counts = counts_to_dict(self.mentions["mention"].value_counts(sort=False))   #w ilu tweetach wspomniano konto
+        self.hashtag_counts = counts_to_dict(self.hashtags["hashtag"].value_counts(sort=False))   #ile razy użyto hasztagu
+
+    def mentions_by_tweet(self):        #id tweeta -> lista wspomnianych kont
+        return self.mentions.groupby("id", sort=False)["mention"].agg(list).to_dict()
+
+
+class TweetsCorpus:     #dane wyliczane raz dla ramki tweetów i współdzielone przez wszystkie funkcjonalności
+    def __init__(self, tweets):
+        self.tweets_ref = weakref.ref(tweets)   #korpus nie przedłuża życia ramki
+        self.lock = threading.Lock()
+        self._clean_text = None
+        self._index = None
+
+    @property
+    def tweets(self):
+        return self.tweets_ref()
+
+    @property
+    def clean_text(self):       #tekst tweetów bez linków, odwołań do kont i encji HTML
+        with self.lock:
+            if self._clean_text is None:
+                self._clean_text = clean_tweets_text(self.tweets["tweet"])
+            return self._clean_text
+
+    @property
+    def index(self):        #indeks wspominków i hasztagów budowany raz dla korpusu
+        with self.lock:
+            if self._index is None:
+                self._index = TweetsIndex(self.tweets)
+            return self._index
+
+
+corpora = dict()        #id ramki -> korpus, wpis znika razem z ramką
+corpora_lock = threading.Lock()
+
+
+def forget_corpus(tweets_id):
+    with corpora_lock:
+        corpora.pop(tweets_id, None)
+
+
+def get_corpus(tweets):     #ten sam obiekt korpusu dla tej samej ramki (np. z SessionCache)
+    with corpora_lock:
+        corpus = corpora.get(id(tweets))
+        if corpus is None or corpus.tweets is not tweets:
+            corpus = TweetsCorpus(tweets)
+            corpora[id(tweets)] = corpus
+            weakref.finalize(tweets, forget_corpus, id(tweets))
+        return corpus
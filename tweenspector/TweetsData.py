@@ -1,15 +1,114 @@
-import twint
-from wordcloud import WordCloud
 import re
-import igraph
 import pandas as pd
-import statistics
-import matplotlib.pyplot as plt
-import matplotlib
 import math
+import io
+import itertools
+import threading
+from PIL import Image
+from collections import Counter
 from App_variables import *
-import spacy
-import html
+from LazyImport import LazyModule
+from TweetSource import TwintSource
+from TweetsCorpus import get_corpus
+from AccountStats import compute_account_stats
+from CommunityDetection import detect_communities
+from InteractionCrawler import InteractionCrawler, mentioned_accounts
+from InteractionStore import interactions_scope
+from FeatureProgress import FeatureProgress, FeatureCancelled
+from LemmatizerService import connect_lemmatizer_service
+from LemmaCache import split_cached, remember_lemmas
+
+# ciężkie biblioteki importujemy dopiero przy pierwszym użyciu funkcjonalności, która ich potrzebuje
+WordCloud = LazyModule("wordcloud", "WordCloud")
+igraph = LazyModule("igraph")
+pa = LazyModule("pyarrow")
+feather = LazyModule("pyarrow.feather")
+plt = LazyModule("matplotlib.pyplot")
+matplotlib = LazyModule("matplotlib")
+cairo = LazyModule("cairo")
+spacy = LazyModule("spacy")
+
+lemmatizers = dict()        #modele spaCy wczytane w tym procesie
+lemmatizers_lock = threading.Lock()
+
+word_pattern = re.compile(r"\w[\w'\&\-]*\w")     #słowa, które trafiają do mapy słów
+
+
+def count_top_words(word_counts, stopwords, max_words=wordcloud_max_words):   #tabela częstości max_words najczęstszych słów
+    stopwords = {word.lower() for word in stopwords}    #jak w WordCloud wielkość liter stopwords nie ma znaczenia
+    cases = dict()
+    for word, count in word_counts.items():
+        if word.lower() in stopwords or word.isdigit():
+            continue
+        cases.setdefault(word.lower(), Counter())[word] += count
+    frequencies = Counter()
+    for case_counts in cases.values():      #różne wielkości liter tego samego słowa liczymy razem, jak robi to WordCloud
+        frequencies[case_counts.most_common(1)[0][0]] = sum(case_counts.values())
+    return dict(frequencies.most_common(max_words))
+
+
+def load_lemmatizer(model=lemmatizer_model, exclude=lemmatizer_excluded_components):   #model wczytujemy raz na proces
+    with lemmatizers_lock:      #równoczesne wywołanie (np. z wątku preload_lemmatizer) czeka na ten sam model
+        if model not in lemmatizers:
+            lemmatizers[model] = spacy.load(model, exclude=exclude)     #parser i NER nie są potrzebne do lematów
+        return lemmatizers[model]
+
+
+def preload_lemmatizer(model=lemmatizer_model):     #wczytanie modelu w tle, gdy użytkownik wypełnia formularz
+    def load():
+        try:
+            load_lemmatizer(model)
+        except Exception as exc:
+            print("Preload lemmatizer - Cos poszlo nie tak: {excType} {excMsg}"
+                  .format(excType=type(exc).__name__, excMsg=str(exc)))
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
+
+
+def render_word_cloud(frequencies):      #tu rysujemy mapę słów z tabeli częstości
+    wordcloud = WordCloud(
+        background_color='black',
+        colormap='Pastel1',
+        width=1000,
+        height=500,
+        max_words=wordcloud_max_words)
+    wordcloud.generate_from_frequencies(frequencies)
+    return wordcloud
+
+
+def render_graph(comm, visual_style):       #graf z zaznaczonymi grupami rysowany do pamięci zamiast do pliku
+    # rysujemy na własnej powierzchni cairo - bez niej igraph.plot otwiera obraz w zewnętrznej przeglądarce
+    width, height = (int(math.ceil(size)) for size in visual_style["bbox"])
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    plot = igraph.plot(comm, target=surface, **visual_style, mark_groups=True)
+    plot.redraw()
+    buffer = io.BytesIO()
+    surface.write_to_png(buffer)
+    buffer.seek(0)
+    return Image.open(buffer)
+
+
+def figure_to_image(figure):        #wykres matplotlib jako obraz PIL, bez zapisu i ponownego wczytania PNG
+    figure.canvas.draw()
+    image = Image.frombuffer("RGBA", figure.canvas.get_width_height(), bytes(figure.canvas.buffer_rgba()),
+                             "raw", "RGBA", 0, 1)
+    plt.close(figure)
+    return image
+
+
+def build_interactions_graph(accounts, relations):    #graf budowany jednym wywołaniem z listy krawędzi
+    accounts = list(accounts)
+    vertex_ids = {account: i for i, account in enumerate(accounts)}
+    edges = []
+    weights = []
+    for someone, interactions in relations.items():     #waga krawędzi to liczba interakcji między dwoma kontami
+        for key, value in interactions.items():
+            edges.append((vertex_ids[someone], vertex_ids[key]))
+            weights.append(value)
+    return igraph.Graph(n=len(accounts), edges=edges, directed=True,
+                        vertex_attrs={"name": accounts}, edge_attrs={"weight": weights})
+
 
 def save_tweets_df_to_csv(filename, tweets_df):   #zapis wczytanych tweetów do CSV
     tweets_df.to_csv(filename)
@@ -19,89 +118,138 @@ def load_tweets_df_from_csv(filename):    #wczytanie tweetów z CSV
     return pd.read_csv(filename)
 
 
+def tweets_df_to_table(tweets_df):      #ramka tweetów jako tabela Arrow z zachowanymi typami kolumn
+    try:
+        return pa.Table.from_pandas(tweets_df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mixed = dict()
+        for column in tweets_df.columns:
+            try:
+                pa.array(tweets_df[column], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):    #kolumny o mieszanych typach zapisujemy jako tekst
+                mixed[column] = tweets_df[column].astype(str)
+        return pa.Table.from_pandas(tweets_df.assign(**mixed), preserve_index=False)
+
+
+def save_tweets_df_to_snapshot(filename, tweets_df):     #zapis tweetów w formacie Arrow (Feather), bez kompresji
+    feather.write_feather(tweets_df_to_table(tweets_df), filename, compression="uncompressed")
+
+
+def load_tweets_df_from_snapshot(filename):      #wczytanie tweetów z pliku Arrow - typy i listy (np. hasztagi) bez parsowania
+    table = feather.read_table(filename, memory_map=True)   #kolumny liczbowe są mapowane z pliku, a nie kopiowane
+    return table.to_pandas(split_blocks=True)
+
+
 class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie metody potrzebne do wczytania tweetów i prezentacji danych
-    def __init__(self, user_name, search_words, date_from, date_to, num_of_tweets=500):
+    def __init__(self, user_name, search_words, date_from, date_to, num_of_tweets=500, tweet_cache=None,
+                 session_cache=None, interaction_store=None, progress=None, tweet_source=None, lemma_cache=None):
         self.user_name = user_name                #nazwa użytkownika, liczba tweetów, daty od/do, a także poszukiwane słowa
         self.num_of_tweets = num_of_tweets
         self.num_of_tweets_read = 0
         self.Since = date_from
         self.Until = date_to
         self.search_words = search_words
+        self.tweet_cache = tweet_cache            #opcjonalny cache tweetów na dysku (TweetCache)
+        self.session_cache = session_cache        #opcjonalny cache ramek danych w pamięci (SessionCache)
+        self.interaction_store = interaction_store    #opcjonalny graf interakcji zapisany na dysku (InteractionStore)
+        self.progress = progress if progress is not None else FeatureProgress()    #postęp i przerwanie pracy z okna
+        self.lemma_cache = lemma_cache            #opcjonalny cache lematów zapisany na dysku (LemmaCache)
+        self.tweet_source = tweet_source if tweet_source is not None else TwintSource()    #skąd pobieramy tweety (TweetSource)
+        self.image = None       #obraz PIL utworzony przez ostatnio uruchomioną funkcjonalność
+        self.result = None      #dane policzone przez ostatnio uruchomioną funkcjonalność (np. do raportów BatchRunner)
 
-    def get_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets):   #wczytanie tweetów
-        try:                        #w przeciwnym razie konfigurujemy Twinta
-            c = twint.Config()
-            c.Username = user_name
-            c.Limit = num_of_tweets
-            c.Pandas = True
-            c.Retweets = True
-            c.Pandas_clean = True
-            c.Stats = True
-            c.Count = True
-            c.Since = date_from
-            c.Until = date_to
-            c.Search = search_words
-            c.Hide_output = True
-            twint.run.Profile(c)
-            if twint.output.panda.Tweets_df.empty:    #jeśli nie znaleziono tweetów to informujemy o tym
+    def get_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets,
+                   raise_errors=False):   #wczytanie tweetów; raise_errors - błąd pobierania zamiast pustej ramki
+        try:
+            if self.session_cache is not None:      #te same tweety pobrane w tej sesji bierzemy z pamięci
+                tweets = self.session_cache.get_tweets(user_name, search_words, date_from, date_to, num_of_tweets,
+                                                       self.load_tweets)
+            else:
+                tweets = self.load_tweets(user_name, search_words, date_from, date_to, num_of_tweets)
+            if tweets.empty:    #jeśli nie znaleziono tweetów to informujemy o tym
                 print("No tweets from user: ", user_name)
-                return twint.output.panda.Tweets_df
-            else:                                     #zwracamy pustą lub pełną ramke danych
-                return twint.output.panda.Tweets_df
+            return tweets       #zwracamy pustą lub pełną ramke danych
         except ValueError:                     #obsługujemy potencjalne wyjątki
             print("Get tweets - Blad wartosci, user:", user_name)
+            if raise_errors:
+                raise
             return pd.DataFrame()
         except Exception as exc:
             print("Get tweets - Cos poszlo nie tak, user: {user}, wyjatek: {excType} {excMsg}"
                   .format(user=user_name, excType=type(exc).__name__, excMsg=str(exc)))
+            if raise_errors:
+                raise
             return pd.DataFrame()
 
+    def load_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets):
+        if self.tweet_cache is not None:        #jeśli mamy cache, to pobieramy tylko brakujące dni
+            return self.tweet_cache.get_tweets(user_name, search_words, date_from, date_to, num_of_tweets,
+                                               self.fetch_tweets)
+        return self.fetch_tweets(user_name, search_words, date_from, date_to, num_of_tweets)
+
+    def fetch_tweets(self, user_name, search_words, date_from, date_to, num_of_tweets):   #pobranie tweetów ze źródła
+        return self.tweet_source.fetch(user_name, search_words, date_from, date_to, num_of_tweets)
+
     def generate_word_cloud(self):
-        worldcloud = self.create_word_cloud()
+        worldcloud = self.create_word_cloud(lemma_cache=self.lemma_cache)
         return worldcloud is not None
 
-    def create_word_cloud(self): #tutaj tworzymy mapę słów
+    def create_word_cloud(self, batch_size=lemmatizer_batch_size, n_process=lemmatizer_n_process,
+                          lemma_cache=None): #tutaj tworzymy mapę słów
+        self.progress.stage("Pobieranie tweetów")
         tweets = self.get_tweets(self.user_name, self.search_words, self.Since, self.Until, self.num_of_tweets)
         if tweets.empty:                   #wczytujemy tweety, jeśli brak tweetów to wychodzimy
             return None
+        self.progress.update(len(tweets))
+        service = None
         try:
             lemmatizer_enabled = True      #włączamy lematyzer
-            preprocessed_tweets_text = ''              #tu tekst tweetów po przetworzeniu
-            original_tweets_text = ''
-            nlp = spacy.load("pl_core_news_lg")
-            for tweet in tweets.iterrows():           #tutaj kolejno szukamy wspominków o innych kontach by dodać je do słów nieznaczących
-                text = tweet[1]['tweet']
-                # w pierwszym kroku odflitrowujemy wszystkie linki http/https
-                lst = re.findall('http://\S+|https://\S+', text)
-                for i in lst:
-                    text = text.replace(i, '')
-                # w kolejnym usuwamy wszystkie odwoloania do @nazwa
-                lst = re.findall(r"(@\w+)", text)
-                for i in lst:
-                    text = text.replace(i, '')
-                if lemmatizer_enabled:               #tutaj lematyzacja słów
-                    stopwords = nlp.Defaults.stop_words
-                    stopwords.add("RT")
-#                    original_tweets_text = tweets.tweet.values
-                    tweets_text_from_lemmatizer = nlp(str(text))    #kolejno lematyzujemy wszystkie słowa
-#                    preprocessed_tweets_text = ''
-                    for t in tweets_text_from_lemmatizer:     #do tekstu do przetworzenia dodajemy tylko słowa znaczące
-                        if t.lemma_ not in stopwords:
-                            strtoken = html.unescape(t.lemma_)
-                            preprocessed_tweets_text = preprocessed_tweets_text + ' ' + strtoken
+            word_counts = Counter()              #tu liczba wystąpień słów z tweetów po przetworzeniu
+            self.progress.stage("Czyszczenie tekstu")
+            # z tweetów usuwamy linki http/https, odwołania do @nazwa i encje HTML - raz dla całej kolumny
+            texts = get_corpus(tweets).clean_text.tolist()
+            self.progress.update(len(texts))
+            # tweety, których wszystkie tokeny lematyzowaliśmy już wcześniej, nie trafiają do modelu
+            known, missing = split_cached(texts, lemma_cache) if lemma_cache is not None else ([], texts)
+            docs = []
+            if missing:
+                self.progress.stage("Wczytywanie modelu")
+                service = connect_lemmatizer_service()      #serwis z wczytanym już modelem, wspólny dla wielu procesów
+                if service is None:
+                    nlp = load_lemmatizer()     #model wczytany wcześniej w tym procesie (lub w tle) używamy ponownie
+                    stopwords = set(nlp.Defaults.stop_words)
+                    docs = ([(t.text, t.lemma_) for t in doc]
+                            for doc in nlp.pipe(missing, batch_size=batch_size, n_process=n_process))
                 else:
-                    preprocessed_tweets_text = tweets.tweet.values    #gdyby lematyzer był wyłączony to w tekście wszystkie słowa
-            #tu rysujemy mapę słów
-            wordcloud = WordCloud(
-                background_color='black',
-                colormap='Pastel1',
-                width=1000,
-                height=500,
-                stopwords=stopwords,
-                regexp=r"\w[\w'\&\-]*\w")
-            wordcloud_img = wordcloud.generate(str(preprocessed_tweets_text))
-            wordcloud_img.to_file("images/file.png")    #mapę słów można zapisać
-            return wordcloud, preprocessed_tweets_text
+                    stopwords = service.stopwords()
+                    docs = service.lemmatize(missing, batch_size)
+            else:       #model nie jest potrzebny, stopwords zależą tylko od języka
+                stopwords = set(spacy.util.get_lang_class(lemmatizer_language).Defaults.stop_words)
+            stopwords.add("RT")
+            self.progress.stage("Lematyzacja")
+            if lemmatizer_enabled:               #tutaj lematyzacja słów, tweety przetwarzamy paczkami
+                lemmas = itertools.chain(known, remember_lemmas(docs, lemma_cache))
+                for done, tweet_lemmas in enumerate(lemmas, 1):
+                    if done % batch_size == 0:       #po każdej paczce pokazujemy postęp i sprawdzamy przerwanie
+                        self.progress.update(done, len(texts))
+                        self.progress.check_cancelled()
+                    for lemma in tweet_lemmas:     #do tekstu do przetworzenia dodajemy tylko słowa znaczące
+                        if lemma not in stopwords:
+                            word_counts.update(word_pattern.findall(lemma))
+                self.progress.update(len(texts), len(texts))
+                if lemma_cache is not None:
+                    lemma_cache.save()
+            else:
+                for text in texts:    #gdyby lematyzer był wyłączony to liczymy wszystkie słowa
+                    word_counts.update(word_pattern.findall(text))
+            frequencies = count_top_words(word_counts, stopwords)
+            self.result = {"frequencies": frequencies}
+            self.progress.stage("Rysowanie chmury słów")
+            wordcloud = render_word_cloud(frequencies)
+            self.image = wordcloud.to_image()       #obraz zostaje w pamięci, plik zapisuje dopiero użytkownik
+            return wordcloud, frequencies
+        except FeatureCancelled:
+            raise
         except ValueError:                  #obsługa wyjątków
             print("Generate word cloud - Blad wartosci")
             return None
@@ -109,53 +257,56 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
             print("Generate word cloud - Cos poszlo nie tak: {excType} {excMsg}"
                   .format(excType=type(exc).__name__, excMsg=str(exc)))
             return None
+        finally:
+            if service is not None:
+                service.close()
 
     def generate_interconnections_network(self, option):
-        interconnections_network = self.create_interconnections_network(option)
+        interconnections_network = self.create_interconnections_network(option,
+                                                                        interaction_store=self.interaction_store)
         return interconnections_network is not None
 
-    def create_interconnections_network(self, option): #tu utworzenie grafu powiązań
+    def create_interconnections_network(self, option, max_workers=friends_fetch_workers, depth=crawl_depth,
+                                        fetch_budget=crawl_fetch_budget, interaction_store=None): #tu utworzenie grafu powiązań
+        self.progress.stage("Pobieranie tweetów")
         tweets = self.get_tweets(self.user_name, self.search_words, self.Since, self.Until, self.num_of_tweets)
         if tweets.empty:
             return None
+        self.progress.update(len(tweets))
         try:
-            def get_friends():               #szukamy wszystkich wspominków danego konta o innych by mieć wierzchołki grafu
-                rtsmts = set()
-                rtsmts.add(self.user_name.lower())
-                for r in tweets.iterrows():
-                    text = r[1]['tweet']
-                    mts = set(re.findall(r"@(\w+)", text))
-                    for mt in mts:
-                        mt = mt.lower()
-                        rtsmts.add(mt)
-                return rtsmts
-            g = igraph.Graph(directed=True)   #tworzymy graf
-            rtsmts = get_friends()
-            for rtmt in rtsmts:
-                g.add_vertex(rtmt)          #tu dodajemy wierzchołki
-            relations = dict()
-            for someone in rtsmts:
-                relations[someone] = dict()    #kolejno zliczamy interakcje użytkowników grafu ze sobą
-                friend_tweets = self.get_tweets(someone, self.search_words, self.Since, self.Until, self.num_of_tweets)
+            scope = interactions_scope(self.search_words, self.Since, self.Until, self.num_of_tweets)
+
+            def get_friend_mentions(someone):
+                if interaction_store is not None:      #aktualne wspominki (lub brak konta) bierzemy z dysku
+                    mentions = interaction_store.get_mentions(scope, someone)
+                    if mentions is not None:
+                        return mentions
+                try:
+                    friend_tweets = self.get_tweets(someone, self.search_words, self.Since, self.Until,
+                                                    self.num_of_tweets, raise_errors=True)
+                except Exception:   #błąd pobierania (sieć, limit zapytań) to nie brak konta - nic nie zapisujemy
+                    return dict()
                 if friend_tweets.empty:       # w razie braku tweetów danego użytkownika informujemy o tym i idziemy dalej
                     print("Generate interconnections network - Brak konta, user:", someone)
-                    continue
-                for r in friend_tweets.iterrows():      #zliczanie odbywa się tutaj, interakcja to wspomnienie jednego użytkownika o drugim
-                    text = r[1]['tweet']
-                    mts = set(re.findall(r"@(\w+)", text))
-                    for mt in mts:
-                        mt = mt.lower()
-                        if mt in rtsmts:
-                            if mt != someone:
-                                if mt in relations[someone]:
-                                    relations[someone][mt] = relations[someone][mt] + 1
-                                else:
-                                    relations[someone][mt] = 1
-
-            for someone in rtsmts:
-                temp = relations[someone]
-                for key, value in temp.items():       #tutaj dodajemy krawędzie do grafu, grubość krawędzi zależy od liczby interakcji między dwoma kontami
-                    g.add_edge(someone, key)
+                mentions = mentioned_accounts(someone, friend_tweets)
+                if interaction_store is not None:
+                    interaction_store.store_mentions(scope, someone, mentions, missing=friend_tweets.empty)
+                return mentions
+            # wierzchołkami są konto i konta wspominane (do głębokości depth), interakcja to wspomnienie jednego o drugim
+            def friend_fetched(fetched, known):     #każde pobrane konto to okazja do przerwania pracy
+                self.progress.update(fetched, known)
+                self.progress.check_cancelled()
+            self.progress.stage("Pobieranie powiązanych kont")
+            crawler = InteractionCrawler(get_friend_mentions, depth=depth, fetch_budget=fetch_budget,
+                                         max_workers=max_workers, on_fetched=friend_fetched)
+            root = self.user_name.lower()
+            root_mentions = mentioned_accounts(root, tweets)
+            if interaction_store is not None:
+                interaction_store.store_mentions(scope, root, root_mentions)
+            rtsmts, relations = crawler.crawl(root, root_mentions)
+
+            self.progress.stage("Budowanie grafu")
+            g = build_interactions_graph(rtsmts, relations)   #tworzymy graf, grubość krawędzi zależy od liczby interakcji
             x = 1000 * math.log(len(rtsmts))               #tu ustawiamy rozdzielczość
             y = 600 * math.log(len(rtsmts))
             visual_style = {                      #tu ustawiamy jak graf ma wyglądać
@@ -164,23 +315,26 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
                 "vertex_label_dist": 2,
                 "margin": 250,
                 "bbox": (x, y),
-                "vertex_label": rtsmts,
-                "edge_width":
-                    [math.log(2 * relations[g.vs[edge.source]["name"]][g.vs[edge.target]["name"]], 1.5)
-                     for edge in g.es]
+                "vertex_label": g.vs["name"],
+                "edge_width": [math.log(2 * weight, 1.5) for weight in g.es["weight"]]
             }
-            if option == "Optimal Modularity":              #tutaj jest obsługa wyboru metody grupowania kont
-                comm = g.community_optimal_modularity()
-            elif option == "Spinglass":
-                comm = g.community_spinglass()
-            elif option == "Label Propagation":
-                comm = g.community_label_propagation()
-            elif option == "Infomap":
-                comm = g.community_infomap()
-            else:
+            self.progress.update(g.vcount())
+            if option not in community_detection_methods:     #tutaj jest obsługa wyboru metody grupowania kont
                 return None
-            igraph.plot(comm, "images/file.png", **visual_style, mark_groups=True)    #graf można zapisać do pliku
+            self.progress.stage("Grupowanie kont")
+            comm, self.community_detection = detect_communities(g, option)    #metoda dobrana do wielkości grafu, z limitem czasu
+            print("Generate interconnections network - metoda grupowania: {method}, czas: {time:.2f} s"
+                  .format(**self.community_detection))
+            names = g.vs["name"]
+            self.result = {"communities": dict(zip(names, comm.membership)),    #konto -> numer grupy
+                           "interactions": [{"source": names[edge.source], "target": names[edge.target],
+                                             "weight": edge["weight"]} for edge in g.es],
+                           "community_detection": self.community_detection}
+            self.progress.stage("Rysowanie grafu")
+            self.image = render_graph(comm, visual_style)
             return g
+        except FeatureCancelled:
+            raise
         except ValueError:
             print("Generate interconnections network - Blad wartosci")     #obsługa wyjątków
             return None
@@ -197,58 +351,22 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
         def generate_account_info(df):
             date1 = pd.to_datetime(df.iloc[0].date)
             date2 = pd.to_datetime(df.iloc[int(self.num_of_tweets_read) - 1].date)
-            usersdict = dict()
-            for tweet in df.tweet:           #zliczamy wspominki o innych kontach
-                mts = set(re.findall(r"@(\w+)", tweet))
-                for mt in mts:
-                    mt = mt.lower()
-                    if mt in usersdict:
-                        usersdict[mt] = usersdict[mt] + 1
-                    else:
-                        usersdict[mt] = 1
-            hourdict = dict()           #zliczamy tweety wg godzin napisania
-            for hour in df.hour:
-                if hour in hourdict:
-                    hourdict[hour] = hourdict[hour] + 1
-                else:
-                    hourdict[hour] = 1
-            account_stats = {             #tutaj przechowujemy wszystkie statystyki
-                'avglikes': round(sum(df[df.retweet == False].nlikes) / len(df[df.retweet == False].nlikes)),   #średnia, maksimum, minimum i mediana liczby polubień i udostępnień
-                'maxlikes': max(df[df.retweet == False].nlikes),
-                'minlikes': min(df[df.retweet == False].nlikes),
-                'medianlikes': statistics.median(df[df.retweet == False].nlikes),
-                'avgretweets': round(sum(df[df.retweet == False].nretweets) /
-                                     len(df[df.retweet == False].nretweets)),
-                'maxretweets': max(df[df.retweet == False].nretweets),
-                'minretweets': min(df[df.retweet == False].nretweets),
-                'medianretweets': statistics.median(df[df.retweet == False].nretweets),
-                'interval': (date1 - date2) / (int(self.num_of_tweets_read) - 1),       #średni odstęp między tweetami
-                'places': set(),                    #miejsca, z których pisano
-                'hashtagdict': dict(),              #hasztagi, których użyto
-                'usersdict': dict(sorted(usersdict.items(), key=lambda x: x[1])),    #uzytkownicy, o których wspomniano
-                'hourdict': dict(sorted(hourdict.items(), key=lambda x: x[1]))}     #i godziny napisania
-
-            for place in df.place:               #tu miejsca, z których pisano są zliczane
-                if place != '':
-                    account_stats['places'].add(place)
-
-            # for hashtags loaded from tweeter twint provides them as list of strings
-            for hashtags in df.hashtags:
-                for hashtag in hashtags:
-                    if hashtag:
-                        if hashtag in account_stats['hashtagdict']:
-                            account_stats['hashtagdict'][hashtag] = account_stats['hashtagdict'][hashtag] + 1
-                        else:
-                            account_stats['hashtagdict'][hashtag] = 1
+            account_stats = compute_account_stats(df)         #tutaj przechowujemy wszystkie statystyki
+            account_stats['interval'] = (date1 - date2) / (int(self.num_of_tweets_read) - 1)   #średni odstęp między tweetami
             return account_stats
 
+        self.progress.stage("Pobieranie tweetów")
         data_frame = self.get_tweets(self.user_name, self.search_words, self.Since, self.Until, self.num_of_tweets)   #by mieć statystyki potrzebujemy tweetów
         if data_frame.empty:
             return None
+        self.progress.update(len(data_frame))
+        self.progress.stage("Liczenie statystyk")
+        self.progress.update(len(data_frame))
         account_stats = generate_account_info(data_frame)
+        self.result = account_stats
 
         def generate_statistics_chart():              #wyświetlenie wykresu popularności (liczby polubień i udostępnień)
-            plt.figure(figsize=(12, 5))
+            figure = plt.figure(figsize=(12, 5))
 
             values_name = {'maxlikes': "Największa liczba like'ów",
                            'avglikes': "Średnia ilość like'ów",
@@ -263,7 +381,7 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
             plt.barh(list(values_name.values()), values_count)
             plt.xlabel("Wartość"), plt.ylabel("Nazwa")
             plt.tight_layout()
-            plt.savefig("images/file.png")
+            return figure_to_image(figure)
 
         def generate_tweets_hour_chart():           #wyświetlenie wykresu godzin, o których pisano wg UTC+1
             hours_dict = account_stats["hourdict"]
@@ -283,7 +401,7 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
 
             utc = timezone_to_string()
 
-            plt.figure(figsize=(12, 5))
+            figure = plt.figure(figsize=(12, 5))
 
             plt.bar(hours, tweets_hour_count)
             plt.title("Wykres ilości publikowanych tweetów w zależności od godziny")
@@ -291,7 +409,7 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
             plt.ylabel("Ilość wstawionych tweetów")
             plt.ylim(0, max(list(hours_dict.values())) + 10)
             plt.tight_layout()
-            plt.savefig("images/file.png")
+            return figure_to_image(figure)
 
         def generate_hashtag_chart():              #wyświetlenie najczęściej użytych hasztagów
             hashtag_dict = account_stats["hashtagdict"]
@@ -301,23 +419,42 @@ class TweetsData:       #tworzymy obiekt klasy TweetsData, który ma wszystkie m
             hashtag_name = [i[0] for i in filter_hashtag]
             hashtag_count = [i[1] for i in filter_hashtag]
 
-            plt.figure(figsize=(12, 5))
+            figure = plt.figure(figsize=(12, 5))
             plt.barh(hashtag_name, hashtag_count)
             plt.title("Wykres 10 najczęściej występujących hashtagów")
             plt.xlabel("Ilość wystąpień hashtagu"), plt.ylabel("Nazwa hashtagu")
             plt.tight_layout()
-            plt.savefig("images/file.png")
+            return figure_to_image(figure)
+
+        def generate_summary_table():           #bez wybranego wykresu pokazujemy tabelę z podsumowaniem konta
+            rows = [("Liczba tweetów", len(data_frame)),
+                    ("Średni odstęp między tweetami", str(account_stats["interval"]).split(".")[0]),
+                    ("Miejsca publikacji", ", ".join(sorted(account_stats["places"])) or "-")]
+            for name, label in [("likes", "like'ów"), ("retweets", "retweet'ów")]:
+                for stat, stat_label in [("avg", "Średnia"), ("median", "Mediana"), ("max", "Największa"),
+                                         ("min", "Najmniejsza")]:
+                    if stat + name in account_stats:
+                        rows.append(("{stat} liczba {name}".format(stat=stat_label, name=label),
+                                     account_stats[stat + name]))
+            figure = plt.figure(figsize=(12, 5))
+            plt.axis("off")
+            plt.title("Podsumowanie konta")
+            plt.table(cellText=[[label, str(value)] for label, value in rows], colLabels=["Statystyka", "Wartość"],
+                      loc="center", cellLoc="left")
+            plt.tight_layout()
+            return figure_to_image(figure)
 
+        self.progress.stage("Rysowanie wykresu")
         matplotlib.use('Agg')  # block showing extra images
         plt.style.use('ggplot')
         if option == 0:
-            pass
+            self.image = generate_summary_table()
         elif option == 1:
-            generate_statistics_chart()
+            self.image = generate_statistics_chart()
         elif option == 2:
-            generate_tweets_hour_chart()
+            self.image = generate_tweets_hour_chart()
         elif option == 3:
-            generate_hashtag_chart()
+            self.image = generate_hashtag_chart()
         else:
             return None
         return account_stats
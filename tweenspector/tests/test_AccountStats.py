@@ -0,0 +1,75 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import statistics
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import tweenspector.AccountStats as AcSt
+
+
+def generate_tweets(count, seed=0):
+    rng = np.random.default_rng(seed)
+    users = np.array(["@Ala", "@kot", "@MZ_GOV_PL", ""])
+    return pd.DataFrame({
+        "tweet": ["Tweet {m} {m2} {n}".format(m=users[i % 4], m2=users[(i * 7) % 4], n=i) for i in range(count)],
+        "hour": ["{h:02d}".format(h=h) for h in rng.integers(0, 24, count)],
+        "nlikes": rng.integers(0, 10000, count),
+        "nretweets": rng.integers(0, 1000, count),
+        "retweet": rng.random(count) < 0.2,
+        "place": rng.choice(["", "Warszawa", "Kraków"], count),
+        "hashtags": [["covid", "lextvn"][:i % 3] for i in range(count)]
+    })
+
+
+class TestAccountStats(unittest.TestCase):
+    def test_engagement_stats_match_python_statistics(self):
+        tweets = generate_tweets(1001)
+        originals = tweets[tweets.retweet == False]
+        stats = AcSt.compute_account_stats(tweets)
+        self.assertEqual(stats["avglikes"], round(sum(originals.nlikes) / len(originals)))
+        self.assertEqual(stats["maxlikes"], max(originals.nlikes))
+        self.assertEqual(stats["minretweets"], min(originals.nretweets))
+        self.assertEqual(stats["medianlikes"], statistics.median(originals.nlikes))
+        self.assertEqual(stats["medianretweets"], statistics.median(originals.nretweets))
+        self.assertIsInstance(stats["maxlikes"], int)
+
+    def test_median_has_type_of_statistics_median(self):
+        for count in [1001, 1000]:
+            with self.subTest(count=count):
+                tweets = generate_tweets(count)
+                originals = tweets[tweets.retweet == False]
+                stats = AcSt.compute_account_stats(tweets)
+                expected = statistics.median(originals.nlikes)
+                self.assertEqual(stats["medianlikes"], expected)
+                self.assertIsInstance(stats["medianlikes"], int if len(originals) % 2 else float)
+        self.assertEqual(str(AcSt.median_value(1216.0, 3)), "1216")
+        self.assertEqual(str(AcSt.median_value(1216.5, 4)), "1216.5")
+
+    def test_engagement_uses_only_numeric_columns(self):
+        tweets = generate_tweets(100)
+        with patch("tweenspector.AccountStats.engagement_stats", wraps=AcSt.engagement_stats) as mock_engagement:
+            AcSt.compute_account_stats(tweets)
+        originals = mock_engagement.call_args.args[0]
+        self.assertEqual(list(originals.columns), ["nlikes", "nretweets"])
+        self.assertEqual(len(originals), int((~tweets.retweet).sum()))
+
+    def test_counts(self):
+        tweets = pd.DataFrame({
+            "tweet": ["@Ala @ala ma kota @kot", "RT @kot: miau", "bez wspominków"],
+            "hour": ["10", "12", "10"],
+            "nlikes": [1, 2, 3],
+            "nretweets": [0, 0, 1],
+            "retweet": [False, True, False],
+            "place": ["", "Warszawa", ""],
+            "hashtags": [["kot", ""], [], ["kot", "pies"]]
+        })
+        stats = AcSt.compute_account_stats(tweets)
+        self.assertEqual(stats["usersdict"], {"ala": 1, "kot": 2})
+        self.assertEqual(list(stats["usersdict"].values()), [1, 2])
+        self.assertEqual(stats["hourdict"], {"12": 1, "10": 2})
+        self.assertEqual(stats["hashtagdict"], {"kot": 2, "pies": 1})
+        self.assertEqual(stats["places"], {"Warszawa"})
+        self.assertEqual(stats["avglikes"], 2)
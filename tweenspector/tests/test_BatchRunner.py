@@ -0,0 +1,136 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import datetime
+import json
+import multiprocessing
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+import numpy as np
+from PIL import Image
+import tweenspector.BatchRunner as BtRn
+
+
+def fake_feature(success=True):
+    def create(*args, **kwargs):
+        strategy = MagicMock()
+        strategy.generate_image = MagicMock(return_value=Image.new("RGB", (4, 4)) if success else None)
+        strategy.data = MagicMock(return_value={"places": {"Warszawa"}, "interval": datetime.timedelta(minutes=2),
+                                                "maxlikes": np.int64(7)} if success else None)
+        return strategy
+    return MagicMock(side_effect=create)
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_jobs(self, data):
+        path = os.path.join(self.temp_dir.name, "jobs.json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+        return path
+
+    def test_load_jobs_applies_defaults(self):
+        path = self.write_jobs({"defaults": {"date_from": "2022-01-01", "date_to": "2022-02-01", "stats_option": 2},
+                                "accounts": ["ala", {"user_name": "kot", "features": ["stats"], "tweets_count": 100}]})
+        jobs = BtRn.load_jobs(path)
+        self.assertEqual([job["user_name"] for job in jobs], ["ala", "kot"])
+        self.assertEqual(jobs[0]["features"], ["words", "network", "stats"])
+        self.assertEqual(jobs[0]["stats_option"], 2)
+        self.assertEqual(jobs[1]["features"], ["stats"])
+        self.assertEqual(jobs[1]["tweets_count"], 100)
+        self.assertEqual(jobs[1]["date_from"], "2022-01-01")
+
+    def test_load_jobs_accepts_plain_list(self):
+        jobs = BtRn.load_jobs(self.write_jobs(["ala"]))
+        self.assertEqual(jobs[0]["user_name"], "ala")
+        self.assertLess(jobs[0]["date_from"], jobs[0]["date_to"])
+
+    def test_load_jobs_rejects_unknown_features(self):
+        with self.assertRaises(ValueError):
+            BtRn.load_jobs(self.write_jobs([{"user_name": "ala", "features": ["cloud"]}]))
+
+    def test_run_job_writes_images_and_result(self):
+        features = {"words": fake_feature(), "network": fake_feature(success=False),
+                    "stats": fake_feature()}
+        job = BtRn.load_jobs(self.write_jobs(["ala/kot"]))[0]
+        with patch.dict(BtRn.batch_features, features):
+            result = BtRn.run_job(job, self.temp_dir.name)
+        account_dir = os.path.join(self.temp_dir.name, "ala_kot")
+        self.assertEqual(result["output"], account_dir)
+        with Image.open(os.path.join(account_dir, "words.png")) as image:
+            self.assertEqual(image.size, (4, 4))
+        self.assertTrue(os.path.exists(os.path.join(account_dir, "stats.png")))
+        self.assertFalse(os.path.exists(os.path.join(account_dir, "network.png")))
+        with open(os.path.join(account_dir, "result.json"), encoding="utf-8") as file:
+            saved = json.load(file)
+        self.assertEqual(saved["user_name"], "ala/kot")
+        self.assertEqual(saved["features"]["words"]["image"], "words.png")
+        self.assertFalse(saved["features"]["network"]["success"])
+        self.assertNotIn("data", saved["features"]["network"])
+        with open(os.path.join(account_dir, saved["features"]["stats"]["data"]), encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {"places": ["Warszawa"], "interval": 120.0, "maxlikes": 7})
+        features["stats"].assert_called_once_with("ala/kot", None, job["date_from"], job["date_to"], 500, 1,
+                                                  tweet_cache=BtRn.worker_state.get("tweet_cache"),
+                                                  session_cache=BtRn.session_cache,
+                                                  interaction_store=BtRn.worker_state.get("interaction_store"),
+                                                  tweet_source=BtRn.worker_state.get("tweet_source"),
+                                                  lemma_cache=BtRn.worker_state.get("lemma_cache"))
+
+    @patch("tweenspector.BatchRunner.print")
+    def test_main_writes_summary(self, mock_print):
+        path = self.write_jobs({"defaults": {"features": ["words"]}, "accounts": ["ala", "kot"]})
+        output = os.path.join(self.temp_dir.name, "reports")
+        with patch.dict(BtRn.batch_features, {"words": fake_feature()}):
+            ret = BtRn.main([path, "--output", output, "--workers", "1"])
+        self.assertEqual(ret, 0)
+        with open(os.path.join(output, "summary.json"), encoding="utf-8") as file:
+            summary = json.load(file)
+        self.assertEqual(sorted(result["user_name"] for result in summary), ["ala", "kot"])
+
+    @patch("tweenspector.BatchRunner.print")
+    def test_main_writes_empty_summary_without_jobs(self, mock_print):
+        path = self.write_jobs({"defaults": {"features": ["words"]}, "accounts": []})
+        output = os.path.join(self.temp_dir.name, "reports")
+        ret = BtRn.main([path, "--output", output, "--workers", "1"])
+        self.assertEqual(ret, 0)
+        with open(os.path.join(output, "summary.json"), encoding="utf-8") as file:
+            self.assertEqual(json.load(file), [])
+
+    @unittest.skipUnless(multiprocessing.get_start_method() == "fork", "workers inherit patched features only with fork")
+    @patch("tweenspector.BatchRunner.print")
+    def test_main_runs_jobs_in_worker_processes(self, mock_print):
+        path = self.write_jobs({"defaults": {"features": ["words"]}, "accounts": ["ala", "kot", "pies"]})
+        output = os.path.join(self.temp_dir.name, "reports")
+        with patch.dict(BtRn.batch_features, {"words": fake_feature()}), \
+                patch("tweenspector.BatchRunner.shared_rate_limiters",
+                      wraps=BtRn.shared_rate_limiters) as mock_shared_rate_limiters:
+            ret = BtRn.main([path, "--output", output, "--workers", "2"])
+        self.assertEqual(ret, 0)
+        mock_shared_rate_limiters.assert_called_once()
+        for user_name in ["ala", "kot", "pies"]:
+            self.assertTrue(os.path.exists(os.path.join(output, user_name, "words.png")))
+
+    def test_init_worker_installs_shared_rate_limiters(self):
+        limiters = {"example.com": MagicMock()}
+        with patch("tweenspector.BatchRunner.install_rate_limiters") as mock_install, \
+                patch("tweenspector.BatchRunner.tweet_cache_for"), patch("tweenspector.BatchRunner.interaction_store_for"), \
+                patch("tweenspector.BatchRunner.LemmaCache"), patch.dict(BtRn.worker_state):
+            BtRn.init_worker("twint", None, limiters)
+        mock_install.assert_called_once_with(limiters)
+
+    def test_job_succeeded(self):
+        self.assertTrue(BtRn.job_succeeded({"features": {"words": {"success": True}}}))
+        self.assertFalse(BtRn.job_succeeded({"features": {"words": {"success": False}}}))
+        self.assertFalse(BtRn.job_succeeded({"user_name": "ala", "error": "Exception"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
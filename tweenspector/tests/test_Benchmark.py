@@ -0,0 +1,97 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import MagicMock, patch
+import tweenspector.Benchmark as Bnch
+
+
+def make_results(total, stages):
+    return {"results": [{"feature": "stats", "rows": 1000, "success": True, "total": total, "stages": stages}]}
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_generate_tweets_has_twint_columns(self):
+        tweets = Bnch.generate_tweets(500, "ala", seed=1, date_from="2022-01-01", date_to="2022-02-01")
+        for column in ["id", "tweet", "date", "hour", "nlikes", "nretweets", "retweet", "hashtags", "place",
+                       "username"]:
+            self.assertIn(column, tweets.columns)
+        self.assertEqual(len(tweets), 500)
+        self.assertEqual(tweets["id"].nunique(), 500)
+        self.assertTrue(tweets["date"].between("2022-01-01", "2022-02-01").all())
+        self.assertEqual(list(tweets["date"]), sorted(tweets["date"], reverse=True))
+        self.assertTrue(tweets["tweet"].str.contains("@konto").any())
+        self.assertTrue((tweets["hashtags"].str.len() > 0).any())
+        self.assertTrue(tweets.equals(Bnch.generate_tweets(500, "ala", seed=1, date_from="2022-01-01",
+                                                           date_to="2022-02-01")))
+
+    def test_synthetic_source_generates_each_account_once(self):
+        source = Bnch.SyntheticSource("Ala", 300, friend_rows=20)
+        tweets = source.fetch("ala", None, "2022-01-01", "2022-02-01", 1000)
+        self.assertEqual(len(tweets), 300)
+        self.assertEqual(len(source.fetch("konto1", None, "2022-01-01", "2022-02-01", 1000)), 20)
+        self.assertEqual(len(source.fetch("ala", None, "2022-01-01", "2022-02-01", 100)), 100)
+        self.assertEqual(len(source.tweets), 2)
+
+    @patch("tweenspector.Benchmark.time.perf_counter")
+    def test_stage_timer_sums_stage_times(self, mock_perf_counter):
+        mock_perf_counter.side_effect = [0, 1, 1, 3, 3, 7]
+        timer = Bnch.StageTimer()
+        for name in ["Pobieranie", "Liczenie", "Pobieranie"]:
+            timer.stage(name)
+        timer.finish()
+        timer.finish()
+        self.assertEqual(timer.stages, {"Pobieranie": 5, "Liczenie": 2})
+
+    @patch("tweenspector.TweetsData.print")
+    def test_run_benchmark_times_stats_stages(self, mock_print):
+        result = Bnch.run_benchmark("stats", 200, Bnch.SyntheticSource("benchmark", 200))
+        self.assertTrue(result["success"])
+        self.assertEqual(list(result["stages"]), ["Pobieranie tweetów", "Liczenie statystyk", "Rysowanie wykresu"])
+        self.assertGreaterEqual(result["total"], sum(result["stages"].values()))
+
+    def test_run_benchmark_records_errors(self):
+        with patch.dict(Bnch.benchmark_features, {"stats": MagicMock(side_effect=KeyError("nlikes"))}):
+            result = Bnch.run_benchmark("stats", 10, Bnch.SyntheticSource("benchmark", 10))
+        self.assertFalse(result["success"])
+        self.assertIn("KeyError", result["error"])
+
+    def test_compare_results_reports_slower_stages(self):
+        baseline = make_results(1.0, {"Liczenie statystyk": 0.5, "Rysowanie wykresu": 0.01})
+        current = make_results(1.1, {"Liczenie statystyk": 0.8, "Rysowanie wykresu": 0.04})
+        regressions = Bnch.compare_results(current, baseline, tolerance=0.2, min_seconds=0.05)
+        self.assertEqual([regression["stage"] for regression in regressions], ["Liczenie statystyk"])
+        self.assertAlmostEqual(regressions[0]["change"], 0.6)
+        self.assertEqual(Bnch.compare_results(current, {"results": []}), [])
+
+    def test_measure_startup_imports_in_new_process(self):
+        startup = Bnch.measure_startup(["LazyImport"])
+        self.assertEqual(list(startup), ["LazyImport"])
+        self.assertGreater(startup["LazyImport"], 0)
+
+    def test_compare_results_reports_slower_startup(self):
+        baseline = dict(make_results(1.0, {}), startup={"TweetsData": 0.5, "MainApplication": 0.6})
+        current = dict(make_results(1.0, {}), startup={"TweetsData": 1.5, "MainApplication": 0.6})
+        regressions = Bnch.compare_results(current, baseline)
+        self.assertEqual([(r["feature"], r["stage"]) for r in regressions], [("startup", "TweetsData")])
+
+    @patch("tweenspector.Benchmark.print")
+    def test_main_writes_results_and_compares_with_baseline(self, mock_print):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output = os.path.join(temp_dir, "benchmark.json")
+            baseline = os.path.join(temp_dir, "baseline.json")
+            with open(baseline, "w", encoding="utf-8") as file:
+                json.dump(make_results(0.1, {"Liczenie statystyk": 0.05}), file)
+            with patch("tweenspector.Benchmark.run_suite", return_value=make_results(1.0, {"Liczenie statystyk": 0.9})):
+                self.assertEqual(Bnch.main(["-o", output]), 0)
+                self.assertEqual(Bnch.main(["-o", output, "--baseline", baseline]), 1)
+            with open(output, encoding="utf-8") as file:
+                self.assertEqual(json.load(file)["results"][0]["total"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
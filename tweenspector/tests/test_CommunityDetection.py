@@ -0,0 +1,63 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+from unittest.mock import patch
+import igraph
+import tweenspector.CommunityDetection as CmDt
+
+
+def weighted_graph(graph):
+    graph.es["weight"] = [1] * graph.ecount()
+    return graph
+
+
+class TestCommunityDetection(unittest.TestCase):
+    def test_small_graph_uses_optimal_modularity(self):
+        g = weighted_graph(igraph.Graph.Famous("Zachary"))
+        self.assertEqual(CmDt.choose_method(g), "Optimal Modularity")
+
+    def test_large_sparse_graph_uses_infomap(self):
+        g = weighted_graph(igraph.Graph.Ring(1000))
+        self.assertEqual(CmDt.choose_method(g), "Infomap")
+        self.assertFalse(CmDt.is_feasible(g, "Optimal Modularity"))
+
+    def test_spinglass_needs_connected_graph(self):
+        g = weighted_graph(igraph.Graph(n=50, edges=[(0, 1), (2, 3)]))
+        self.assertFalse(CmDt.is_feasible(g, "Spinglass"))
+
+    @patch("tweenspector.CommunityDetection.community_inline_max_vertices", 100)
+    def test_infeasible_method_is_replaced(self):
+        g = weighted_graph(igraph.Graph.Ring(60))
+        comm, info = CmDt.detect_communities(g, "Optimal Modularity")
+        self.assertEqual(info["requested"], "Optimal Modularity")
+        self.assertEqual(info["method"], "Infomap")
+        self.assertEqual(len(comm.membership), 60)
+
+    def test_small_graph_is_clustered_inline(self):
+        g = weighted_graph(igraph.Graph.Full(5) + igraph.Graph.Full(5))
+        comm, info = CmDt.detect_communities(g, CmDt.automatic_community_detection)
+        self.assertEqual(info["method"], "Optimal Modularity")
+        self.assertFalse(info["fallback"])
+        self.assertEqual(len(set(comm.membership)), 2)
+
+    def test_method_runs_in_worker_process(self):
+        g = weighted_graph(igraph.Graph.Full(10) + igraph.Graph.Full(10))
+        comm, info = CmDt.detect_communities(g, "Infomap", timeout=60)
+        self.assertEqual(info["method"], "Infomap")
+        self.assertIsInstance(comm, igraph.VertexClustering)
+        self.assertEqual(len(set(comm.membership)), 2)
+
+    @patch("tweenspector.CommunityDetection.print")
+    def test_falls_back_when_budget_runs_out(self, mock_print):
+        g = weighted_graph(igraph.Graph.Full(10) + igraph.Graph.Full(10))
+        comm, info = CmDt.detect_communities(g, "Spinglass", timeout=0, fallback_timeout=0)
+        self.assertEqual(info["requested"], "Spinglass")
+        self.assertEqual(info["method"], "Label Propagation")
+        self.assertTrue(info["fallback"])
+        self.assertEqual(len(comm.membership), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import queue
+from tweenspector.FeatureProgress import FeatureProgress, FeatureWorker, FeatureCancelled
+
+
+class TestFeatureProgress(unittest.TestCase):
+    def test_events_are_posted_in_order(self):
+        progress = FeatureProgress(queue.Queue())
+        progress.stage("Pobieranie tweetów")
+        progress.update(5)
+        progress.update(2, 10)
+        self.assertEqual(progress.poll(), [("stage", "Pobieranie tweetów"), ("progress", 5, None),
+                                           ("progress", 2, 10)])
+        self.assertEqual(progress.poll(), [])
+
+    def test_progress_without_queue_ignores_events(self):
+        progress = FeatureProgress()
+        progress.stage("Lematyzacja")
+        progress.update(1, 2)
+        self.assertEqual(progress.poll(), [])
+
+    def test_stage_raises_after_cancel(self):
+        progress = FeatureProgress()
+        progress.update(1)
+        progress.cancel()
+        self.assertTrue(progress.cancelled)
+        with self.assertRaises(FeatureCancelled):
+            progress.stage("Lematyzacja")
+
+    def test_worker_keeps_result_or_error(self):
+        def failing_task():
+            raise ValueError("error")
+        for task, result, error in [(lambda: True, True, None), (failing_task, None, ValueError)]:
+            with self.subTest(error=error):
+                progress = FeatureProgress(queue.Queue())
+                worker = FeatureWorker(task, progress)
+                worker.start()
+                worker.join()
+                self.assertEqual(worker.result, result)
+                self.assertEqual(type(worker.error) if worker.error else None, error)
+                self.assertEqual(progress.poll(), [("done",)])
+
+
+if __name__ == '__main__':
+    unittest.main()
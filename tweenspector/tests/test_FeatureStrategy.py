@@ -29,6 +29,19 @@ class TestFeatureStrategy(unittest.TestCase):
         self.assertTrue(UserWordConnection.generate_image(mock_uwc))
         mock_gwc.assert_called_once_with()
 
+    def test_generate_image_returns_image_of_feature(self):
+        mock_uwc = MagicMock()
+        mock_uwc.program_feature.generate_word_cloud = MagicMock(return_value=True)
+        self.assertIs(UserWordConnection.generate_image(mock_uwc), mock_uwc.program_feature.image)
+        mock_uwc.program_feature.generate_word_cloud = MagicMock(return_value=False)
+        self.assertIsNone(UserWordConnection.generate_image(mock_uwc))
+
+    def test_data_returns_result_of_feature(self):
+        fs = FeatureStrategy("TestUser", "", "04-10-2022", "03-11-2022", 100)
+        self.assertIsNone(fs.data())
+        fs.program_feature.result = {"frequencies": {"kot": 2}}
+        self.assertEqual(fs.data(), {"frequencies": {"kot": 2}})
+
     def test_RelatedPeopleConnection_generate_image(self):
         mock_gin = MagicMock(return_value=True)
         mock_o = MagicMock(return_value=None)
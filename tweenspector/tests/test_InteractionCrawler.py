@@ -0,0 +1,88 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import threading
+import pandas as pd
+from tweenspector.InteractionCrawler import InteractionCrawler, Frontier, membership_similarity, mentioned_accounts
+
+
+def tweets_mentioning(*names):
+    return pd.DataFrame({"id": [str(i) for i in range(len(names))], "tweet": ["@" + name for name in names]})
+
+
+class TestInteractionCrawler(unittest.TestCase):
+    network = {
+        "root": ["a", "a", "a", "b"],
+        "a": ["root", "c"],
+        "b": ["d"],
+        "c": ["e"],
+        "d": [],
+        "e": [],
+    }
+
+    def root_mentions(self):
+        return mentioned_accounts("root", tweets_mentioning(*self.network["root"]))
+
+    def crawler(self, **kwargs):
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch(name):
+            with lock:
+                fetched.append(name)
+            return mentioned_accounts(name, tweets_mentioning(*self.network.get(name, [])))
+        return InteractionCrawler(fetch, **kwargs), fetched
+
+    def test_depth_one_keeps_user_and_mentioned_accounts(self):
+        crawler, fetched = self.crawler(depth=1, fetch_budget=None)
+        accounts, relations = crawler.crawl("root", self.root_mentions())
+        self.assertEqual(set(accounts), {"root", "a", "b"})
+        self.assertCountEqual(fetched, ["a", "b"])
+        self.assertEqual(relations["root"], {"a": 3, "b": 1})
+        self.assertEqual(relations["a"], {"root": 1})
+
+    def test_deeper_crawl_visits_each_account_once(self):
+        crawler, fetched = self.crawler(depth=3, fetch_budget=None, check_every=0)
+        accounts, relations = crawler.crawl("root", self.root_mentions())
+        self.assertEqual(set(accounts), {"root", "a", "b", "c", "d", "e"})
+        self.assertEqual(sorted(fetched), ["a", "b", "c", "d", "e"])
+        self.assertEqual(relations["c"], {"e": 1})
+
+    def test_fetch_budget_prefers_most_mentioned_accounts(self):
+        crawler, fetched = self.crawler(depth=2, fetch_budget=2, max_workers=1, check_every=0)
+        accounts, relations = crawler.crawl("root", self.root_mentions())
+        self.assertEqual(fetched, ["a", "b"])
+        self.assertEqual(accounts, ["root", "a", "b"])
+
+    def test_crawl_stops_when_communities_do_not_change(self):
+        crawler, fetched = self.crawler(depth=3, fetch_budget=None, max_workers=1, check_every=1)
+        crawler.structure_is_stable = lambda state: len(crawler.accounts) >= 3
+        crawler.crawl("root", self.root_mentions())
+        self.assertTrue(crawler.stopped_early)
+        self.assertEqual(len(fetched), 2)
+
+    def test_frontier_orders_by_mention_count(self):
+        frontier = Frontier()
+        frontier.add("x", 1, 1)
+        frontier.add("y", 2, 1)
+        frontier.add("x", 2, 2)
+        self.assertEqual(frontier.pop(), ("x", 1))
+        self.assertEqual(frontier.pop(), ("y", 1))
+        self.assertIsNone(frontier.pop())
+
+    def test_mentioned_accounts(self):
+        self.assertEqual(mentioned_accounts("a", tweets_mentioning("b", "b", "a", "c")), {"b": 2, "c": 1})
+        self.assertEqual(mentioned_accounts("a", pd.DataFrame()), {})
+
+    def test_membership_similarity(self):
+        self.assertEqual(membership_similarity({"a": 0, "b": 0}, {"a": 3, "b": 3, "c": 1}), 1.0)
+        self.assertAlmostEqual(membership_similarity({"a": 0, "b": 0, "c": 1, "d": 1},
+                                                     {"a": 1, "b": 1, "c": 0, "d": 0}), 1.0)
+        self.assertLess(membership_similarity({"a": 0, "b": 0, "c": 1, "d": 1},
+                                              {"a": 0, "b": 1, "c": 0, "d": 1}), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
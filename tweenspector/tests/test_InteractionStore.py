@@ -0,0 +1,57 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import os
+import tempfile
+from tweenspector.InteractionStore import InteractionStore, interactions_scope, interaction_store_for
+from tweenspector.TweetSource import TwintSource, HttpSource, ArchiveSource
+
+
+class TestInteractionStore(unittest.TestCase):
+    scope = interactions_scope("", "2022-01-01", "2022-02-01", 500)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "interactions.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_database_is_created_on_first_use(self):
+        store = InteractionStore(self.path)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertIsNone(store.get_mentions(self.scope, "ala"))
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_mentions_are_kept_between_instances(self):
+        InteractionStore(self.path).store_mentions(self.scope, "ala", {"kot": 3, "pies": 1}, now=100)
+        store = InteractionStore(self.path, ttl=50)
+        self.assertEqual(store.get_mentions(self.scope, "ala", now=120), {"kot": 3, "pies": 1})
+        self.assertIsNone(store.get_mentions(self.scope, "ala", now=200))
+        self.assertIsNone(store.get_mentions(interactions_scope("kot", "2022-01-01", "2022-02-01", 500), "ala",
+                                             now=120))
+
+    def test_mentions_are_updated_in_place(self):
+        store = InteractionStore(self.path)
+        store.store_mentions(self.scope, "ala", {"kot": 3, "pies": 1}, now=100)
+        store.store_mentions(self.scope, "ala", {"kot": 4}, now=200)
+        self.assertEqual(store.get_mentions(self.scope, "ala", now=200), {"kot": 4})
+
+    def test_missing_accounts_use_their_own_ttl(self):
+        store = InteractionStore(self.path, ttl=1000, missing_ttl=10)
+        store.store_mentions(self.scope, "nikt", {}, missing=True, now=100)
+        self.assertEqual(store.get_mentions(self.scope, "nikt", now=105), {})
+        self.assertIsNone(store.get_mentions(self.scope, "nikt", now=120))
+
+    def test_each_tweet_source_has_own_store(self):
+        self.assertEqual(interaction_store_for(TwintSource(), self.path).path, self.path)
+        http_store = interaction_store_for(HttpSource("http://127.0.0.1:1"), self.path)
+        self.assertNotEqual(http_store.path, self.path)
+        self.assertEqual(os.path.dirname(http_store.path), self.temp_dir.name)
+        self.assertIsNone(interaction_store_for(ArchiveSource("tweets.csv"), self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import subprocess
+import sys
+import os
+import json
+from tweenspector.LazyImport import LazyModule
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_module_is_imported_on_first_use(self):
+        lazy_json = LazyModule("json")
+        self.assertFalse(lazy_json._lazy_loaded())
+        self.assertEqual(lazy_json.dumps([1]), "[1]")
+        self.assertTrue(lazy_json._lazy_loaded())
+        self.assertIs(lazy_json._lazy_load(), json)
+
+    def test_attribute_is_callable(self):
+        lazy_decoder = LazyModule("json", "JSONDecoder")
+        self.assertEqual(lazy_decoder().decode("[2]"), [2])
+        self.assertIs(lazy_decoder._lazy_load(), json.JSONDecoder)
+
+    def test_module_attributes_are_not_hidden(self):
+        lazy_json = LazyModule("json")
+        self.assertIs(lazy_json.load, json.load)     # e.g. spacy.load
+        self.assertIs(LazyModule("pickle").loads, __import__("pickle").loads)
+
+    def test_missing_module_fails_only_when_used(self):
+        lazy_missing = LazyModule("tweenspector_missing_module")
+        with self.assertRaises(ImportError):
+            lazy_missing.anything
+
+    def test_tweets_data_import_skips_heavy_libraries(self):
+        code = ("import sys; import TweetsData; "
+                "print([name for name in ['spacy', 'igraph', 'wordcloud', 'matplotlib', 'twint'] "
+                "if name in sys.modules])")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")).stdout
+        self.assertEqual(output.split()[-1], "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
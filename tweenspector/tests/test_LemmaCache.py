@@ -0,0 +1,102 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import os
+import tempfile
+import unicodedata
+import tweenspector.LemmaCache as LmCh
+from tweenspector.LemmaCache import LemmaCache, split_cached, remember_lemmas
+
+
+class TestLemmaCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "lemmas.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lookup_needs_all_tokens(self):
+        cache = LemmaCache(self.path)
+        cache.put("pl", "kota", "kot")
+        self.assertEqual(cache.lookup("pl", ["kota", "kota"]), ["kot", "kot"])
+        self.assertIsNone(cache.lookup("pl", ["kota", "psa"]))
+        self.assertIsNone(cache.lookup("en", ["kota"]))
+        self.assertEqual(cache.lookup("pl", []), [])
+        self.assertFalse(os.path.exists(self.path))     # nothing is written before save
+
+    def test_tokens_are_normalized(self):
+        cache = LemmaCache(self.path)
+        cache.put("pl", unicodedata.normalize("NFD", "Łódź"), "Łódź")
+        self.assertEqual(cache.lookup("pl", [unicodedata.normalize("NFC", "Łódź")]), ["Łódź"])
+
+    def test_least_recently_used_tokens_are_evicted(self):
+        cache = LemmaCache(self.path, max_size=3)
+        for token in ["a", "b", "c"]:
+            cache.put("pl", token, token.upper())
+        cache.lookup("pl", ["a"])
+        cache.put("pl", "d", "D")
+        self.assertIsNone(cache.lookup("pl", ["b"]))
+        self.assertEqual(cache.lookup("pl", ["a", "c", "d"]), ["A", "C", "D"])
+        self.assertEqual(len(cache), 3)
+
+    def test_cache_is_kept_between_runs(self):
+        cache = LemmaCache(self.path, max_size=3)
+        for token in ["a", "b", "c"]:
+            cache.put("pl", token, token.upper())
+        cache.lookup("pl", ["a"])
+        cache.save()
+        other = LemmaCache(self.path, max_size=3)
+        other.put("pl", "d", "D")       # b was used least recently
+        other.save()
+        reloaded = LemmaCache(self.path, max_size=3)
+        self.assertEqual(reloaded.lookup("pl", ["a", "c", "d"]), ["A", "C", "D"])
+        self.assertIsNone(reloaded.lookup("pl", ["b"]))
+
+    def test_saves_from_two_processes_are_merged(self):
+        first, second = LemmaCache(self.path), LemmaCache(self.path)
+        first.put("pl", "kota", "kot")
+        second.put("pl", "psa", "pies")
+        first.save()
+        second.save()
+        self.assertEqual(LemmaCache(self.path).lookup("pl", ["kota", "psa"]), ["kot", "pies"])
+
+    def test_first_lemma_of_token_is_kept(self):
+        first, second = LemmaCache(self.path), LemmaCache(self.path)
+        first.put("pl", "mam", "mieć")
+        first.put("pl", "mam", "mama")
+        self.assertEqual(first.lookup("pl", ["mam"]), ["mieć"])
+        second.put("pl", "mam", "mama")     # another process saw the token in a different context
+        first.save()
+        second.save()
+        self.assertEqual(LemmaCache(self.path).lookup("pl", ["mam"]), ["mieć"])
+
+    def test_split_and_remember(self):
+        cache = LemmaCache(self.path)
+        texts = ["Ala ma kota", "Kot ma Alę"]
+        known, missing = split_cached(texts, cache)
+        self.assertEqual((known, missing), ([], texts))
+        docs = [[("Ala", "Ala"), ("ma", "mieć"), ("kota", "kot")], [("Kot", "kot"), ("ma", "mieć"), ("Alę", "Ala"),
+                                                                    (" ", " "), ("!", "!")]]
+        self.assertEqual(list(remember_lemmas(docs, cache)), [["Ala", "mieć", "kot"], ["kot", "mieć", "Ala", " ", "!"]])
+        known, missing = split_cached(texts + ["Kot  ma Alę!", "Ala ma psa"], cache)
+        self.assertEqual(known, [["Ala", "mieć", "kot"], ["kot", "mieć", "Ala"], ["kot", "mieć", "Ala", "!"]])
+        self.assertEqual(missing, ["Ala ma psa"])
+        self.assertEqual(len(cache), 6)     # whitespace is not cached
+
+    def test_cached_texts_are_split_like_the_model(self):
+        tokenizer = LmCh.language_tokenizer("pl")
+        self.assertIs(LmCh.language_tokenizer("pl"), tokenizer)
+        cache = LemmaCache(self.path)
+        text = "Np. szczepienie anty-covidowe itd."
+        docs = [[(t.text, t.text.lower()) for t in tokenizer(text)]]
+        list(remember_lemmas(docs, cache))
+        known, missing = split_cached([text], cache)
+        self.assertEqual(known, [[lemma for _, lemma in docs[0]]])
+        self.assertEqual(missing, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
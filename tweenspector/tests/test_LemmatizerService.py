@@ -0,0 +1,139 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import json
+import os
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from multiprocessing.connection import Client
+import tweenspector.LemmatizerService as LmSr
+
+test_authkey = b"test klucz"
+
+
+def make_mock_nlp():
+    mock_nlp = MagicMock()
+    mock_nlp.Defaults.stop_words = {"i", "się"}
+    mock_nlp.pipe = MagicMock(side_effect=lambda texts, batch_size: [
+        [SimpleNamespace(text=word, lemma_=word.lower()) for word in text.split()] for text in texts])
+    return mock_nlp
+
+
+class TestLemmatizerService(unittest.TestCase):
+    def setUp(self):
+        LmSr.unavailable_until.clear()
+        patcher = patch("tweenspector.LemmatizerService.spacy")
+        mock_spacy = patcher.start()
+        self.addCleanup(patcher.stop)
+        mock_spacy.load = MagicMock(return_value=make_mock_nlp())
+        self.service = LmSr.LemmatizerService(("127.0.0.1", 0), workers=0,
+                                              authkey=test_authkey).start()     #bez puli - model w tym procesie
+        self.thread = threading.Thread(target=self.service.serve_forever, daemon=True)
+        self.thread.start()
+        self.addCleanup(self.stop_service)
+
+    def stop_service(self):
+        self.service.close()
+        self.thread.join(5)
+        LmSr.service_state.clear()
+
+    def connect(self):
+        return LmSr.connect_lemmatizer_service(self.service.address, test_authkey)
+
+    def test_client_gets_token_lemma_pairs_in_order(self):
+        client = self.connect()
+        try:
+            texts = ["Ala i kot", "Kot się myje", "RT Pies"] * 5
+            lemmas = list(client.lemmatize(texts, batch_size=4))
+            self.assertEqual(lemmas[:3], [[("Ala", "ala"), ("i", "i"), ("kot", "kot")],
+                                          [("Kot", "kot"), ("się", "się"), ("myje", "myje")],
+                                          [("RT", "rt"), ("Pies", "pies")]])
+            self.assertEqual(len(lemmas), 15)
+            self.assertEqual(client.stopwords(), {"i", "się", "RT"})
+        finally:
+            client.close()
+
+    def test_clients_share_one_model(self):
+        clients = [self.connect() for _ in range(3)]
+        results = [None] * 3
+
+        def run(i):
+            results[i] = list(clients[i].lemmatize(["Ala ma kota {n}".format(n=n) for n in range(50)], 8))
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for client in clients:
+            client.close()
+        self.assertTrue(all(len(result) == 50 for result in results))
+        LmSr.spacy.load.assert_called_once()
+
+    def test_errors_are_sent_to_client(self):
+        client = self.connect()
+        try:
+            with self.assertRaises(RuntimeError):
+                client.request("unknown")
+            self.assertEqual(client.request("ping"), LmSr.lemmatizer_model)
+        finally:
+            client.close()
+
+    def test_connect_returns_none_without_service(self):
+        address = self.service.address
+        self.stop_service()
+        self.assertIsNone(LmSr.connect_lemmatizer_service(address, test_authkey))
+        self.assertIn(address, LmSr.unavailable_until)
+        self.assertIsNone(LmSr.connect_lemmatizer_service(None))
+
+    def test_start_fails_when_model_cannot_be_loaded(self):
+        self.stop_service()
+        LmSr.spacy.load = MagicMock(side_effect=OSError("E050"))
+        with self.assertRaises(RuntimeError):
+            LmSr.LemmatizerService(("127.0.0.1", 0), workers=0, authkey=test_authkey).start()
+
+    @patch("tweenspector.LemmatizerService.print")
+    def test_wrong_authkey_is_rejected(self, mock_print):
+        self.assertIsNone(LmSr.connect_lemmatizer_service(self.service.address, b"inny klucz"))
+        client = self.connect()     #serwis działa dalej po odrzuceniu klienta
+        self.assertEqual(client.request("ping"), LmSr.lemmatizer_model)
+        client.close()
+
+    def test_requests_are_json_not_pickle(self):
+        with Client(self.service.address, authkey=test_authkey) as connection:
+            connection.send(("ping",))      #pickle nie jest rozpakowywany
+            status, message = json.loads(connection.recv_bytes())
+            self.assertEqual(status, "error")
+            connection.send_bytes(json.dumps(["lemmatize", [1, 2]]).encode("utf-8"))
+            self.assertEqual(json.loads(connection.recv_bytes())[0], "error")
+            connection.send_bytes(json.dumps(["ping"]).encode("utf-8"))
+            self.assertEqual(json.loads(connection.recv_bytes()), ["ok", LmSr.lemmatizer_model])
+
+    @unittest.skipUnless(os.name == "posix", "prawa dostępu do pliku tylko w systemach POSIX")
+    def test_service_key_is_random_and_private(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "keys", "lemmatizer_service.key")
+            self.assertIsNone(LmSr.read_service_key(path))
+            key = LmSr.create_service_key(path)
+            self.assertGreaterEqual(len(key), 32)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            self.assertEqual(LmSr.create_service_key(path), key)
+            self.assertNotEqual(LmSr.create_service_key(os.path.join(temp_dir, "other.key")), key)
+            os.chmod(path, 0o644)
+            with patch("tweenspector.LemmatizerService.print"):
+                self.assertIsNone(LmSr.read_service_key(path))
+
+    def test_client_without_key_does_not_connect(self):
+        with patch("tweenspector.LemmatizerService.read_service_key", return_value=None):
+            self.assertIsNone(LmSr.connect_lemmatizer_service(self.service.address))
+        with patch("tweenspector.LemmatizerService.read_service_key", return_value=test_authkey):
+            client = LmSr.connect_lemmatizer_service(self.service.address)
+        self.assertEqual(client.request("ping"), LmSr.lemmatizer_model)
+        client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test dire
 
 import unittest
 from unittest.mock import MagicMock, patch
+import threading
+import time
 import tweenspector.MainApplication as MApp
 from tweenspector.MainApplication import MainApplication
 
@@ -152,10 +154,7 @@ class TestMainApplication(unittest.TestCase):
 
     @patch("tweenspector.MainApplication.print")
     @patch("tweenspector.MainApplication.tk")
-    @patch("tweenspector.MainApplication.plt")
-    @patch("tweenspector.MainApplication.matplotlib")
-    @patch("tweenspector.MainApplication.img")
-    def test_can_search_result(self, mock_img, mock_matplotlib, mock_plt, mock_tk, mock_print):
+    def test_can_search_result(self, mock_tk, mock_print):
         test_data = {"Najczęstsze słowa", "Powiązane konta", "Statystyki użytkownika"}
 
         for feature in test_data:
@@ -167,18 +166,18 @@ class TestMainApplication(unittest.TestCase):
                 app.feature_strategy.generate_image = MagicMock(return_value=True)
 
                 MainApplication.search_result(app, feature)
+                app.feature_worker.join()
 
                 app.propagate_params.assert_called_once_with()
                 app.configure_feature_strategy.assert_called_once()
+                app.show_progress.assert_called_once_with()
                 app.feature_strategy.generate_image.assert_called_once_with()
+                app.parent.after.assert_called_once_with(MApp.progress_poll_interval, app.poll_feature)
+                self.assertTrue(app.feature_worker.result)
 
     @patch("tweenspector.MainApplication.print")
     @patch("tweenspector.MainApplication.tk")
-    @patch("tweenspector.MainApplication.plt")
-    @patch("tweenspector.MainApplication.matplotlib")
-    @patch("tweenspector.MainApplication.img")
-    def test_search_result_returns_if_cannot_propagate_params(self, mock_img, mock_matplotlib,
-                                                              mock_plt, mock_tk, mock_print):
+    def test_search_result_returns_if_cannot_propagate_params(self, mock_tk, mock_print):
         test_data = {"Najczęstsze słowa", "Powiązane konta", "Statystyki użytkownika"}
 
         for feature in test_data:
@@ -197,11 +196,7 @@ class TestMainApplication(unittest.TestCase):
 
     @patch("tweenspector.MainApplication.print")
     @patch("tweenspector.MainApplication.tk")
-    @patch("tweenspector.MainApplication.plt")
-    @patch("tweenspector.MainApplication.matplotlib")
-    @patch("tweenspector.MainApplication.img")
-    def test_search_result_shows_error_if_no_feature_selected(self, mock_img, mock_matplotlib,
-                                                              mock_plt, mock_tk, mock_print):
+    def test_search_result_shows_error_if_no_feature_selected(self, mock_tk, mock_print):
         feature = "Nie wybrano"
 
         app = MagicMock()
@@ -219,11 +214,7 @@ class TestMainApplication(unittest.TestCase):
 
     @patch("tweenspector.MainApplication.print")
     @patch("tweenspector.MainApplication.tk")
-    @patch("tweenspector.MainApplication.plt")
-    @patch("tweenspector.MainApplication.matplotlib")
-    @patch("tweenspector.MainApplication.img")
-    def test_search_result_shows_error_if_cannot_generate_image(self, mock_img, mock_matplotlib,
-                                                                mock_plt, mock_tk, mock_print):
+    def test_search_result_shows_error_if_cannot_generate_image(self, mock_tk, mock_print):
         test_data = {"Najczęstsze słowa", "Powiązane konta", "Statystyki użytkownika"}
 
         for feature in test_data:
@@ -235,6 +226,8 @@ class TestMainApplication(unittest.TestCase):
                 app.feature_strategy.generate_image = MagicMock(return_value=False)
 
                 MainApplication.search_result(app, feature)
+                app.feature_worker.join()
+                MainApplication.finish_feature(app, app.feature_worker)
 
                 app.propagate_params.assert_called_once_with()
                 app.configure_feature_strategy.assert_called_once()
@@ -242,6 +235,91 @@ class TestMainApplication(unittest.TestCase):
                 mock_tk.messagebox.showerror.assert_called_once()
                 mock_tk.messagebox.showerror.reset_mock()
 
+    @patch("tweenspector.MainApplication.print")
+    @patch("tweenspector.MainApplication.tk")
+    def test_finish_feature(self, mock_tk, mock_print):
+        test_data = [(True, None, False, True),
+                     (False, None, True, False),
+                     (None, ValueError("error"), True, False),
+                     (None, MApp.FeatureCancelled(), False, False)]
+
+        for result, error, shows_error, shows_image in test_data:
+            with self.subTest(result=result, error=error):
+                app = MagicMock()
+                worker = MagicMock()
+                worker.result, worker.error = result, error
+
+                MainApplication.finish_feature(app, worker)
+
+                self.assertEqual(mock_tk.messagebox.showerror.called, shows_error)
+                self.assertEqual(app.show_image.called, shows_image)
+                mock_tk.messagebox.showerror.reset_mock()
+
+    @patch("tweenspector.MainApplication.print")
+    @patch("tweenspector.MainApplication.asksaveasfile")
+    def test_save_image_writes_png_only_when_file_chosen(self, mock_asksaveasfile, mock_print):
+        image = MagicMock()
+        mock_asksaveasfile.return_value = None
+        MainApplication.save_image(MagicMock(), image)
+        image.save.assert_not_called()
+
+        mock_file = MagicMock()
+        mock_asksaveasfile.return_value = mock_file
+        MainApplication.save_image(MagicMock(), image)
+        image.save.assert_called_once_with(mock_file, format="PNG")
+
+    @patch("tweenspector.MainApplication.print")
+    def test_poll_feature_updates_progress_until_worker_finishes(self, mock_print):
+        app = MagicMock()
+        app.progress = MApp.FeatureProgress(MApp.queue.Queue())
+        release = threading.Event()
+
+        def task():
+            app.progress.stage("Pobieranie tweetów")
+            app.progress.update(3, 10)
+            release.wait()
+            return True
+        app.feature_worker = MApp.FeatureWorker(task, app.progress)
+        app.feature_worker.start()
+        while app.progress.events.qsize() < 2:
+            time.sleep(0.01)
+
+        MainApplication.poll_feature(app)
+        app.progress_l.config.assert_called_with(text="Pobieranie tweetów: 3/10")
+        app.progress_pb.config.assert_called_with(mode="determinate", maximum=10, value=3)
+        app.parent.after.assert_called_once_with(MApp.progress_poll_interval, app.poll_feature)
+        app.finish_feature.assert_not_called()
+
+        release.set()
+        app.feature_worker.join()
+        MainApplication.poll_feature(app)
+        app.hide_progress.assert_called_once_with()
+        app.finish_feature.assert_called_once_with(app.feature_worker)
+
+    @patch("tweenspector.MainApplication.print")
+    def test_cancel_feature_stops_worker_at_next_stage(self, mock_print):
+        app = MagicMock()
+        app.progress = MApp.FeatureProgress(MApp.queue.Queue())
+        started = threading.Event()
+        release = threading.Event()
+
+        def task():
+            app.progress.stage("Pobieranie tweetów")
+            started.set()
+            release.wait()
+            app.progress.stage("Lematyzacja")
+            return True
+        worker = MApp.FeatureWorker(task, app.progress)
+        worker.start()
+        started.wait()
+
+        MainApplication.cancel_feature(app)
+        release.set()
+        worker.join()
+
+        self.assertIsInstance(worker.error, MApp.FeatureCancelled)
+        self.assertIsNone(worker.result)
+
     @patch("tweenspector.MainApplication.print")
     @patch("tweenspector.MainApplication.tk")
     @patch("tweenspector.MainApplication.AccountsInfo")
@@ -0,0 +1,65 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+import tweenspector.RateLimiter as RtLm
+from tweenspector.RateLimiter import RateLimiter, SharedRateLimiter
+
+
+def acquire_many(limiter, count):
+    for _ in range(count):
+        limiter.acquire()
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_burst_is_not_delayed(self):
+        limiter = RateLimiter(1.0, burst=3)
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.acquire()
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_requests_over_burst_are_delayed(self):
+        limiter = RateLimiter(10.0, burst=1)
+        start = time.monotonic()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for _ in range(6):
+                executor.submit(limiter.acquire)
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+
+    def test_no_rate_means_no_limit(self):
+        for rate in [None, 0]:
+            with self.subTest(rate=rate):
+                limiter = RateLimiter(rate)
+                start = time.monotonic()
+                for _ in range(100):
+                    limiter.acquire()
+                self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_host_rate_limiter_is_shared(self):
+        self.assertIs(RtLm.host_rate_limiter("example.com"), RtLm.host_rate_limiter("example.com"))
+        self.assertIsNot(RtLm.host_rate_limiter("example.com"), RtLm.host_rate_limiter("example.org"))
+
+    def test_shared_limiter_limits_all_processes_together(self):
+        limiter = SharedRateLimiter(10.0, burst=1)
+        processes = [multiprocessing.Process(target=acquire_many, args=(limiter, 3)) for _ in range(3)]
+        start = time.monotonic()
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(10)
+        self.assertTrue(all(process.exitcode == 0 for process in processes))
+        self.assertGreaterEqual(time.monotonic() - start, 0.75)     #9 zapytań, osobne limity dałyby ok. 0.2 s
+
+    def test_installed_limiters_replace_process_limiters(self):
+        limiters = RtLm.shared_rate_limiters()
+        self.assertEqual(set(limiters), set(RtLm.host_requests_per_second))
+        with patch.dict(RtLm.rate_limiters, clear=True):
+            RtLm.install_rate_limiters(limiters)
+            for host, limiter in limiters.items():
+                self.assertIs(RtLm.host_rate_limiter(host), limiter)
@@ -0,0 +1,76 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import pickle
+import numpy as np
+from tweenspector.StatsAccumulator import StatsAccumulator, QuantileSketch
+
+
+def lower_quantile(values, q):
+    return float(np.sort(values)[int(np.floor(q * (len(values) - 1)))])
+
+
+class TestStatsAccumulator(unittest.TestCase):
+    def generate_values(self, count, seed=0):
+        rng = np.random.default_rng(seed)
+        return np.concatenate([np.zeros(count // 10, dtype=np.int64),
+                               rng.lognormal(5, 2, count).astype(np.int64)])
+
+    def test_moments_are_exact(self):
+        values = self.generate_values(10000)
+        stats = StatsAccumulator()
+        stats.update(values)
+        self.assertEqual(stats.count, len(values))
+        self.assertEqual(stats.sum, int(values.sum()))
+        self.assertEqual(stats.min, int(values.min()))
+        self.assertEqual(stats.max, int(values.max()))
+        self.assertEqual(stats.mean, values.sum() / len(values))
+
+    def test_quantiles_are_within_relative_accuracy(self):
+        values = self.generate_values(10000)
+        stats = StatsAccumulator(relative_accuracy=0.01)
+        stats.update(values)
+        for q in [0, 0.1, 0.25, 0.5, 0.9, 0.99, 1]:
+            with self.subTest(q=q):
+                expected = lower_quantile(values, q)
+                self.assertLessEqual(abs(stats.quantile(q) - expected), 0.01 * expected)
+
+    def test_merged_shards_match_single_pass(self):
+        values = self.generate_values(10000)
+        single = StatsAccumulator()
+        single.update(values)
+        merged = StatsAccumulator()
+        for shard in np.array_split(values, 7):
+            part = pickle.loads(pickle.dumps(StatsAccumulator()))  # shards may come from worker processes
+            part.update(shard)
+            merged.merge(part)
+        self.assertEqual((merged.count, merged.sum, merged.min, merged.max),
+                         (single.count, single.sum, single.min, single.max))
+        for q in [0.1, 0.5, 0.9]:
+            self.assertEqual(merged.quantile(q), single.quantile(q))
+
+    def test_empty_accumulator(self):
+        stats = StatsAccumulator()
+        stats.update([])
+        stats.merge(StatsAccumulator())
+        self.assertEqual(stats.count, 0)
+        self.assertIsNone(stats.mean)
+        self.assertIsNone(stats.median)
+
+    def test_sketch_rejects_negative_values_and_other_accuracy(self):
+        sketch = QuantileSketch(0.01)
+        with self.assertRaises(ValueError):
+            sketch.update([1, -1])
+        with self.assertRaises(ValueError):
+            sketch.merge(QuantileSketch(0.02))
+
+    def test_sketch_size_does_not_grow_with_count(self):
+        sketch = QuantileSketch(0.01)
+        sketch.update(np.arange(1, 1000001))
+        self.assertLess(len(sketch.buckets), 800)
+
+
+if __name__ == '__main__':
+    unittest.main()
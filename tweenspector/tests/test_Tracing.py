@@ -0,0 +1,117 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import MagicMock, patch
+import tweenspector.Tracing as Trcn
+from tweenspector.FeatureStrategy import FeatureStrategy
+from tweenspector.FeatureProgress import FeatureProgress
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "trace.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_trace(self):
+        with open(self.path, encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_disabled_tracer_does_nothing(self):
+        tracer = Trcn.Tracer()
+        self.assertIs(tracer.feature("words"), Trcn.no_trace)
+        with tracer.feature("words"):
+            tracer.stage("Lematyzacja")
+            tracer.rows(10)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_stages_are_written_as_json_lines(self):
+        tracer = Trcn.Tracer(self.path)
+        try:
+            with tracer.feature("AccountsInfo", user="ala"):
+                tracer.stage("Pobieranie tweetów")
+                tracer.rows(500)
+                tracer.stage("Liczenie statystyk")
+                data = [bytearray(1000) for _ in range(100)]
+                del data
+        finally:
+            tracer.disable()
+        stages, feature = self.read_trace()[:2], self.read_trace()[2]
+        self.assertEqual([(s["type"], s["stage"], s["rows"]) for s in stages],
+                         [("stage", "Pobieranie tweetów", 500), ("stage", "Liczenie statystyk", None)])
+        self.assertEqual((feature["type"], feature["feature"], feature["user"]), ("feature", "AccountsInfo", "ala"))
+        self.assertGreaterEqual(feature["wall"], sum(stage["wall"] for stage in stages))
+        self.assertGreaterEqual(stages[1]["peak_memory"], 100000)
+        self.assertEqual(feature["peak_memory"], max(stage["peak_memory"] for stage in stages))
+        self.assertNotIn("error", feature)
+
+    def test_error_and_stages_outside_feature(self):
+        tracer = Trcn.Tracer(self.path, memory=False)
+        try:
+            tracer.stage("Lematyzacja")     #bez funkcjonalności nie ma gdzie zapisać etapu
+            with self.assertRaises(KeyError):
+                with tracer.feature("words"):
+                    tracer.stage("Lematyzacja")
+                    raise KeyError("tweet")
+        finally:
+            tracer.disable()
+        stage, feature = self.read_trace()
+        self.assertIsNone(stage["peak_memory"])
+        self.assertEqual(feature["error"], "KeyError")
+
+    def test_threads_trace_their_own_features(self):
+        tracer = Trcn.Tracer(self.path, memory=False)
+
+        def run(name):
+            with tracer.feature(name):
+                for stage in range(20):
+                    tracer.stage("{name}{stage}".format(name=name, stage=stage))
+        try:
+            threads = [threading.Thread(target=run, args=(name,)) for name in ["a", "b", "c"]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            tracer.disable()
+        for record in self.read_trace():
+            if record["type"] == "stage":
+                self.assertTrue(record["stage"].startswith(record["feature"]))
+
+    def test_feature_progress_marks_stages_and_rows(self):
+        tracer = Trcn.Tracer(self.path, memory=False)
+        progress = FeatureProgress()
+        try:
+            with patch("tweenspector.FeatureProgress.tracer", tracer), tracer.feature("words"):
+                progress.stage("Pobieranie tweetów")
+                progress.update(300)
+                progress.stage("Lematyzacja")
+                progress.update(256, 300)
+                progress.update(300, 300)
+        finally:
+            tracer.disable()
+        self.assertEqual([(record["stage"], record["rows"]) for record in self.read_trace()[:2]],
+                         [("Pobieranie tweetów", 300), ("Lematyzacja", 300)])
+
+    def test_feature_strategy_trace_names_feature(self):
+        mock_fs = MagicMock()
+        mock_fs.user_name, mock_fs.tweets_count, mock_fs.option = "ala", 100, 2
+        tracer = Trcn.Tracer(self.path, memory=False)
+        try:
+            with patch("tweenspector.FeatureStrategy.tracer", tracer):
+                trace = FeatureStrategy.trace(mock_fs)
+        finally:
+            tracer.disable()
+        self.assertEqual(trace.fields, {"user": "ala", "tweets": 100, "option": 2})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import datetime
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import pandas as pd
+import tweenspector.TweetCache as TwCh
+from tweenspector.TweetCache import TweetCache, SessionCache
+from tweenspector.TweetSource import TwintSource, HttpSource, ArchiveSource
+
+
+def make_tweets(user_name, days):
+    return pd.DataFrame({
+        "id": ["{u}-{d}".format(u=user_name, d=day) for day in days],
+        "date": ["{d} 12:00:00".format(d=day) for day in days],
+        "username": [user_name] * len(days),
+        "tweet": ["Tweet {d}".format(d=day) for day in days]
+    }).iloc[::-1].reset_index(drop=True)
+
+
+def fake_fetch(all_days):
+    def fetch(user_name, search_words, date_from, date_to, num_of_tweets):
+        days = [d for d in all_days if date_from <= d < date_to]
+        return make_tweets(user_name, days).head(num_of_tweets)
+    return MagicMock(side_effect=fetch)
+
+
+class TestTweetCache(unittest.TestCase):
+    days = ["2022-01-0{d}".format(d=d) for d in range(1, 10)]
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_missing_ranges(self):
+        d = datetime.date
+        covered = [(d(2022, 1, 3), d(2022, 1, 5)), (d(2022, 1, 7), d(2022, 1, 8))]
+        self.assertEqual(TwCh.missing_ranges(covered, d(2022, 1, 1), d(2022, 1, 10)),
+                         [(d(2022, 1, 1), d(2022, 1, 3)), (d(2022, 1, 5), d(2022, 1, 7)),
+                          (d(2022, 1, 8), d(2022, 1, 10))])
+        self.assertEqual(TwCh.missing_ranges(covered, d(2022, 1, 3), d(2022, 1, 5)), [])
+
+    def test_second_call_is_served_from_cache(self):
+        cache = TweetCache(self.temp_dir.name)
+        fetch = fake_fetch(self.days)
+        first = cache.get_tweets("TestUser", None, "2022-01-02", "2022-01-05", 100, fetch)
+        second = cache.get_tweets("testuser", None, "2022-01-02", "2022-01-05", 100, fetch)
+        fetch.assert_called_once()
+        self.assertEqual(list(first.id), ["TestUser-2022-01-04", "TestUser-2022-01-03", "TestUser-2022-01-02"])
+        self.assertTrue(first.equals(second))
+
+    def test_widening_range_fetches_only_missing_days(self):
+        cache = TweetCache(self.temp_dir.name)
+        fetch = fake_fetch(self.days)
+        cache.get_tweets("TestUser", None, "2022-01-03", "2022-01-05", 100, fetch)
+        fetch.reset_mock()
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-07", 100, fetch)
+        requested = sorted((c.args[2], c.args[3]) for c in fetch.call_args_list)
+        self.assertEqual(requested, [("2022-01-01", "2022-01-03"), ("2022-01-05", "2022-01-07")])
+        self.assertEqual(len(tweets), 6)
+        self.assertEqual(tweets.id.nunique(), 6)
+
+    def test_older_days_not_fetched_when_limit_reached(self):
+        cache = TweetCache(self.temp_dir.name)
+        fetch = fake_fetch(self.days)
+        cache.get_tweets("TestUser", None, "2022-01-05", "2022-01-09", 3, fetch)
+        fetch.reset_mock()
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-09", 2, fetch)
+        fetch.assert_not_called()
+        self.assertEqual(list(tweets.id), ["TestUser-2022-01-08", "TestUser-2022-01-07"])
+
+    def test_search_words_are_part_of_key(self):
+        cache = TweetCache(self.temp_dir.name)
+        fetch = fake_fetch(self.days)
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch)
+        cache.get_tweets("TestUser", "kot", "2022-01-01", "2022-01-03", 100, fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_failed_fetch_is_not_cached(self):
+        cache = TweetCache(self.temp_dir.name)
+        failing_fetch = MagicMock(side_effect=ValueError)
+        with self.assertRaises(ValueError):
+            cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, failing_fetch)
+        fetch = fake_fetch(self.days)
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch)
+        fetch.assert_called_once()
+        self.assertEqual(len(tweets), 2)
+
+    def test_empty_fetch_is_retried_after_short_time(self):
+        cache = TweetCache(self.temp_dir.name, ttl=1000, empty_ttl=10)
+        empty_fetch = fake_fetch([])        # twint returns no tweets also when scraping fails
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, empty_fetch, now=0)
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, empty_fetch, now=5)
+        empty_fetch.assert_called_once()
+        fetch = fake_fetch(self.days)
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch, now=11)
+        fetch.assert_called_once()
+        self.assertEqual(len(tweets), 2)
+
+    def test_covered_days_expire(self):
+        cache = TweetCache(self.temp_dir.name, ttl=100)
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days), now=0)
+        fetch = MagicMock(side_effect=lambda *args: fake_fetch(self.days)(*args).assign(nlikes=7))
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch, now=50)
+        fetch.assert_not_called()
+        self.assertNotIn("nlikes", tweets.columns)
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch, now=101)
+        fetch.assert_called_once()
+        self.assertEqual(list(tweets.nlikes), [7, 7])      # refreshed counts replace the cached tweets
+        self.assertEqual(tweets.id.nunique(), 2)
+
+    def test_entries_are_compressed(self):
+        cache = TweetCache(self.temp_dir.name)
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days))
+        files = os.listdir(self.temp_dir.name)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.temp_dir.name, files[0]), "rb") as f:
+            self.assertEqual(f.read(2), b"\x1f\x8b")
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = TweetCache(self.temp_dir.name, max_size=0)
+        cache.get_tweets("FirstUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days))
+        cache.get_tweets("SecondUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days))
+        self.assertLessEqual(len(os.listdir(self.temp_dir.name)), 1)
+
+    def test_temp_file_is_unique_per_process(self):
+        cache = TweetCache(self.temp_dir.name)
+        path = cache.entry_path("TestUser", None)
+        with patch("tweenspector.TweetCache.os.getpid", return_value=1234), \
+                patch("tweenspector.TweetCache.pd.to_pickle", wraps=pd.to_pickle) as mock_to_pickle:
+            cache.save_entry(path, make_tweets("TestUser", self.days), [])
+        temp_path = mock_to_pickle.call_args.args[1]
+        self.assertTrue(temp_path.startswith(path + ".1234."))
+        self.assertEqual(os.listdir(self.temp_dir.name), [os.path.basename(path)])
+
+    def test_evict_skips_entries_removed_by_other_process(self):
+        cache = TweetCache(self.temp_dir.name, max_size=0)
+        cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days))
+        names = os.listdir(self.temp_dir.name) + ["removed.pkl.gz"]
+        with patch("tweenspector.TweetCache.os.listdir", return_value=names):
+            cache.evict()
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    def test_each_tweet_source_has_own_cache(self):
+        twint_cache = TwCh.tweet_cache_for(TwintSource(), self.temp_dir.name)
+        http_cache = TwCh.tweet_cache_for(HttpSource("http://127.0.0.1:1"), self.temp_dir.name)
+        self.assertEqual(twint_cache.cache_dir, self.temp_dir.name)
+        self.assertNotEqual(http_cache.cache_dir, twint_cache.cache_dir)
+        self.assertIsNone(TwCh.tweet_cache_for(ArchiveSource("tweets.csv"), self.temp_dir.name))
+        http_cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fake_fetch(self.days))
+        fetch = fake_fetch(self.days)
+        twint_cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch)
+        fetch.assert_called_once()
+
+    @patch("tweenspector.TweetCache.print")
+    def test_corrupted_entry_is_fetched_again(self, mock_print):
+        cache = TweetCache(self.temp_dir.name)
+        with open(cache.entry_path("TestUser", None), "wb") as f:
+            f.write(b"not a cache entry")
+        fetch = fake_fetch(self.days)
+        tweets = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-03", 100, fetch)
+        fetch.assert_called_once()
+        self.assertEqual(len(tweets), 2)
+
+
+class TestSessionCache(unittest.TestCase):
+    def test_second_call_is_served_from_memory(self):
+        cache = SessionCache()
+        fetch = MagicMock(side_effect=lambda user_name, *_: make_tweets(user_name, ["2022-01-01"]))
+        first = cache.get_tweets("TestUser", None, "2022-01-01", "2022-01-02", "100", fetch)
+        second = cache.get_tweets("testuser", None, "2022-01-01", "2022-01-02", 100, fetch)
+        fetch.assert_called_once()
+        self.assertIs(first, second)
+
+    def test_least_recently_used_frames_are_evicted(self):
+        tweets = make_tweets("TestUser", ["2022-01-01"])
+        size = int(tweets.memory_usage(deep=True).sum())
+        cache = SessionCache(max_size=2 * size)
+        fetch = MagicMock(side_effect=lambda *_: make_tweets("TestUser", ["2022-01-01"]))
+        for user_name in ["first", "second", "first", "third"]:
+            cache.get_tweets(user_name, None, "2022-01-01", "2022-01-02", 100, fetch)
+        self.assertEqual(fetch.call_count, 3)
+        self.assertEqual([key[0] for key in cache.entries], ["first", "third"])
+        self.assertLessEqual(cache.size, cache.max_size)
+
+    def test_concurrent_requests_share_one_fetch(self):
+        cache = SessionCache()
+        started = threading.Event()
+
+        def slow_fetch(user_name, *_):
+            started.set()
+            time.sleep(0.2)
+            return make_tweets(user_name, ["2022-01-01"])
+
+        fetch = MagicMock(side_effect=slow_fetch)
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(cache.get_tweets, "TestUser", None, "2022-01-01", "2022-01-02", 100, fetch)
+                       for _ in range(5)]
+            results = [f.result() for f in futures]
+        fetch.assert_called_once()
+        for result in results:
+            self.assertIs(result, results[0])
+
+    def test_exception_is_passed_to_waiting_requests_and_not_cached(self):
+        cache = SessionCache()
+
+        def failing_fetch(*_):
+            time.sleep(0.2)
+            raise ValueError
+
+        fetch = MagicMock(side_effect=failing_fetch)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(cache.get_tweets, "TestUser", None, "2022-01-01", "2022-01-02", 100, fetch)
+                       for _ in range(3)]
+            for f in futures:
+                with self.assertRaises(ValueError):
+                    f.result()
+        self.assertEqual(len(cache.entries), 0)
+        self.assertEqual(len(cache.in_flight), 0)
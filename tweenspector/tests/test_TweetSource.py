@@ -0,0 +1,161 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pandas as pd
+import tweenspector.TweetSource as TwSr
+from tweenspector.TweetSource import TwintSource, ArchiveSource, FakeTweetServer, HttpSource
+from tweenspector.TweetsData import save_tweets_df_to_csv, save_tweets_df_to_snapshot
+from tweenspector.AccountStats import compute_account_stats
+
+
+def make_twint_tweet(user_name, number):
+    return SimpleNamespace(
+        id=number, conversation_id=str(number), datestamp="2022-01-03", timestamp="14:29:{s:02d}".format(s=number % 60),
+        timezone="+0100", place="", tweet="Tweet {n} @someone".format(n=number), lang="pl", mentions=[],
+        hashtags=["tag"], cashtags=[], user_id=1, user_id_str="1", username=user_name, name=user_name, link="",
+        urls=[], photos=[], video=0, thumbnail="", retweet=False, likes_count="3", replies_count="1",
+        retweets_count="2", quote_url="", near="", geo="", source="", user_rt_id="", user_rt="", retweet_id="",
+        reply_to=[], retweet_date="", translate="", trans_src="", trans_dest="")
+
+
+def fake_profile(config):
+    # simulate scraping: tweets arrive in several pages with pauses between them
+    for number in range(int(config.Limit)):
+        time.sleep(random.uniform(0, 0.005))
+        config.Store_object_tweets_list.append(make_twint_tweet(config.Username, number))
+
+
+def make_archive():
+    rows = []
+    for number in range(30):
+        user_name = "Ala" if number % 3 else "kot"
+        rows.append(TwSr.tweet_to_row(make_twint_tweet(user_name, number), None))
+        rows[-1]["date"] = "2022-01-{d:02d} 12:00:{s:02d}".format(d=1 + number % 10, s=number)
+        rows[-1]["tweet"] = "Szczepienie {n}".format(n=number) if number % 2 else "Tweet {n}".format(n=number)
+    return pd.DataFrame(rows)
+
+
+class TestTweetSource(unittest.TestCase):
+    def test_tweet_to_row_has_twint_pandas_columns(self):
+        row = TwSr.tweet_to_row(make_twint_tweet("TestUser", 7), "kot")
+        for column in ["id", "date", "tweet", "hour", "nlikes", "nretweets", "retweet", "hashtags", "place",
+                       "username", "search"]:
+            self.assertIn(column, row)
+        self.assertEqual(row["id"], "7")
+        self.assertEqual(row["date"], "2022-01-03 14:29:07")
+        self.assertEqual(row["nlikes"], 3)
+        self.assertEqual(row["day"], 1)
+        self.assertEqual(row["search"], "kot")
+
+    @patch("tweenspector.TweetSource.host_rate_limiter")
+    @patch("tweenspector.TweetSource.twint")
+    def test_fetch_collects_tweets_into_own_buffer(self, mock_twint, mock_host_rate_limiter):
+        mock_twint.run.Profile = MagicMock(side_effect=fake_profile)
+        tweets = TwintSource().fetch("TestUser", None, "2022-01-01", "2022-01-05", 5)
+        self.assertEqual(len(tweets), 5)
+        self.assertEqual(set(tweets.username), {"TestUser"})
+        config = mock_twint.Config.return_value
+        self.assertTrue(config.Store_object)
+        mock_host_rate_limiter.return_value.acquire.assert_called_once_with()
+
+    @patch("tweenspector.TweetSource.host_rate_limiter")
+    @patch("tweenspector.TweetSource.twint")
+    def test_fetch_returns_empty_dataframe_when_no_tweets(self, mock_twint, mock_host_rate_limiter):
+        tweets = TwintSource().fetch("TestUser", None, "2022-01-01", "2022-01-05", 5)
+        self.assertTrue(tweets.empty)
+
+    @patch("tweenspector.TweetSource.host_rate_limiter")
+    @patch("tweenspector.TweetSource.twint")
+    def test_concurrent_fetches_never_mix_rows(self, mock_twint, mock_host_rate_limiter):
+        mock_twint.Config = MagicMock(side_effect=lambda: SimpleNamespace())
+        mock_twint.run.Profile = MagicMock(side_effect=fake_profile)
+        users = ["user{n}".format(n=n) for n in range(16)]
+        source = TwintSource()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda u: source.fetch(u, None, "2022-01-01", "2022-01-05", 30), users))
+        for user_name, tweets in zip(users, results):
+            self.assertEqual(len(tweets), 30)
+            self.assertEqual(set(tweets.username), {user_name})
+            self.assertEqual(tweets.id.nunique(), 30)
+
+    def test_filter_tweets_matches_user_words_dates_and_limit(self):
+        archive = make_archive()
+        tweets = TwSr.filter_tweets(archive, "ala", "szczepienie", "2022-01-02", "2022-01-08", 100)
+        self.assertGreater(len(tweets), 0)
+        self.assertEqual(set(tweets.username), {"Ala"})
+        self.assertTrue(tweets.tweet.str.startswith("Szczepienie").all())
+        self.assertTrue(((tweets.date >= "2022-01-02") & (tweets.date < "2022-01-08")).all())
+        self.assertEqual(list(tweets.date), sorted(tweets.date, reverse=True))
+        self.assertEqual(len(TwSr.filter_tweets(archive, "Ala", None, None, None, 5)), 5)
+        self.assertTrue(TwSr.filter_tweets(archive, "nikt", None, None, None, 5).empty)
+
+    def test_archive_source_reads_csv_jsonl_and_snapshot(self):
+        archive = make_archive()
+        expected = TwSr.filter_tweets(archive, "Ala", None, "2022-01-01", "2022-01-06", 10)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [os.path.join(temp_dir, "tweets" + ext) for ext in [".csv", ".jsonl", ".feather"]]
+            save_tweets_df_to_csv(paths[0], archive)
+            archive.to_json(paths[1], orient="records", lines=True)
+            save_tweets_df_to_snapshot(paths[2], archive)
+            for path in paths:
+                with self.subTest(path=path):
+                    source = ArchiveSource(path)
+                    tweets = source.fetch("Ala", None, "2022-01-01", "2022-01-06", 10)
+                    self.assertEqual(list(tweets.id), list(expected.id))
+                    self.assertEqual(list(tweets.nlikes), list(expected.nlikes))
+                    for column in ["hashtags", "mentions"]:     #listy, a nie ich zapis tekstowy z CSV
+                        self.assertEqual([list(v) for v in tweets[column]], list(expected[column]))
+                    self.assertIs(source.load(), source.load())     #plik wczytany tylko raz
+                    del source, tweets
+
+    def test_csv_archive_restores_list_columns(self):
+        archive = make_archive()
+        archive["hashtags"] = [["kot", "pies"] if number % 2 else [] for number in range(len(archive))]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "tweets.csv")
+            save_tweets_df_to_csv(path, archive)
+            tweets = TwSr.read_tweets_archive(path)
+        self.assertEqual(list(tweets.hashtags), list(archive.hashtags))
+        self.assertEqual(compute_account_stats(tweets)["hashtagdict"], {"kot": 15, "pies": 15})
+
+    def test_archive_source_reads_twint_json_output(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "tweets.json")
+            pd.DataFrame([{"id": 1, "date": "2022-01-03", "time": "10:00:00", "username": "ala", "tweet": "Kot",
+                           "likes_count": 4, "retweets_count": 1}]).to_json(path, orient="records", lines=True)
+            tweets = ArchiveSource(path).fetch("Ala", None, "2022-01-01", "2022-01-05", 10)
+        self.assertEqual(list(tweets.date), ["2022-01-03 10:00:00"])
+        self.assertEqual(list(tweets.id), ["1"])
+        self.assertEqual(list(tweets.nlikes), [4])
+
+    def test_http_source_reads_all_pages_from_fake_server(self):
+        archive = make_archive()
+        expected = TwSr.filter_tweets(archive, "Ala", None, "2022-01-01", "2022-01-11", 15)
+        with FakeTweetServer(archive, latency=0.01, page_size=4) as server:
+            start = time.perf_counter()
+            tweets = HttpSource(server.url).fetch("Ala", None, "2022-01-01", "2022-01-11", 15)
+            elapsed = time.perf_counter() - start
+        self.assertEqual(server.requests, 4)
+        self.assertGreaterEqual(elapsed, 0.04)
+        self.assertEqual(list(tweets.id), list(expected.id))
+        self.assertEqual(list(tweets.hashtags), list(expected.hashtags))
+
+    def test_http_source_returns_empty_dataframe_when_no_tweets(self):
+        with FakeTweetServer(make_archive()) as server:
+            self.assertTrue(HttpSource(server.url).fetch("nikt", None, None, None, 10).empty)
+
+    def test_create_tweet_source(self):
+        self.assertIsInstance(TwSr.create_tweet_source("twint"), TwintSource)
+        self.assertEqual(TwSr.create_tweet_source("archive:tweets.csv").path, "tweets.csv")
+        self.assertEqual(TwSr.create_tweet_source("http://127.0.0.1:8000/").base_url, "http://127.0.0.1:8000")
+        with self.assertRaises(ValueError):
+            TwSr.create_tweet_source("ftp://serwer")
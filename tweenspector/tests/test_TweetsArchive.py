@@ -0,0 +1,89 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import os
+import tempfile
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+import tweenspector.TweetsArchive as TwAr
+from tweenspector.AccountStats import compute_account_stats
+from tweenspector.TweetsData import save_tweets_df_to_csv
+
+
+def generate_tweets(count, seed=0):
+    rng = np.random.default_rng(seed)
+    users = np.array(["@Ala", "@kot", "@MZ_GOV_PL", ""])
+    return pd.DataFrame({
+        "id": [str(i) for i in range(count)],
+        "tweet": ["Tweet {m} {m2} szczepienie {n} https://t.co/x".format(m=users[i % 4], m2=users[(i * 7) % 4], n=i)
+                  for i in range(count)],
+        "hour": ["{h:02d}".format(h=h) for h in rng.integers(0, 24, count)],
+        "nlikes": rng.integers(0, 10000, count),
+        "nretweets": rng.integers(0, 1000, count),
+        "retweet": rng.random(count) < 0.2,
+        "place": [""] * count,
+        "hashtags": [[] for _ in range(count)]
+    })
+
+
+class TestTweetsArchive(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.tweets = generate_tweets(1001)
+        self.filename = os.path.join(self.temp_dir.name, "tweets.csv")
+        save_tweets_df_to_csv(self.filename, self.tweets)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def aggregate(self, chunk_size):
+        aggregators = [TwAr.WordCountAggregator(stopwords={"tweet"}), TwAr.MentionCountAggregator(),
+                       TwAr.HourAggregator(), TwAr.EngagementAggregator()]
+        return TwAr.aggregate_tweets_csv(self.filename, aggregators, chunk_size=chunk_size)
+
+    def test_chunked_results_match_whole_frame(self):
+        results = self.aggregate(chunk_size=64)
+        stats = compute_account_stats(self.tweets)
+        self.assertEqual(results["mentions"], stats["usersdict"])
+        self.assertEqual(results["hours"], stats["hourdict"])
+        self.assertEqual(len(results["engagement"]), 8)
+        for key, value in results["engagement"].items():
+            if key.startswith("median"):    # approximate, the sketch uses the lower median
+                self.assertLessEqual(abs(value - stats[key]), 0.01 * stats[key] + 1)
+            else:
+                self.assertEqual(value, stats[key])
+
+    def test_chunk_size_does_not_change_results(self):
+        self.assertEqual(self.aggregate(chunk_size=7), self.aggregate(chunk_size=5000))
+
+    def test_word_counts_skip_links_mentions_and_stopwords(self):
+        words = self.aggregate(chunk_size=100)["words"]
+        self.assertEqual(words["szczepienie"], 1001)
+        self.assertNotIn("Tweet", words)
+        self.assertNotIn("https", words)
+        self.assertNotIn("kot", words)
+
+    def test_only_needed_columns_are_read(self):
+        with patch("tweenspector.TweetsArchive.pd.read_csv", wraps=pd.read_csv) as mock_read_csv:
+            TwAr.aggregate_tweets_csv(self.filename, [TwAr.HourAggregator()], chunk_size=100)
+        self.assertEqual(mock_read_csv.call_args.kwargs["usecols"], ["hour"])
+        self.assertEqual(mock_read_csv.call_args.kwargs["chunksize"], 100)
+
+    def test_partial_results_can_be_merged(self):
+        first, second = self.tweets.iloc[:400], self.tweets.iloc[400:]
+        merged = [TwAr.WordCountAggregator(), TwAr.MentionCountAggregator(), TwAr.HourAggregator(),
+                  TwAr.EngagementAggregator()]
+        whole = [type(aggregator)() for aggregator in merged]
+        for aggregator, other, single in zip(merged, [type(a)() for a in merged], whole):
+            aggregator.update(first)
+            other.update(second)
+            aggregator.merge(other)
+            single.update(self.tweets)
+            self.assertEqual(aggregator.result(), single.result())
+
+
+if __name__ == '__main__':
+    unittest.main()
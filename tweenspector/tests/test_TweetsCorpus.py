@@ -0,0 +1,52 @@
+from TestUtils import add_parent_dir_to_sys_path
+
+add_parent_dir_to_sys_path()  # Make sure Python sees files outside of test directory
+
+import unittest
+import gc
+import pandas as pd
+import tweenspector.TweetsCorpus as TwCr
+
+
+class TestTweetsCorpus(unittest.TestCase):
+    def test_clean_tweets_text(self):
+        tweets_text = pd.Series(["Zobacz https://t.co/4eLAcu0b6w oraz http://example.com teraz",
+                                 "@bealooa @MZ_GOV_PL Jeśli tylko",
+                                 "Kot &amp; pies &#39;razem&#39;",
+                                 None])
+        cleaned = TwCr.clean_tweets_text(tweets_text)
+        self.assertEqual(cleaned.tolist(), ["Zobacz  oraz  teraz", "  Jeśli tylko", "Kot & pies 'razem'", ""])
+
+    def test_corpus_is_shared_for_the_same_dataframe(self):
+        tweets = pd.DataFrame({"tweet": ["Ala ma kota @kot"]})
+        corpus = TwCr.get_corpus(tweets)
+        self.assertIs(corpus, TwCr.get_corpus(tweets))
+        self.assertIs(corpus.clean_text, corpus.clean_text)
+        self.assertEqual(corpus.clean_text.tolist(), ["Ala ma kota "])
+        self.assertIsNot(corpus, TwCr.get_corpus(tweets.copy()))
+
+    def test_corpus_is_forgotten_with_its_dataframe(self):
+        tweets = pd.DataFrame({"tweet": ["Ala ma kota"]})
+        tweets_id = id(tweets)
+        TwCr.get_corpus(tweets)
+        self.assertIn(tweets_id, TwCr.corpora)
+        del tweets
+        gc.collect()
+        self.assertNotIn(tweets_id, TwCr.corpora)
+
+    def test_index_counts_lowercased_mentions_once_per_tweet(self):
+        tweets = pd.DataFrame({"id": ["1", "2", "3"],
+                               "tweet": ["@Ala @ala ma kota @Kot", "RT @kot: miau", "bez wspominków"],
+                               "hashtags": [["Kot", ""], [], ["kot", "pies"]]})
+        index = TwCr.get_corpus(tweets).index
+        self.assertIs(index, TwCr.get_corpus(tweets).index)
+        self.assertEqual(index.mention_counts, {"ala": 1, "kot": 2})
+        self.assertEqual(index.hashtag_counts, {"kot": 2, "pies": 1})
+        self.assertEqual(index.mentions_by_tweet(), {"1": ["ala", "kot"], "2": ["kot"]})
+
+    def test_index_without_hashtags_column(self):
+        tweets = pd.DataFrame({"tweet": ["@Ala ma kota", None]})
+        index = TwCr.get_corpus(tweets).index
+        self.assertEqual(index.mention_counts, {"ala": 1})
+        self.assertEqual(index.hashtag_counts, {})
+        self.assertEqual(index.mentions_by_tweet(), {0: ["ala"]})
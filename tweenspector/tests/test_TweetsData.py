@@ -8,8 +8,13 @@ import tweenspector.TweetsData as TwDt
 from tweenspector.TweetsData import TweetsData
 import pandas as pd
 import itertools
-from wordcloud import WordCloud
+import threading
+import time
 import igraph
+import os
+import tempfile
+from tweenspector.InteractionStore import InteractionStore
+from tweenspector.LemmaCache import LemmaCache, language_tokenizer
 
 
 def read_tweets_from_csv(filename):
@@ -24,6 +29,16 @@ def read_tweets_from_csv(filename):
 class TestTweetsData(unittest.TestCase):
     tweets_dict = {}
 
+    def setUp(self):
+        TwDt.lemmatizers.clear()    # every test loads its own mocked spaCy model
+        service_patcher = patch("tweenspector.TweetsData.connect_lemmatizer_service", return_value=None)
+        service_patcher.start()     # never use a lemmatization service running on this machine
+        self.addCleanup(service_patcher.stop)
+        self.mock_cairo = MagicMock()     # graphs are drawn on a mocked surface, pycairo does not have to be installed
+        cairo_patcher = patch("tweenspector.TweetsData.cairo", new=self.mock_cairo)
+        cairo_patcher.start()
+        self.addCleanup(cairo_patcher.stop)
+
     def test_can_create_TweetsData(self):
         username = "TestUser"
         search_words = ""
@@ -49,9 +64,31 @@ class TestTweetsData(unittest.TestCase):
         TwDt.save_tweets_df_to_csv(filename, mock_tweets_df)
         mock_to_csv.assert_called_once_with(filename)
 
+    def test_snapshot_keeps_types_and_lists(self):
+        tweets = self.getTweetsFromCsv("donaldtusk").copy()
+        tweets["created"] = pd.to_datetime(tweets["date"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "tweets.feather")
+            TwDt.save_tweets_df_to_snapshot(filename, tweets)
+            loaded = TwDt.load_tweets_df_from_snapshot(filename)
+            self.assertEqual(list(loaded.columns), list(tweets.columns))
+            self.assertEqual(dict(loaded.dtypes), dict(tweets.dtypes))
+            self.assertEqual([list(h) for h in loaded["hashtags"]], list(tweets["hashtags"]))
+            self.assertEqual(loaded["nlikes"].tolist(), tweets["nlikes"].tolist())
+            del loaded
+
+    def test_snapshot_stores_mixed_columns_as_text(self):
+        tweets = pd.DataFrame({"id": ["1", "2"], "place": ["", {"type": "Point"}], "nlikes": [1, 2]})
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, "tweets.feather")
+            TwDt.save_tweets_df_to_snapshot(filename, tweets)
+            loaded = TwDt.load_tweets_df_from_snapshot(filename)
+            self.assertEqual(loaded["place"].tolist(), ["", "{'type': 'Point'}"])
+            self.assertEqual(loaded["nlikes"].dtype, tweets["nlikes"].dtype)
+            del loaded
+
     @patch("tweenspector.TweetsData.print")
-    @patch("tweenspector.TweetsData.twint")
-    def test_can_get_tweets(self, mock_twint, mock_print):
+    def test_can_get_tweets(self, mock_print):
         test_data = [
             self.getSampleTweets(),
             pd.DataFrame()
@@ -59,24 +96,47 @@ class TestTweetsData(unittest.TestCase):
 
         for data in test_data:
             with self.subTest(data=data):
-                mock_twint.output.panda.Tweets_df = data
-                td = self.generateTweetsData()
+                td = self.generateTweetsData(tweet_source=MagicMock())
+                td.tweet_source.fetch = MagicMock(return_value=data)
                 tweets = td.get_tweets(td.user_name, td.search_words, td.Since, td.Until, td.num_of_tweets)
                 self.assertIsNotNone(tweets)
                 self.assertEqual(len(data), len(tweets))
 
     @patch("tweenspector.TweetsData.print")
-    @patch("tweenspector.TweetsData.twint")
-    def test_get_tweets_returns_empty_dataframe_on_exception(self, mock_twint, mock_print):
+    def test_get_tweets_returns_empty_dataframe_on_exception(self, mock_print):
         test_exceptions = [ValueError, TypeError, AttributeError, Exception]
         for exc in test_exceptions:
             with self.subTest(exc=exc):
-                mock_twint.run.Profile = MagicMock(side_effect=exc)
-                td = self.generateTweetsData()
+                td = self.generateTweetsData(tweet_source=MagicMock())
+                td.tweet_source.fetch = MagicMock(side_effect=exc)
                 ret = td.get_tweets(td.user_name, td.search_words, td.Since, td.Until, td.num_of_tweets)
                 self.assertIsNotNone(ret)
                 self.assertEqual(len(ret), 0)
-                mock_twint.run.Profile.assert_called_once()
+                td.tweet_source.fetch.assert_called_once()
+
+    @patch("tweenspector.TweetsData.print")
+    def test_get_tweets_uses_tweet_cache(self, mock_print):
+        tweets = self.getSampleTweets()
+        td = self.generateTweetsData(tweet_source=MagicMock())
+        td.tweet_cache = MagicMock()
+        td.tweet_cache.get_tweets = MagicMock(return_value=tweets)
+        ret = td.get_tweets(td.user_name, td.search_words, td.Since, td.Until, td.num_of_tweets)
+        self.assertIs(ret, tweets)
+        td.tweet_cache.get_tweets.assert_called_once_with(td.user_name, td.search_words, td.Since, td.Until,
+                                                          td.num_of_tweets, td.fetch_tweets)
+        td.tweet_source.fetch.assert_not_called()
+
+    @patch("tweenspector.TweetsData.print")
+    def test_get_tweets_uses_session_cache(self, mock_print):
+        tweets = self.getSampleTweets()
+        td = self.generateTweetsData(tweet_source=MagicMock())
+        td.session_cache = MagicMock()
+        td.session_cache.get_tweets = MagicMock(return_value=tweets)
+        ret = td.get_tweets(td.user_name, td.search_words, td.Since, td.Until, td.num_of_tweets)
+        self.assertIs(ret, tweets)
+        td.session_cache.get_tweets.assert_called_once_with(td.user_name, td.search_words, td.Since, td.Until,
+                                                            td.num_of_tweets, td.load_tweets)
+        td.tweet_source.fetch.assert_not_called()
 
     def test_can_generate_word_cloud(self):
         test_data = [True, False]
@@ -102,8 +162,7 @@ class TestTweetsData(unittest.TestCase):
                 mock_td = MagicMock()
                 mock_td.get_tweets = MagicMock(return_value=data)
                 mock_td.self.num_of_tweets_read = data.shape[0]
-                mock_nlp = MagicMock(side_effect=lambda x: (MagicMock(lemma_=v) for v in x.split(" ")))
-                mock_spacy.load = MagicMock(return_value=mock_nlp)
+                mock_spacy.load = MagicMock(return_value=self.generateMockNlp())
                 ret = TweetsData.create_word_cloud(mock_td)
                 self.assertEqual(ret is not None, expected_res)
                 if expected_res:
@@ -150,31 +209,110 @@ class TestTweetsData(unittest.TestCase):
         mock_td.get_tweets = MagicMock(return_value=tweets)
         mock_td.self.num_of_tweets_read = tweets.shape[0]
 
-        mock_nlp = MagicMock(side_effect=lambda x: (MagicMock(lemma_=v) for v in x.split(" ")))
-        mock_spacy.load = MagicMock(return_value=mock_nlp)
+        mock_spacy.load = MagicMock(return_value=self.generateMockNlp())
 
-        wordcloud, text = TweetsData.create_word_cloud(mock_td)
-        wc_args = mock_WordCloud.call_args.kwargs
-        real_wc = WordCloud(
-            background_color=wc_args.get("background_color"),
-            colormap=wc_args.get("colormap"),
-            width=wc_args.get("width"),
-            height=wc_args.get("height"),
-            stopwords=wc_args.get("stopwords"))
-        ret = real_wc.process_text(str(text))
+        wordcloud, frequencies = TweetsData.create_word_cloud(mock_td)
+        # single letters are dropped, just like the word pattern of the previous WordCloud.generate call did
         sample = {'Ala': 1, 'Alę': 1, 'Doprowadzili': 1, 'Europejską': 1, 'III': 1,
                   'Polsce': 1, 'Polską': 1, 'Sebastianowi': 1, 'Unia': 1, 'Zrobili': 1,
-                  'a': 2, 'byle': 1, 'całej': 1, 'cały': 1, 'czas': 1, 'do': 2,
-                  'głupota': 1, 'i': 1, 'innych': 1, 'jej': 1, 'jest': 1, 'katastrofy': 1,
+                  'byle': 1, 'całej': 1, 'cały': 1, 'czas': 1, 'do': 2,
+                  'głupota': 1, 'innych': 1, 'jej': 1, 'jest': 1, 'katastrofy': 1,
                   'konfliktem': 1, 'kot': 1, 'kota': 1, 'którym': 1, 'kłamali': 1,
                   'kłamstw': 1, 'ma': 2, 'między': 1, 'na': 1, 'nie': 1, 'nieszczęść': 1,
                   'niszcząc': 1, 'odpowiedzialności': 1, 'ofiarę': 1, 'on': 1, 'po': 1,
                   'polityce': 1, 'polskiego': 1, 'poważnych': 1, 'premiera': 1,
                   'przyczyną': 1, 'seicento': 1, 'tak': 1, 'tylko': 1, 'uniknąć': 1,
-                  'w': 2, 'winę': 1, 'większości': 1, 'wojnę': 1, 'wywiadzie': 1,
-                  'wywołaną': 1, 'z': 1, 'zapowiada': 1, 'zdębiał': 1, 'zmuszali': 1,
+                  'winę': 1, 'większości': 1, 'wojnę': 1, 'wywiadzie': 1,
+                  'wywołaną': 1, 'zapowiada': 1, 'zdębiał': 1, 'zmuszali': 1,
                   'zrzucili': 1, 'Świat': 1, 'światową': 1, 'życie': 1}
-        self.assertEqual(sample, ret)
+        self.assertEqual(sample, frequencies)
+        mock_WordCloud.return_value.generate_from_frequencies.assert_called_once_with(frequencies)
+        self.assertEqual(mock_td.result, {"frequencies": frequencies})
+
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.spacy")
+    @patch("tweenspector.TweetsData.WordCloud")
+    def test_create_word_cloud_lemmatizes_in_batches_with_trimmed_pipeline(self, mock_WordCloud, mock_spacy,
+                                                                           mock_print):
+        tweets = self.getSampleTweets()
+        mock_td = MagicMock()
+        mock_td.get_tweets = MagicMock(return_value=tweets)
+        mock_nlp = self.generateMockNlp()
+        mock_spacy.load = MagicMock(return_value=mock_nlp)
+
+        self.assertIsNotNone(TweetsData.create_word_cloud(mock_td, batch_size=32, n_process=2))
+        mock_spacy.load.assert_called_once_with("pl_core_news_lg", exclude=["parser", "ner"])
+        mock_nlp.assert_not_called()
+        mock_nlp.pipe.assert_called_once()
+        texts = mock_nlp.pipe.call_args.args[0]
+        self.assertEqual(len(texts), tweets.shape[0])
+        self.assertEqual(mock_nlp.pipe.call_args.kwargs, {"batch_size": 32, "n_process": 2})
+
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.spacy")
+    @patch("tweenspector.TweetsData.WordCloud")
+    def test_create_word_cloud_loads_model_once(self, mock_WordCloud, mock_spacy, mock_print):
+        mock_td = MagicMock()
+        mock_td.get_tweets = MagicMock(return_value=self.getSampleTweets())
+        mock_spacy.load = MagicMock(return_value=self.generateMockNlp())
+        TwDt.preload_lemmatizer().join()
+        for _ in range(2):
+            self.assertIsNotNone(TweetsData.create_word_cloud(mock_td))
+        mock_spacy.load.assert_called_once_with("pl_core_news_lg", exclude=["parser", "ner"])
+
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.spacy")
+    @patch("tweenspector.TweetsData.WordCloud")
+    def test_create_word_cloud_uses_lemmatizer_service(self, mock_WordCloud, mock_spacy, mock_print):
+        mock_td = MagicMock()
+        mock_td.get_tweets = MagicMock(return_value=self.getSampleTweets())
+        mock_service = MagicMock()
+        mock_service.stopwords = MagicMock(return_value={"być"})
+        mock_service.lemmatize = MagicMock(side_effect=lambda texts, batch_size: iter([
+            [("kotem", "kot"), ("Ala", "ala"), ("jest", "być")], [("kota", "kot"), (",", ",")]]))
+        with patch("tweenspector.TweetsData.connect_lemmatizer_service", return_value=mock_service):
+            wordcloud, frequencies = TweetsData.create_word_cloud(mock_td, batch_size=16)
+        self.assertEqual(frequencies, {"kot": 2, "ala": 1})
+        mock_spacy.load.assert_not_called()
+        self.assertEqual(mock_service.lemmatize.call_args.args[1], 16)
+        mock_service.close.assert_called_once_with()
+
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.spacy")
+    @patch("tweenspector.TweetsData.WordCloud")
+    def test_create_word_cloud_skips_model_for_cached_tweets(self, mock_WordCloud, mock_spacy, mock_print):
+        tweets = self.getSampleTweets()
+        mock_td = MagicMock()
+        mock_td.get_tweets = MagicMock(return_value=tweets)
+        mock_nlp = MagicMock()
+        tokenizer = language_tokenizer("pl")     # the model splits tweets with the rules of its language
+        mock_nlp.pipe = MagicMock(side_effect=lambda texts, **_: ([MagicMock(text=t.text, lemma_=t.text.lower())
+                                                                   for t in tokenizer(x)] for x in texts))
+        mock_spacy.load = MagicMock(return_value=mock_nlp)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            lemma_cache = LemmaCache(os.path.join(temp_dir, "lemmas.sqlite3"))
+            first = TweetsData.create_word_cloud(mock_td, lemma_cache=lemma_cache)[1]
+            mock_nlp.pipe.assert_called_once()
+            TwDt.lemmatizers.clear()
+            mock_spacy.load.reset_mock()
+            second = TweetsData.create_word_cloud(mock_td, lemma_cache=LemmaCache(lemma_cache.path))[1]
+        self.assertEqual(first, second)
+        mock_spacy.load.assert_not_called()
+        mock_nlp.pipe.assert_not_called()
+
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.spacy")
+    def test_preload_lemmatizer_reports_errors(self, mock_spacy, mock_print):
+        mock_spacy.load = MagicMock(side_effect=OSError)
+        TwDt.preload_lemmatizer().join()
+        mock_print.assert_called_once()
+        self.assertEqual(TwDt.lemmatizers, {})
+
+    def test_count_top_words(self):
+        word_counts = {"Kot": 3, "kot": 1, "pies": 2, "RT": 5, "rt": 2, "2022": 4, "dom": 1}
+        frequencies = TwDt.count_top_words(word_counts, {"RT"}, max_words=2)
+        self.assertEqual(frequencies, {"Kot": 4, "pies": 2})
+        self.assertEqual(TwDt.count_top_words({"RT": 5, "rt": 2, "Dom": 1}, {"rt"}), {"Dom": 1})
 
     def test_can_generate_interconnections_network(self):
         test_rets = [True, False]
@@ -189,9 +327,26 @@ class TestTweetsData(unittest.TestCase):
                 self.assertEqual(ret, expected_res)
                 mock_td.create_interconnections_network.assert_called_once()
 
+    @patch("tweenspector.TweetsData.Image")
+    @patch("tweenspector.TweetsData.igraph")
+    def test_render_graph_draws_on_own_surface(self, mock_igraph, mock_Image):
+        def write_to_png(buffer):
+            buffer.write(b"png")
+        surface = self.mock_cairo.ImageSurface.return_value
+        surface.write_to_png = MagicMock(side_effect=write_to_png)
+        comm = MagicMock()
+        ret = TwDt.render_graph(comm, {"bbox": (1000.5, 600.2), "margin": 250})
+        self.mock_cairo.ImageSurface.assert_called_once_with(self.mock_cairo.FORMAT_ARGB32, 1001, 601)
+        mock_igraph.plot.assert_called_once_with(comm, target=surface, bbox=(1000.5, 600.2), margin=250,
+                                                 mark_groups=True)
+        mock_igraph.plot.return_value.redraw.assert_called_once_with()
+        self.assertEqual(mock_Image.open.call_args.args[0].getvalue(), b"png")
+        self.assertEqual(ret, mock_Image.open.return_value)
+
+    @patch("tweenspector.TweetsData.Image")
     @patch("tweenspector.TweetsData.print")
     @patch("tweenspector.TweetsData.igraph")
-    def test_can_create_interconnections_network(self, mock_igraph, mock_print):
+    def test_can_create_interconnections_network(self, mock_igraph, mock_print, mock_Image):
         tweet_df = self.getSampleTweets()
         test_data = [
             (tweet_df, "Optimal Modularity", True),
@@ -211,9 +366,10 @@ class TestTweetsData(unittest.TestCase):
                 ret = TweetsData.create_interconnections_network(mock_td, option)
                 self.assertEqual(ret is not None, expected_ret)
 
+    @patch("tweenspector.TweetsData.Image")
     @patch("tweenspector.TweetsData.print")
     @patch("tweenspector.TweetsData.igraph")
-    def test_create_interconnections_network_returns_none_on_exception(self, mock_igraph, mock_print):
+    def test_create_interconnections_network_returns_none_on_exception(self, mock_igraph, mock_print, mock_Image):
         tweets = self.getSampleTweets()
         test_exceptions = [ValueError, TypeError, AttributeError, Exception]
         test_options = ["Optimal Modularity", "Spinglass", "Label Propagation", "Infomap"]
@@ -228,16 +384,17 @@ class TestTweetsData(unittest.TestCase):
                 ret = TweetsData.create_interconnections_network(mock_td, option)
                 self.assertIsNone(ret)
 
+    @patch("tweenspector.TweetsData.Image")
     @patch("tweenspector.TweetsData.print")
     @patch("tweenspector.TweetsData.igraph")
-    def test_create_interconnection_network_returns_correct_content(self, mock_igraph, mock_print):
+    def test_create_interconnection_network_returns_correct_content(self, mock_igraph, mock_print, mock_Image):
         option = "Label Propagation"
 
         mock_td = MagicMock()
         mock_td.user_name = "szczepimysie"
         mock_td.get_tweets = MagicMock(side_effect=lambda user_name, *_: self.getTweetsFromCsv(user_name))
 
-        mock_igraph.Graph = MagicMock(side_effect=lambda directed: igraph.Graph(directed=directed))
+        mock_igraph.Graph = MagicMock(side_effect=lambda *args, **kwargs: igraph.Graph(*args, **kwargs))
 
         ig = TweetsData.create_interconnections_network(mock_td, option)
         sample = igraph.Graph(directed=True)
@@ -247,6 +404,100 @@ class TestTweetsData(unittest.TestCase):
         sample.add_edge("szczepimysie", "bealooa")
         sample.add_edge("szczepimysie", "mz_gov_pl")
         self.assertTrue(sample.isomorphic_vf2(ig))
+        self.assertEqual(set(mock_td.result["communities"]), {"szczepimysie", "bealooa", "mz_gov_pl"})
+        self.assertEqual({(i["source"], i["target"]) for i in mock_td.result["interactions"]},
+                         {("szczepimysie", "bealooa"), ("szczepimysie", "mz_gov_pl")})
+        self.assertEqual(mock_td.result["community_detection"]["requested"], option)
+
+    def test_figure_to_image(self):
+        figure = TwDt.plt.figure(figsize=(4, 2), dpi=50)
+        TwDt.plt.bar(["a", "b"], [1, 2])
+        image = TwDt.figure_to_image(figure)
+        self.assertEqual(image.size, (200, 100))
+        self.assertEqual(image.mode, "RGBA")
+        self.assertFalse(TwDt.plt.fignum_exists(figure.number))
+
+    def test_build_interactions_graph(self):
+        relations = {"ala": {"kot": 3, "pies": 1}, "kot": {"ala": 2}, "pies": {}}
+        g = TwDt.build_interactions_graph(["ala", "kot", "pies"], relations)
+        self.assertTrue(g.is_directed())
+        self.assertEqual(g.vs["name"], ["ala", "kot", "pies"])
+        weights = {(g.vs[e.source]["name"], g.vs[e.target]["name"]): e["weight"] for e in g.es}
+        self.assertEqual(weights, {("ala", "kot"): 3, ("ala", "pies"): 1, ("kot", "ala"): 2})
+
+    @patch("tweenspector.TweetsData.Image")
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.igraph")
+    def test_create_interconnection_network_fetches_friends_concurrently(self, mock_igraph, mock_print, mock_Image):
+        lock = threading.Lock()
+        active = [0, 0]  # currently running and maximum number of fetches
+
+        def get_tweets(user_name, *_, **__):
+            with lock:
+                active[0] += 1
+                active[1] = max(active[1], active[0])
+            time.sleep(0.1)
+            with lock:
+                active[0] -= 1
+            return self.getTweetsFromCsv(user_name)
+
+        mock_td = MagicMock()
+        mock_td.user_name = "szczepimysie"
+        mock_td.get_tweets = MagicMock(side_effect=get_tweets)
+        mock_igraph.Graph = MagicMock(side_effect=lambda *args, **kwargs: igraph.Graph(*args, **kwargs))
+
+        ig = TweetsData.create_interconnections_network(mock_td, "Label Propagation", max_workers=2)
+        self.assertIsNotNone(ig)
+        self.assertEqual(active[1], 2)
+        self.assertEqual(ig.ecount(), 2)
+
+    @patch("tweenspector.TweetsData.Image")
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.igraph")
+    def test_create_interconnection_network_reuses_interaction_store(self, mock_igraph, mock_print, mock_Image):
+        mock_igraph.Graph = MagicMock(side_effect=lambda *args, **kwargs: igraph.Graph(*args, **kwargs))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = InteractionStore(os.path.join(temp_dir, "interactions.sqlite3"))
+            for expected_calls in [3, 1]:
+                mock_td = MagicMock()
+                mock_td.user_name = "szczepimysie"
+                mock_td.search_words, mock_td.Since, mock_td.Until, mock_td.num_of_tweets = "", "", "", 500
+                mock_td.get_tweets = MagicMock(side_effect=lambda user_name, *_, **__: self.getTweetsFromCsv(user_name))
+                ig = TweetsData.create_interconnections_network(mock_td, "Label Propagation",
+                                                                interaction_store=store)
+                self.assertEqual(ig.ecount(), 2)
+                self.assertEqual(mock_td.get_tweets.call_count, expected_calls)
+
+    @patch("tweenspector.TweetsData.Image")
+    @patch("tweenspector.TweetsData.print")
+    @patch("tweenspector.TweetsData.igraph")
+    def test_failed_friend_fetch_is_not_stored_as_missing_account(self, mock_igraph, mock_print, mock_Image):
+        mock_igraph.Graph = MagicMock(side_effect=lambda *args, **kwargs: igraph.Graph(*args, **kwargs))
+
+        def get_tweets(user_name, *_, raise_errors=False):
+            if user_name != "szczepimysie":
+                self.assertTrue(raise_errors)
+                raise ConnectionError("rate limit")
+            return self.getTweetsFromCsv(user_name)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = InteractionStore(os.path.join(temp_dir, "interactions.sqlite3"))
+            mock_td = MagicMock()
+            mock_td.user_name = "szczepimysie"
+            mock_td.search_words, mock_td.Since, mock_td.Until, mock_td.num_of_tweets = "", "", "", 500
+            mock_td.get_tweets = MagicMock(side_effect=get_tweets)
+            ig = TweetsData.create_interconnections_network(mock_td, "Label Propagation", interaction_store=store)
+            self.assertIsNotNone(ig)
+            scope = TwDt.interactions_scope("", "", "", 500)
+            self.assertGreater(ig.vcount(), 1)
+            for friend in ig.vs["name"][1:]:
+                self.assertIsNone(store.get_mentions(scope, friend))
+
+    @patch("tweenspector.TweetsData.print")
+    def test_get_tweets_raises_errors_on_request(self, mock_print):
+        td = self.generateTweetsData(tweet_source=MagicMock())
+        td.tweet_source.fetch = MagicMock(side_effect=ConnectionError)
+        with self.assertRaises(ConnectionError):
+            td.get_tweets(td.user_name, td.search_words, td.Since, td.Until, td.num_of_tweets, raise_errors=True)
 
     def test_can_generate_user_stats(self):
         test_rets = [True, False]
@@ -261,11 +512,12 @@ class TestTweetsData(unittest.TestCase):
                 self.assertEqual(ret, expected_res)
                 mock_td.create_user_stats.assert_called_once()
 
+    @patch("tweenspector.TweetsData.Image")
     @patch("tweenspector.TweetsData.print")
     @patch("tweenspector.TweetsData.pd")
     @patch("tweenspector.TweetsData.plt")
     @patch("tweenspector.TweetsData.matplotlib")
-    def test_can_create_user_stats(self, mock_matplotlib, mock_plt, mock_pd, mock_print):
+    def test_can_create_user_stats(self, mock_matplotlib, mock_plt, mock_pd, mock_print, mock_Image):
         tweets_df = self.getSampleTweets()
         tweets_dfwlam = self.getSampleTweetsWithLinksAndMentions()
         options = [
@@ -290,11 +542,23 @@ class TestTweetsData(unittest.TestCase):
                 ret = TweetsData.create_user_stats(mock_td, option)
                 self.assertEqual(ret is not None, expected_ret)
 
+    def test_create_user_stats_without_chart_draws_summary(self):
+        tweets = self.getTweetsFromCsv("donaldtusk")
+        mock_td = MagicMock()
+        mock_td.get_tweets = MagicMock(return_value=tweets)
+        mock_td.num_of_tweets_read = tweets.shape[0]
+        mock_td.image = None
+        self.assertIsNotNone(TweetsData.create_user_stats(mock_td, 0))
+        self.assertIsNotNone(mock_td.image)     # the GUI shows it instead of the "no such user" error
+        self.assertEqual(mock_td.image.size, (1200, 500))
+
+    @patch("tweenspector.TweetsData.Image")
     @patch("tweenspector.TweetsData.print")
     @patch("tweenspector.TweetsData.pd")
     @patch("tweenspector.TweetsData.plt")
     @patch("tweenspector.TweetsData.matplotlib")
-    def test_create_user_stats_returns_correct_content(self, mock_matplotlib, mock_plt, mock_pd, mock_print):
+    def test_create_user_stats_returns_correct_content(self, mock_matplotlib, mock_plt, mock_pd, mock_print,
+                                                       mock_Image):
         tweets = self.getTweetsFromCsv("donaldtusk")
         option = 1
 
@@ -312,15 +576,22 @@ class TestTweetsData(unittest.TestCase):
                   'usersdict': {'gazeta_wyborcza': 1},
                   'hourdict': {'12': 1, '18': 1, '09': 1, '15': 1, '17': 1, '10': 2, '19': 3}}
         self.assertEqual(user_stats, sample)
+        self.assertIs(mock_td.result, user_stats)
 
     # helpers
 
-    def generateTweetsData(self):
+    def generateTweetsData(self, tweet_source=None):
         username = "TestUser"
         search_words = ""
         date_from = "04-10-2022"
         date_to = "03-11-2022"
-        return TweetsData(username, search_words, date_from, date_to)
+        return TweetsData(username, search_words, date_from, date_to, tweet_source=tweet_source)
+
+    def generateMockNlp(self):
+        mock_nlp = MagicMock()
+        mock_nlp.pipe = MagicMock(side_effect=lambda texts, **_: ([MagicMock(lemma_=v) for v in x.split(" ")]
+                                                                  for x in texts))
+        return mock_nlp
 
     def getSampleTweets(self):
         return self.getTweetsFromCsv("wordcloud_test")